@@ -0,0 +1,76 @@
+"""Benchmark FileConnector against SQLiteConnector.
+
+Writes the same synthetic request logs to a FileConnector and to a
+SQLiteConnector in batches, as the write-behind queue would, and reports the
+write throughput of each, the time FileConnector takes to reopen its segments,
+and the time taken by fetch_log and a few filtered ``fetch_logs`` calls.
+
+Usage:
+    python benchmarks/file_connector.py [--rows 100000] [--batch-size 500] [--format binary] [--directory /tmp/supertracer-bench]
+"""
+import argparse
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from supertracer.connectors.file import FileConnector
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.filters import LogFilters
+from memory_connector import create_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--format", choices=("binary", "ndjson"), default="binary")
+    parser.add_argument("--directory", default="/tmp/supertracer-bench")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.directory, ignore_errors=True)
+    os.makedirs(args.directory)
+    start = datetime.now() - timedelta(days=1)
+    batches = [
+        [create_log(i, start) for i in range(offset, min(offset + args.batch_size, args.rows))]
+        for offset in range(0, args.rows, args.batch_size)
+    ]
+
+    file_connector = FileConnector(os.path.join(args.directory, "segments"), format=args.format, segment_max_bytes=16 * 1024 * 1024)
+    sqlite_connector = SQLiteConnector(os.path.join(args.directory, "logs.db"))
+    for name, connector in (("file", file_connector), ("sqlite", sqlite_connector)):
+        connector.connect()
+        connector.init_db()
+        started = time.perf_counter()
+        for batch in batches:
+            connector.save_logs(batch)
+        elapsed = time.perf_counter() - started
+        print(f"{'write, ' + name:<24} {args.rows / elapsed:>10.0f} rows/s")
+    sqlite_connector.disconnect()
+
+    file_connector.disconnect()
+    started = time.perf_counter()
+    file_connector.connect()
+    print(f"{'reopen':<24} {(time.perf_counter() - started) * 1000:>10.1f} ms")
+
+    started = time.perf_counter()
+    for log_id in range(1, args.rows, args.rows // 100):
+        file_connector.fetch_log(log_id)
+    print(f"{'fetch_log':<24} {(time.perf_counter() - started) * 10:>10.2f} ms")
+
+    for label, filters in (
+        ("newest page", LogFilters(limit=50)),
+        ("one second window", LogFilters(start_date=start + timedelta(seconds=50), end_date=start + timedelta(seconds=51), limit=50)),
+        ("status_code=500", LogFilters(status_code="500", limit=50)),
+        ("methods+latency", LogFilters(methods=["DELETE"], min_latency=240, limit=50)),
+    ):
+        started = time.perf_counter()
+        for _ in range(5):
+            file_connector.fetch_logs(filters)
+        elapsed = (time.perf_counter() - started) / 5
+        print(f"{label:<24} {elapsed * 1000:>10.1f} ms")
+    file_connector.disconnect()
+    shutil.rmtree(args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark MemoryConnector memory use and filter scans.
+
+Fills a MemoryConnector with synthetic request logs and reports the memory held
+per log (measured with tracemalloc), the share of it taken by the search index
+and the time taken by a few filtered ``fetch_logs`` calls.
+
+With ``--max-bytes`` the connector is given a memory budget, and the memory it
+accounts for is reported next to the measured one. ``--search-index`` turns on
+the trigram index for text and endpoint searches.
+
+Usage:
+    python benchmarks/memory_connector.py [--rows 100000] [--max-bytes 8000000] [--search-index]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.types.filters import LogFilters
+from supertracer.types.logs import Log
+
+METHODS = ("GET", "POST", "PUT", "DELETE")
+USER_AGENT = b"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def create_log(i: int, start: datetime) -> Log:
+    status_code = 500 if i % 1000 == 0 else 200
+    headers = [
+        (b"host", b"bench.example.com"),
+        (b"user-agent", USER_AGENT),
+        (b"accept", b"application/json, text/plain, */*"),
+        (b"accept-encoding", b"gzip, deflate, br"),
+        (b"accept-language", b"en-US,en;q=0.9"),
+        (b"connection", b"keep-alive"),
+        (b"x-request-id", f"req-{i:012d}".encode()),
+    ]
+    return {
+        "id": 0,
+        "content": f"{METHODS[i % 4]} /items/{i % 500} {status_code}",
+        "timestamp": start + timedelta(milliseconds=i),
+        "method": METHODS[i % 4],
+        "path": f"/items/{i % 500}",
+        "url": f"http://bench/items/{i % 500}?page={i % 7}",
+        # Decoded per request like real headers, so no strings are shared between logs
+        "headers": {name.decode(): value.decode() for name, value in headers},
+        "log_level": "HTTP",
+        "status_code": status_code,
+        "duration_ms": i % 250,
+        "client_ip": "127.0.0.1",
+        "user_agent": USER_AGENT.decode(),
+        "request_query": {"page": str(i % 7)},
+        "request_body": None,
+        "request_size_bytes": None,
+        "request_body_truncated": None,
+        "response_headers": {"content-type": "application/json", "content-length": "60"},
+        "response_body": {"item_id": i, "name": "benchmark", "tags": ["a", "b", "c"]},
+        "response_size_bytes": 60,
+        "error_message": "HTTP 500 Error" if status_code >= 400 else None,
+        "stack_trace": None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--max-bytes", type=int, default=None)
+    parser.add_argument("--search-index", action="store_true")
+    args = parser.parse_args()
+
+    start = datetime.now() - timedelta(days=1)
+    connector = MemoryConnector(capacity=args.rows, search_index=args.search_index, max_bytes=args.max_bytes)
+
+    gc.collect()
+    tracemalloc.start()
+    # Logs are built as the middleware would, so their payloads count towards the store
+    for offset in range(0, args.rows, 1000):
+        connector.save_logs([create_log(i, start) for i in range(offset, min(offset + 1000, args.rows))])
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    usage = connector.memory_usage()
+    print(f"{'logs kept':<24} {usage['logs']:>10}")
+    print(f"{'memory':<24} {size / 1e6:>10.1f} MB")
+    print(f"{'memory accounted':<24} {usage['used_bytes'] / 1e6:>10.1f} MB")
+    print(f"{'memory per log':<24} {size / usage['logs']:>10.0f} bytes")
+    print(f"{'search index per log':<24} {connector.search_index_bytes() / usage['logs']:>10.0f} bytes")
+
+    for label, filters in (
+        ("status_code=500", LogFilters(status_code="500", limit=50)),
+        ("status_code=5XX", LogFilters(status_code="5XX", limit=50)),
+        ("one second window", LogFilters(start_date=start + timedelta(seconds=50), end_date=start + timedelta(seconds=51), limit=50)),
+        ("methods+latency", LogFilters(methods=["DELETE"], min_latency=240, limit=50)),
+        ("endpoint", LogFilters(endpoint="/items/499?page=6", limit=50)),
+        ("search_text", LogFilters(search_text="/items/42 500", limit=50)),
+        ("search_text, matches", LogFilters(search_text="delete /items/13", limit=50)),
+    ):
+        started = time.perf_counter()
+        for _ in range(5):
+            connector.fetch_logs(filters)
+        elapsed = (time.perf_counter() - started) / 5
+        print(f"{label:<24} {elapsed * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
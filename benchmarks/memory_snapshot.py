@@ -0,0 +1,44 @@
+"""Benchmark MemoryConnector snapshots.
+
+Fills a MemoryConnector with synthetic request logs, then reports the time taken
+to write a snapshot, its size on disk and the time a new connector takes to load
+it on connect().
+
+Usage:
+    python benchmarks/memory_snapshot.py [--rows 500000] [--path /tmp/supertracer.snapshot]
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.types.filters import LogFilters
+from memory_connector import create_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--path", default="/tmp/supertracer.snapshot")
+    args = parser.parse_args()
+
+    start = datetime.now() - timedelta(days=1)
+    connector = MemoryConnector(capacity=args.rows, snapshot_path=args.path, snapshot_interval_seconds=0)
+    for offset in range(0, args.rows, 1000):
+        connector.save_logs([create_log(i, start) for i in range(offset, min(offset + 1000, args.rows))])
+
+    started = time.perf_counter()
+    connector.save_snapshot()
+    print(f"{'save':<24} {(time.perf_counter() - started) * 1000:>10.0f} ms")
+    print(f"{'size':<24} {os.path.getsize(args.path) / 1e6:>10.1f} MB")
+
+    restored = MemoryConnector(capacity=args.rows, snapshot_path=args.path, snapshot_interval_seconds=0)
+    started = time.perf_counter()
+    restored.connect()
+    print(f"{'load':<24} {(time.perf_counter() - started) * 1000:>10.0f} ms")
+    assert restored.fetch_logs(LogFilters(limit=1))[0]["id"] == connector.fetch_logs(LogFilters(limit=1))[0]["id"]
+    os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark the per-request overhead of the SuperTracer middleware.
+
+Measures requests/sec against an in-process FastAPI app for three setups:
+no tracer, the ``@app.middleware("http")`` wrapper and the raw ASGI middleware.
+
+Usage:
+    python benchmarks/middleware_overhead.py [--requests 5000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.middleware.logger_middleware import add_logger_middleware
+from supertracer.middleware.asgi_logger_middleware import add_asgi_logger_middleware
+from supertracer.services.broadcaster import LogBroadcaster
+from supertracer.services.metrics import MetricsService
+from supertracer.types.options import SupertracerOptions
+
+
+def create_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"item_id": item_id, "name": "benchmark", "tags": ["a", "b", "c"]}
+
+    if mode != "none":
+        connector = MemoryConnector()
+        connector.connect()
+        add_middleware = add_logger_middleware if mode == "http" else add_asgi_logger_middleware
+        add_middleware(SupertracerOptions(), connector, LogBroadcaster(), MetricsService(), app)
+    return app
+
+
+async def run(mode: str, total: int, concurrency: int) -> float:
+    app = create_app(mode)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and model caches
+        for i in range(50):
+            await client.get(f"/items/{i}")
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                await client.get(f"/items/{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    baseline = None
+    for mode, label in (("none", "no tracer"), ("http", "http middleware"), ("asgi", "asgi middleware")):
+        rps = asyncio.run(run(mode, args.requests, args.concurrency))
+        baseline = baseline or rps
+        print(f"{label:<18} {rps:>10.0f} req/s  ({rps / baseline:.0%} of baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark PostgreSQL ingestion throughput.
+
+Measures rows/sec written to a PostgreSQL database for three paths: one
+``save_log`` call per row, ``save_logs`` with multi-row INSERTs and
+``save_logs`` with COPY FROM STDIN.
+
+The rows are written to the ``requests`` table of the given database, so point it
+at a scratch database.
+
+Usage:
+    python benchmarks/postgresql_ingest.py --database supertracer_bench [--rows 20000] [--batch-size 500]
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from supertracer.connectors.postgresql import PostgreSQLConnector
+from supertracer.types.logs import Log
+
+
+def create_log(i: int) -> Log:
+    return {
+        "id": 0,
+        "content": f"GET /items/{i} 200",
+        "timestamp": datetime.now(),
+        "method": "GET",
+        "path": f"/items/{i}",
+        "url": f"http://bench/items/{i}",
+        "headers": {"host": "bench", "user-agent": "benchmark", "accept": "*/*"},
+        "log_level": "HTTP",
+        "status_code": 200,
+        "duration_ms": 3,
+        "client_ip": "127.0.0.1",
+        "user_agent": "benchmark",
+        "request_query": {},
+        "request_body": None,
+        "response_headers": {"content-type": "application/json"},
+        "response_body": {"item_id": i, "name": "benchmark", "tags": ["a", "b", "c"]},
+        "response_size_bytes": 60,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+
+def run(connector: PostgreSQLConnector, mode: str, rows: int, batch_size: int) -> float:
+    logs = [create_log(i) for i in range(rows)]
+    start = time.perf_counter()
+    if mode == "save_log":
+        for log in logs:
+            connector.save_log(log)
+    else:
+        for offset in range(0, rows, batch_size):
+            connector.save_logs(logs[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PGPORT", "5432")))
+    parser.add_argument("--database", default=os.environ.get("PGDATABASE", "supertracer_bench"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "postgres"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", ""))
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    baseline = None
+    for mode, ingest_mode, label in (
+        ("save_log", "insert", "save_log per row"),
+        ("save_logs", "insert", "save_logs INSERT"),
+        ("save_logs", "copy", "save_logs COPY"),
+    ):
+        connector = PostgreSQLConnector(
+            host=args.host,
+            port=args.port,
+            database=args.database,
+            user=args.user,
+            password=args.password,
+            ingest_mode=ingest_mode,
+        )
+        connector.connect()
+        connector.init_db()
+        rows_per_second = run(connector, mode, args.rows, args.batch_size)
+        connector.disconnect()
+
+        baseline = baseline or rows_per_second
+        print(f"{label:<18} {rows_per_second:>10.0f} rows/s  ({rows_per_second / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
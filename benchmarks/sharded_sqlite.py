@@ -0,0 +1,86 @@
+"""Benchmark ShardedSQLiteConnector against SQLiteConnector.
+
+Writes the same synthetic request logs, spread over a number of days, to a
+ShardedSQLiteConnector with one shard per day and to a single-file
+SQLiteConnector. Reports the write throughput, the time taken by a few
+``fetch_logs`` calls, and the time retention takes to delete the older half of
+the logs along with the disk space left afterwards.
+
+Usage:
+    python benchmarks/sharded_sqlite.py [--rows 200000] [--days 8] [--directory /tmp/supertracer-shards-bench]
+"""
+import argparse
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from supertracer.connectors.sharded_sqlite import ShardedSQLiteConnector
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.filters import LogFilters
+from supertracer.types.options import RetentionOptions
+from memory_connector import create_log
+
+
+def disk_usage(paths):
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=8)
+    parser.add_argument("--directory", default="/tmp/supertracer-shards-bench")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.directory, ignore_errors=True)
+    os.makedirs(args.directory)
+    now = datetime.now()
+    start = now - timedelta(days=args.days)
+    step = args.days * 86400 * 1000 / args.rows
+
+    db_path = os.path.join(args.directory, "logs.db")
+    shard_directory = os.path.join(args.directory, "shards")
+    connectors = {
+        "sharded": ShardedSQLiteConnector(directory=shard_directory, shard_by="day"),
+        "single file": SQLiteConnector(db_path=db_path),
+    }
+    for name, connector in connectors.items():
+        connector.connect()
+        connector.init_db()
+        started = time.perf_counter()
+        for offset in range(0, args.rows, 1000):
+            batch = []
+            for i in range(offset, min(offset + 1000, args.rows)):
+                log = create_log(i, start)
+                log["timestamp"] = start + timedelta(milliseconds=i * step)
+                batch.append(log)
+            connector.save_logs(batch)
+        print(f"{'write, ' + name:<36} {args.rows / (time.perf_counter() - started):>10.0f} rows/s")
+
+    for label, filters in (
+        ("newest page", LogFilters(limit=50)),
+        ("one hour, two days ago", LogFilters(start_date=now - timedelta(days=2), end_date=now - timedelta(days=2, hours=-1), limit=50)),
+        ("status_code=500", LogFilters(status_code="500", limit=50)),
+    ):
+        for name, connector in connectors.items():
+            started = time.perf_counter()
+            for _ in range(5):
+                connector.fetch_logs(filters)
+            print(f"{label + ', ' + name:<36} {(time.perf_counter() - started) / 5 * 1000:>10.1f} ms")
+
+    retention = RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=args.days * 12)
+    for name, connector in connectors.items():
+        paths = [os.path.join(shard_directory, f) for f in os.listdir(shard_directory)] if name == "sharded" else [db_path, db_path + "-wal"]
+        before = disk_usage(paths)
+        started = time.perf_counter()
+        connector.cleanup(retention)
+        elapsed = time.perf_counter() - started
+        if name == "sharded":
+            paths = [os.path.join(shard_directory, f) for f in os.listdir(shard_directory)]
+        print(f"{'cleanup, ' + name:<36} {elapsed * 1000:>10.1f} ms, {before / 1e6:.0f} MB -> {disk_usage(paths) / 1e6:.0f} MB")
+        connector.disconnect()
+    shutil.rmtree(args.directory)
+
+
+if __name__ == "__main__":
+    main()
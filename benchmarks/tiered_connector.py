@@ -0,0 +1,79 @@
+"""Benchmark TieredConnector against the SQLiteConnector it spills to.
+
+Writes the same synthetic request logs to a TieredConnector, holding the
+newest logs in memory in front of a SQLite file, and to a SQLiteConnector
+alone. Reports the time ``save_logs`` takes for each, then the time taken by
+the dashboard's newest page, a window of the last minute, and a page older
+than memory holds, which the tiered connector merges with SQLite.
+
+Usage:
+    python benchmarks/tiered_connector.py [--rows 100000] [--capacity 20000] [--directory /tmp/supertracer-tiered-bench]
+"""
+import argparse
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.connectors.tiered import TieredConnector
+from supertracer.types.filters import LogFilters
+from memory_connector import create_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--capacity", type=int, default=20000)
+    parser.add_argument("--directory", default="/tmp/supertracer-tiered-bench")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.directory, ignore_errors=True)
+    os.makedirs(args.directory)
+    now = datetime.now()
+    start = now - timedelta(hours=1)
+    step = 3600 * 1000 / args.rows
+
+    connectors = {
+        "tiered": TieredConnector(
+            cold=SQLiteConnector(os.path.join(args.directory, "cold.db")),
+            node_id=1,
+            hot=MemoryConnector(capacity=args.capacity),
+        ),
+        "sqlite": SQLiteConnector(os.path.join(args.directory, "logs.db")),
+    }
+    for name, connector in connectors.items():
+        connector.connect()
+        connector.init_db()
+        elapsed = 0.0
+        for offset in range(0, args.rows, 100):
+            batch = []
+            for i in range(offset, min(offset + 100, args.rows)):
+                log = create_log(i, start)
+                log["timestamp"] = start + timedelta(milliseconds=i * step)
+                batch.append(log)
+            started = time.perf_counter()
+            connector.save_logs(batch)
+            elapsed += time.perf_counter() - started
+        print(f"{'save_logs, ' + name:<32} {elapsed / (args.rows / 100) * 1000:>10.3f} ms per 100 logs")
+    connectors["tiered"].flush()
+
+    for label, filters in (
+        ("newest page", LogFilters(limit=50)),
+        ("last minute", LogFilters(start_date=now - timedelta(minutes=1), limit=50)),
+        ("status_code=500", LogFilters(status_code="500", limit=50)),
+        ("older than memory", LogFilters(end_date=start + timedelta(minutes=10), limit=50)),
+    ):
+        for name, connector in connectors.items():
+            started = time.perf_counter()
+            for _ in range(20):
+                connector.fetch_logs(filters)
+            print(f"{label + ', ' + name:<32} {(time.perf_counter() - started) / 20 * 1000:>10.2f} ms")
+
+    for connector in connectors.values():
+        connector.disconnect()
+    shutil.rmtree(args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,20 @@ from .types import (
     ApiOptions,
     RetentionOptions,
     CaptureOptions,
+    WriterOptions,
     Log,
     LogFilters,
 )
 from .connectors import (
     BaseConnector,
     MemoryConnector,
+    FileConnector,
     SQLConnector,
     SQLiteConnector,
+    ShardedSQLiteConnector,
     PostgreSQLConnector,
+    AsyncPostgreSQLConnector,
+    TieredConnector,
 )
 
 __all__ = [
@@ -27,11 +32,16 @@ __all__ = [
     "ApiOptions",
     "RetentionOptions",
     "CaptureOptions",
+    "WriterOptions",
     "Log",
     "LogFilters",
     "BaseConnector",
     "MemoryConnector",
+    "FileConnector",
     "SQLConnector",
     "SQLiteConnector",
+    "ShardedSQLiteConnector",
     "PostgreSQLConnector",
+    "AsyncPostgreSQLConnector",
+    "TieredConnector",
 ]
\ No newline at end of file
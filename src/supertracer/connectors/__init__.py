@@ -1,13 +1,21 @@
 from .memory import MemoryConnector
+from .file import FileConnector
 from .sql import SQLConnector
 from .base import BaseConnector
 from .sqlite import SQLiteConnector
+from .sharded_sqlite import ShardedSQLiteConnector
 from .postgresql import PostgreSQLConnector
+from .async_postgresql import AsyncPostgreSQLConnector
+from .tiered import TieredConnector
 
 __all__ = [
     "MemoryConnector",
+    "FileConnector",
     "SQLConnector",
     "BaseConnector",
     "SQLiteConnector",
+    "ShardedSQLiteConnector",
     "PostgreSQLConnector",
+    "AsyncPostgreSQLConnector",
+    "TieredConnector",
 ]
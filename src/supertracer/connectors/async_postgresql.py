@@ -0,0 +1,238 @@
+import asyncio
+import itertools
+import re
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, Tuple, TypeVar
+from supertracer.connectors.postgresql import PostgreSQLConnector
+from supertracer.connectors.queries import postgresql as queries
+from supertracer.types.filters import LogFilters
+from supertracer.types.logs import Log
+
+T = TypeVar("T")
+
+# A statement takes at most 32767 parameters, 21 per row
+MAX_ROWS_PER_INSERT = 1000
+
+
+def to_asyncpg(query: str) -> str:
+    """Rewrite psycopg2 style %s placeholders as asyncpg's $1, $2, ... placeholders."""
+    numbers = itertools.count(1)
+    return re.sub(r"%s", lambda _: f"${next(numbers)}", query)
+
+
+def expand_values(query: str, rows: List[tuple]) -> Tuple[str, tuple]:
+    """Expand the ``VALUES %s`` of a multi-row statement into one placeholder group per row."""
+    group = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+    values = ", ".join([group] * len(rows))
+    return query.replace("VALUES %s", f"VALUES {values}"), tuple(itertools.chain.from_iterable(rows))
+
+
+def _import_asyncpg() -> Any:
+    try:
+        import asyncpg
+    except ImportError as exc:
+        raise ImportError(
+            "AsyncPostgreSQLConnector requires asyncpg. Install it with: pip install 'supertracer[asyncpg]'"
+        ) from exc
+    return asyncpg
+
+
+class AsyncPostgreSQLConnector(PostgreSQLConnector):
+    """PostgreSQL connector built on asyncpg.
+
+    Takes the same options as PostgreSQLConnector and uses the same schema. The
+    asyncpg pool runs on an event loop in a background thread owned by the
+    connector: the async methods await it from the app's event loop without
+    blocking it, and the sync methods used by the write-behind queue and retention
+    cleanup wait on it from their own threads.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self._asyncpg = _import_asyncpg()
+        super().__init__(**kwargs)
+        self._errors = (self._asyncpg.PostgresError,)
+        self._async_pool: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    def connect(self) -> None:
+        """Start the connector's event loop and open the asyncpg pool."""
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="supertracer-asyncpg", daemon=True)
+        self._loop_thread.start()
+        self._async_pool = self._call(self._open_pool())
+
+    async def _open_pool(self) -> Any:
+        server_settings = {"statement_timeout": str(self.statement_timeout_ms)} if self.statement_timeout_ms else None
+        return await self._asyncpg.create_pool(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password or None,
+            ssl=self.sslmode,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            timeout=self.connect_timeout,
+            server_settings=server_settings,
+        )
+
+    def disconnect(self) -> None:
+        """Close the pool and stop the connector's event loop."""
+        if self._async_pool is not None:
+            self._call(self._async_pool.close())
+            self._async_pool = None
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._loop_thread is not None:
+                self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+
+    def _schedule(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        if self._loop is None:
+            coro.close()
+            raise ConnectionError("Database is not connected")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _call(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the connector's loop and wait for the result."""
+        return self._schedule(coro).result()
+
+    async def _submit(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the connector's loop and await the result from the caller's loop."""
+        return await asyncio.wrap_future(self._schedule(coro))
+
+    async def _run_async(self, operation: Callable[[Any], Awaitable[T]], idempotent: bool = False) -> T:
+        """Run ``operation`` with a pooled connection in its own transaction, retrying once if the connection dropped.
+
+        Only idempotent operations are retried once they were sent, as in PostgreSQLConnector._run.
+        """
+        if self._async_pool is None:
+            raise ConnectionError("Database is not connected")
+        sent = False
+
+        async def tracked(connection: Any) -> T:
+            nonlocal sent
+            sent = True
+            return await operation(connection)
+
+        try:
+            return await self._attempt_async(tracked)
+        except (self._asyncpg.PostgresConnectionError, self._asyncpg.InterfaceError, OSError):
+            if sent and not idempotent:
+                raise
+            # The pool replaces broken connections, try again on a new one
+            return await self._attempt_async(operation)
+
+    async def _attempt_async(self, operation: Callable[[Any], Awaitable[T]]) -> T:
+        async with self._async_pool.acquire() as connection:
+            async with connection.transaction():
+                return await operation(connection)
+
+    async def _execute(self, query: str, params: tuple = ()) -> Any:
+        statement = to_asyncpg(query)
+
+        async def operation(connection):
+            # For INSERTs that return ID, we need to fetch it
+            if query.strip().upper().startswith("INSERT") and "RETURNING" in query.upper():
+                return await connection.fetchval(statement, *params)
+            await connection.execute(statement, *params)
+            return None
+
+        return await self._run_async(operation)
+
+    async def _query(self, query: str, params: tuple = ()) -> list:
+        statement = to_asyncpg(query)
+
+        async def operation(connection):
+            # Plain tuples, like the rows returned by psycopg2
+            return [tuple(row) for row in await connection.fetch(statement, *params)]
+
+        return await self._run_async(operation, idempotent=True)
+
+    def execute(self, query: str, params: tuple = ()) -> Any:
+        """Execute a query without returning results (INSERT, UPDATE, DELETE, DDL)."""
+        return self._call(self._execute(query, params))
+
+    def query(self, query: str, params: tuple = ()) -> list:
+        """Execute a query and return the results (SELECT)."""
+        return self._call(self._query(query, params))
+
+    def commit_transaction(self) -> None:
+        """Each statement is committed in its own transaction, so there is nothing left to commit here."""
+        if self._async_pool is None:
+            raise ConnectionError("Database is not connected")
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries in a single transaction."""
+        if not logs:
+            return []
+        self._extend_partitions(logs)
+        return self._call(self._save_logs(logs))
+
+    async def save_log_async(self, log: Log) -> int:
+        """Save a log entry without blocking the event loop."""
+        return (await self.save_logs_async([log]))[0]
+
+    async def save_logs_async(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries in a single transaction without blocking the event loop."""
+        if not logs:
+            return []
+        if self.partition_by:
+            # Runs DDL once per partition period, off the event loop
+            await asyncio.to_thread(self._extend_partitions, logs)
+        return await self._submit(self._save_logs(logs))
+
+    async def _save_logs(self, logs: List[Log]) -> List[int]:
+        async def operation(connection) -> List[int]:
+            if self.ingest_mode == "copy":
+                return await self._copy_logs_async(connection, logs)
+            log_ids: List[int] = []
+            for offset in range(0, len(logs), MAX_ROWS_PER_INSERT):
+                chunk = logs[offset:offset + MAX_ROWS_PER_INSERT]
+                if all(log.get('id') for log in chunk):
+                    insert_query = queries.INSERT_LOGS_WITH_ID
+                    rows = [self._insert_params(log, self.split_payloads) + (log['id'],) for log in chunk]
+                else:
+                    insert_query = queries.INSERT_LOGS
+                    rows = [self._insert_params(log, self.split_payloads) for log in chunk]
+                statement, params = expand_values(insert_query, rows)
+                log_ids.extend(row[0] for row in await connection.fetch(to_asyncpg(statement), *params))
+            if self.split_payloads:
+                payloads = [self._payload_params(log, log_id) for log, log_id in zip(logs, log_ids)]
+                for offset in range(0, len(payloads), MAX_ROWS_PER_INSERT):
+                    statement, params = expand_values(queries.INSERT_PAYLOADS, payloads[offset:offset + MAX_ROWS_PER_INSERT])
+                    await connection.execute(to_asyncpg(statement), *params)
+            return log_ids
+
+        return await self._run_async(operation)
+
+    async def _copy_logs_async(self, connection: Any, logs: List[Log]) -> List[int]:
+        """Stream a batch into the requests table with a binary COPY, reserving IDs from the sequence first."""
+        missing = sum(1 for log in logs if not log.get('id'))
+        reserved: List[int] = []
+        if missing:
+            rows = await connection.fetch(to_asyncpg(queries.RESERVE_IDS), missing)
+            reserved = sorted(row[0] for row in rows)
+        reserved_ids = iter(reserved)
+        log_ids = [log.get('id') or next(reserved_ids) for log in logs]
+
+        records = [self._insert_params(log, self.split_payloads) + (log_id,) for log, log_id in zip(logs, log_ids)]
+        await connection.copy_records_to_table("requests", records=records, columns=queries.COPY_LOG_COLUMNS)
+        if self.split_payloads:
+            payloads = [self._payload_params(log, log_id) for log, log_id in zip(logs, log_ids)]
+            await connection.copy_records_to_table("request_payloads", records=payloads, columns=queries.COPY_PAYLOAD_COLUMNS)
+        return log_ids
+
+    async def fetch_logs_async(self, filters: Optional[LogFilters] = None) -> List[Log]:
+        """Fetch log entries without blocking the event loop."""
+        query, params = self._build_fetch_logs_query(filters or LogFilters())
+        rows = await self._submit(self._query(query, params))
+        return [self._summary_from_row(row) for row in rows]
+
+    async def fetch_log_async(self, log_id: int) -> Optional[Log]:
+        """Fetch a single log entry by ID without blocking the event loop."""
+        rows = await self._submit(self._query(queries.FETCH_LOG_BY_ID, (log_id,)))
+        return self._log_from_row(rows[0]) if rows else None
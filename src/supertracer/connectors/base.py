@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import asyncio
 from typing import List, Optional
 from supertracer.types.logs import Log
 from supertracer.types.filters import LogFilters
@@ -11,6 +12,14 @@ class BaseConnector(ABC):
         """Save a log entry to the connector's storage. Returns the log ID."""
         pass
 
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries. Returns the log IDs in the same order.
+        
+        The default implementation saves the logs one at a time. Connectors with a
+        native bulk insert path should override it.
+        """
+        return [self.save_log(log) for log in logs]
+
     @abstractmethod
     def fetch_logs(
         self, 
@@ -43,3 +52,32 @@ class BaseConnector(ABC):
     def cleanup(self, retention_options: RetentionOptions) -> int:
         """Clean up old logs based on retention options. Returns number of deleted records."""
         pass
+
+    def shutdown(self) -> None:
+        """Called when the app shuts down, once pending logs are saved. Does nothing by default."""
+        pass
+
+    async def save_log_async(self, log: Log) -> int:
+        """Async variant of save_log.
+
+        The default implementations of the async methods run the sync method in a
+        worker thread, so the event loop keeps serving requests while the connector
+        waits on storage. Connectors with a native async driver override them.
+        """
+        return await asyncio.to_thread(self.save_log, log)
+
+    async def save_logs_async(self, logs: List[Log]) -> List[int]:
+        """Async variant of save_logs."""
+        return await asyncio.to_thread(self.save_logs, logs)
+
+    async def fetch_logs_async(self, filters: Optional[LogFilters] = None) -> List[Log]:
+        """Async variant of fetch_logs."""
+        return await asyncio.to_thread(self.fetch_logs, filters)
+
+    async def fetch_log_async(self, log_id: int) -> Optional[Log]:
+        """Async variant of fetch_log."""
+        return await asyncio.to_thread(self.fetch_log, log_id)
+
+    async def cleanup_async(self, retention_options: RetentionOptions) -> int:
+        """Async variant of cleanup."""
+        return await asyncio.to_thread(self.cleanup, retention_options)
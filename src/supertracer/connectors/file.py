@@ -0,0 +1,542 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import json
+import mmap
+import operator
+import os
+import re
+import struct
+import threading
+import zlib
+
+from supertracer.connectors.base import BaseConnector
+from supertracer.connectors.memory import PAYLOAD_FIELDS, status_matcher
+from supertracer.types.logs import Log
+from supertracer.types.filters import LogFilters, decode_cursor
+from supertracer.types.options import RetentionOptions
+
+# An index entry is the (id, timestamp, offset) of a record, in native byte order
+INDEX_ENTRY = struct.Struct("=qdq")
+# A binary record is the length and CRC32 of its body and where its list fields end, then the JSON encoded log
+RECORD_HEADER = struct.Struct("<III")
+FORMATS = {'binary': 'bin', 'ndjson': 'ndjson'}
+SEGMENT_NAME = re.compile(r"segment-(\d{8})\.(bin|ndjson)$")
+# json.dumps builds a new encoder on every call made with options
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+PAYLOAD_FIELD_SET = frozenset(PAYLOAD_FIELDS)
+
+
+def encode_record(log: Log, log_id: int, timestamp: float, binary: bool) -> bytes:
+    """Encode a log as one record of a segment file.
+
+    The body is a single JSON object with the fields fetch_logs lists first and
+    the payload fields after them, so binary records can be listed by decoding
+    only the start of their body.
+    """
+    listed = {field: value for field, value in log.items() if field not in PAYLOAD_FIELD_SET}
+    listed['id'] = log_id
+    listed['timestamp'] = timestamp
+    payload = {field: value for field, value in log.items() if field in PAYLOAD_FIELD_SET and value is not None}
+    head = ENCODER.encode(listed).encode()
+    # Splice the two objects into one, dropping the braces between them
+    body = head
+    if payload:
+        body = head[:-1] + b"," + ENCODER.encode(payload).encode()[1:]
+    if binary:
+        return RECORD_HEADER.pack(len(body), zlib.crc32(body), len(head) - 1) + body
+    # JSON escapes newlines inside strings, so a line is always one record
+    return body + b"\n"
+
+
+def decode_record(record: bytes, binary: bool, summary: bool = False) -> Dict[str, Any]:
+    """Decode a record as stored, with the timestamp as a number.
+
+    With ``summary``, binary records only decode the fields listed by fetch_logs.
+    """
+    if binary and summary:
+        _, _, head_length = RECORD_HEADER.unpack_from(record)
+        return json.loads(record[RECORD_HEADER.size:RECORD_HEADER.size + head_length] + b"}")
+    return json.loads(record[RECORD_HEADER.size:] if binary else record)
+
+
+def to_log(record: Dict[str, Any], summary: bool = False) -> Log:
+    """Turn a decoded record into a log, with ``summary`` to leave out the payload as fetch_logs does."""
+    record['timestamp'] = datetime.fromtimestamp(record['timestamp'])
+    # Logs saved without the optional fields still read back with all of them
+    for field in PAYLOAD_FIELDS:
+        if summary:
+            record[field] = None
+        else:
+            record.setdefault(field, None)
+    return record  # type: ignore[return-value]
+
+
+def scan_records(data: bytes, binary: bool) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """Yield the (start, end, log) of each complete record, stopping at the first torn or corrupt one."""
+    offset = 0
+    while offset < len(data):
+        if binary:
+            if offset + RECORD_HEADER.size > len(data):
+                return
+            length, crc, _ = RECORD_HEADER.unpack_from(data, offset)
+            end = offset + RECORD_HEADER.size + length
+            body = data[offset + RECORD_HEADER.size:end]
+            if len(body) < length or zlib.crc32(body) != crc:
+                return
+        else:
+            newline = data.find(b"\n", offset)
+            if newline == -1:
+                return
+            end = newline + 1
+            body = data[offset:newline]
+        try:
+            yield offset, end, json.loads(body)
+        except ValueError:
+            return
+        offset = end
+
+
+class Segment:
+    """One data file of a FileConnector and the index sidecar next to it.
+
+    The index of the segment being written is kept in arrays. Once the segment is
+    sealed its index is memory-mapped instead, so sealed segments cost no memory
+    beyond the pages the reads touch.
+    """
+
+    def __init__(self, directory: str, number: int, extension: str):
+        self.number = number
+        self.binary = extension == 'bin'
+        self.data_path = os.path.join(directory, f"segment-{number:08d}.{extension}")
+        self.index_path = os.path.join(directory, f"segment-{number:08d}.idx")
+        self.ids: Any = array('q')
+        self.timestamps: Any = array('d')
+        self.offsets: Any = array('q')
+        self.size = 0
+        self.min_id = self.max_id = 0
+        self.min_timestamp = self.max_timestamp = 0.0
+        self.sorted = True
+        self._map: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+        self._reader: Optional[int] = None
+        self._data_writer: Optional[int] = None
+        self._index_writer: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def open(self, writable: bool, recover: bool) -> None:
+        """Load the index, with ``recover`` to first repair it after a write that was cut short."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        self._reader = os.open(self.data_path, os.O_RDONLY | os.O_CREAT, 0o644)
+        self.size = os.fstat(self._reader).st_size
+        if recover or not os.path.exists(self.index_path):
+            entries = self._recover()
+        else:
+            entries = []
+        if not writable:
+            self.seal()
+            return
+        self._data_writer = os.open(self.data_path, flags, 0o644)
+        self._index_writer = os.open(self.index_path, flags, 0o644)
+        for log_id, timestamp, offset in entries:
+            self._track(log_id, timestamp, offset)
+
+    def _recover(self) -> List[Tuple[int, float, int]]:
+        """Drop index entries past the end of the data, index the records written after them and cut off a torn tail.
+
+        Returns the index entries.
+        """
+        try:
+            with open(self.index_path, "rb") as file:
+                index = file.read()
+        except FileNotFoundError:
+            index = b""
+        entries = list(INDEX_ENTRY.iter_unpack(index[:len(index) - len(index) % INDEX_ENTRY.size]))
+        while entries and entries[-1][2] >= self.size:
+            entries.pop()
+        # The data is written before the index, so the records after the last indexed one are the only ones to check
+        start = entries[-1][2] if entries else 0
+        with open(self.data_path, "rb") as file:
+            file.seek(start)
+            records = list(scan_records(file.read(), self.binary))
+        if entries and not records:
+            entries.pop()
+        end = start + records[-1][1] if records else start
+        entries.extend((int(log['id']), float(log['timestamp']), start + offset) for offset, _, log in records[1 if entries else 0:])
+        if end < self.size:
+            os.truncate(self.data_path, end)
+            self.size = end
+        repaired = b"".join(INDEX_ENTRY.pack(*entry) for entry in entries)
+        if repaired != index:
+            with open(self.index_path, "wb") as file:
+                file.write(repaired)
+        return entries
+
+    def _track(self, log_id: int, timestamp: float, offset: int) -> None:
+        if self.ids:
+            self.min_id = min(self.min_id, log_id)
+            self.max_id = max(self.max_id, log_id)
+            self.min_timestamp = min(self.min_timestamp, timestamp)
+            self.sorted = self.sorted and timestamp >= self.max_timestamp
+            self.max_timestamp = max(self.max_timestamp, timestamp)
+        else:
+            self.min_id = self.max_id = log_id
+            self.min_timestamp = self.max_timestamp = timestamp
+        self.ids.append(log_id)
+        self.timestamps.append(timestamp)
+        self.offsets.append(offset)
+
+    def append(self, records: List[Tuple[int, float, bytes]], fsync: bool) -> None:
+        """Append records with one write to the data file and one to the index."""
+        assert self._data_writer is not None and self._index_writer is not None
+        data = b"".join(record for _, _, record in records)
+        entries = bytearray()
+        offset = self.size
+        for log_id, timestamp, record in records:
+            entries += INDEX_ENTRY.pack(log_id, timestamp, offset)
+            offset += len(record)
+        os.write(self._data_writer, data)
+        if fsync:
+            os.fsync(self._data_writer)
+        os.write(self._index_writer, entries)
+        if fsync:
+            os.fsync(self._index_writer)
+        offset = self.size
+        for log_id, timestamp, record in records:
+            self._track(log_id, timestamp, offset)
+            offset += len(record)
+        self.size = offset
+
+    def seal(self) -> None:
+        """Stop writing to the segment and switch its index over to a memory map."""
+        for fd in (self._data_writer, self._index_writer):
+            if fd is not None:
+                os.close(fd)
+        self._data_writer = self._index_writer = None
+        count = os.path.getsize(self.index_path) // INDEX_ENTRY.size
+        if count == 0:
+            return
+        with open(self.index_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), count * INDEX_ENTRY.size, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        integers, floats = view.cast('q'), view.cast('d')
+        self._views = [view, integers, floats]
+        self.ids, self.timestamps, self.offsets = integers[0::3], floats[1::3], integers[2::3]
+        self._views.extend((self.ids, self.timestamps, self.offsets))
+        self.min_id, self.max_id = min(self.ids), max(self.ids)
+        self.min_timestamp, self.max_timestamp = min(self.timestamps), max(self.timestamps)
+        self.sorted = all(map(operator.le, self.timestamps[:-1], self.timestamps[1:]))
+
+    def close(self) -> None:
+        # The views have to go before the map they point into
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.ids, self.timestamps, self.offsets = array('q'), array('d'), array('q')
+        for fd in (self._reader, self._data_writer, self._index_writer):
+            if fd is not None:
+                os.close(fd)
+        self._reader = self._data_writer = self._index_writer = None
+
+    def delete(self) -> None:
+        self.close()
+        for path in (self.data_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def find(self, log_id: int) -> Optional[int]:
+        """Return the position of a log in the segment. IDs mostly grow, so bisect before scanning."""
+        if not self.ids or not self.min_id <= log_id <= self.max_id:
+            return None
+        position = bisect_left(self.ids, log_id)
+        if position < len(self.ids) and self.ids[position] == log_id:
+            return position
+        try:
+            return self.ids.tolist().index(log_id)
+        except ValueError:
+            return None
+
+    def read(self, position: int, summary: bool = False) -> Dict[str, Any]:
+        assert self._reader is not None
+        start = self.offsets[position]
+        end = self.offsets[position + 1] if position + 1 < len(self.offsets) else self.size
+        return decode_record(os.pread(self._reader, end - start, start), self.binary, summary)
+
+    def newest_first(self, lo: float, hi: float, cursor: Optional[Tuple[float, int]]) -> Iterator[Tuple[float, int, int]]:
+        """Yield the (timestamp, id, position) of the logs in [lo, hi) before the cursor, newest first."""
+        timestamps, ids = self.timestamps, self.ids
+        if not self.sorted:
+            entries = [entry for entry in zip(timestamps.tolist(), ids.tolist(), itertools.count()) if lo <= entry[0] < hi]
+            entries.sort(reverse=True)
+            yield from (entry for entry in entries if cursor is None or entry[:2] < cursor)
+            return
+
+        start = bisect_left(timestamps, lo) if lo > self.min_timestamp else 0
+        end = bisect_left(timestamps, hi) if hi <= self.max_timestamp else len(timestamps)
+        if cursor is not None:
+            # Logs at the cursor's own timestamp are told apart by ID below
+            end = min(end, bisect_right(timestamps, cursor[0], start, end))
+        position = end - 1
+        while position >= start:
+            # Logs with the same timestamp go by descending ID
+            timestamp = timestamps[position]
+            first = bisect_left(timestamps, timestamp, start, position)
+            for log_id, same in sorted(zip(ids[first:position + 1].tolist(), range(first, position + 1)), reverse=True):
+                if cursor is None or (timestamp, log_id) < cursor:
+                    yield timestamp, log_id, same
+            position = first - 1
+
+
+def log_matcher(filters: LogFilters) -> Callable[[Dict[str, Any]], bool]:
+    """Turn every filter but the time window and cursor into one check on a decoded record, applied the way MemoryConnector applies them."""
+    checks: List[Callable[[Dict[str, Any]], bool]] = []
+    if filters.status_code:
+        matches = status_matcher(filters.status_code)
+        checks.append(lambda log: log.get('status_code') is not None and matches(log['status_code']))
+    if filters.log_level and filters.log_level != 'All Levels':
+        level = filters.log_level
+        checks.append(lambda log: log.get('log_level') == level)
+    if filters.methods:
+        methods = set(filters.methods)
+        checks.append(lambda log: log.get('method') in methods)
+    # Latency, a missing duration counts as 0
+    min_latency, max_latency = filters.min_latency, filters.max_latency
+    if min_latency is not None:
+        checks.append(lambda log: (log.get('duration_ms') or 0) >= min_latency)
+    if max_latency is not None:
+        checks.append(lambda log: (log.get('duration_ms') or 0) <= max_latency)
+    if filters.has_error:
+        checks.append(lambda log: (log.get('status_code') or 0) >= 400 or bool(log.get('error_message')))
+    if filters.search_text:
+        search_text = filters.search_text.lower()
+        checks.append(lambda log: search_text in (log.get('content') or "").lower())
+    if filters.endpoint:
+        endpoint = filters.endpoint.lower()
+        checks.append(lambda log: endpoint in (log.get('url') or "").lower())
+    header_pairs = filters.header_pairs()
+    if header_pairs:
+        checks.append(lambda log: all((log.get('headers') or {}).get(name) == value for name, value in header_pairs))
+    body_keys = filters.body_keys
+    if body_keys:
+        checks.append(lambda log: isinstance(log.get('request_body'), dict) and all(key in log['request_body'] for key in body_keys))
+    return lambda log: all(check(log) for check in checks)
+
+
+class FileConnector(BaseConnector):
+    """Connector that appends logs to rotating segment files, with no database.
+
+    Each batch of logs is appended to the current segment with one write, as
+    length-prefixed binary records or as NDJSON lines. Next to each segment, an
+    index file holds the (id, timestamp, offset) of its records; the indexes of
+    sealed segments are memory-mapped, and fetch_log and the time window of
+    fetch_logs seek through them, so only the records a page shows are read and
+    decoded. Retention deletes whole segments.
+
+    Args:
+        directory (str): Directory holding the segment files.
+        format (str): 'binary' for length-prefixed records with a CRC, or 'ndjson' for one JSON object per line.
+        segment_max_bytes (int): Size at which the current segment is sealed and a new one started. A batch is never split between segments.
+        fsync (bool): Flush each batch to disk before returning, surviving power loss as well as crashes.
+    """
+
+    def __init__(
+        self,
+        directory: str = "supertracer_logs",
+        format: Literal['binary', 'ndjson'] = 'binary',
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = False,
+    ):
+        if format not in FORMATS:
+            raise ValueError("format must be 'binary' or 'ndjson'")
+        if segment_max_bytes < 1:
+            raise ValueError("segment_max_bytes must be at least 1")
+        self.directory = directory
+        self.format = format
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self._segments: List[Segment] = []
+        self._active: Optional[Segment] = None
+        self._next_number = 1
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def connect(self) -> None:
+        """Open the segments in the directory, writing on after the newest one if it is in this format."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for name in os.listdir(self.directory):
+                match = SEGMENT_NAME.match(name)
+                if match:
+                    found.append((int(match.group(1)), match.group(2)))
+            found.sort()
+            for number, extension in found:
+                last = number == found[-1][0]
+                writable = last and extension == FORMATS[self.format]
+                segment = Segment(self.directory, number, extension)
+                try:
+                    # Only the newest segment can hold a torn write
+                    segment.open(writable=writable, recover=last)
+                except (OSError, ValueError) as exc:
+                    print(f"SuperTracer Error: {exc}")
+                    segment.close()
+                    continue
+                self._segments.append(segment)
+                if writable:
+                    self._active = segment
+                if len(segment):
+                    self._next_id = max(self._next_id, segment.max_id + 1)
+            if found:
+                self._next_number = found[-1][0] + 1
+
+    def disconnect(self) -> None:
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            self._active = None
+
+    def init_db(self) -> None:
+        """Nothing to create, segments are created on the first write."""
+        pass
+
+    def save_log(self, log: Log) -> int:
+        return self.save_logs([log])[0]
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Append a batch of logs to the current segment, starting a new one when it is full."""
+        if not logs:
+            return []
+        binary = self.format == 'binary'
+        with self._lock:
+            records = []
+            for log in logs:
+                # Keep an ID generated in-process, otherwise assign the next one
+                log_id = log.get('id') or self._next_id
+                self._next_id = max(self._next_id, log_id + 1)
+                timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else float(log['timestamp'])
+                records.append((log_id, timestamp, encode_record(log, log_id, timestamp, binary)))
+            segment = self._active or self._new_segment()
+            segment.append(records, self.fsync)
+            if segment.size >= self.segment_max_bytes:
+                segment.seal()
+                self._active = None
+            return [log_id for log_id, _, _ in records]
+
+    def _new_segment(self) -> Segment:
+        segment = Segment(self.directory, self._next_number, FORMATS[self.format])
+        segment.open(writable=True, recover=False)
+        self._next_number += 1
+        self._segments.append(segment)
+        self._active = segment
+        return segment
+
+    def fetch_logs(self, filters: Optional[LogFilters] = None) -> List[Log]:
+        """Fetch log entries from the segments with filtering.
+
+        The logs of each segment inside the time window are found through its
+        index, and the segments are merged newest first, only opening a segment
+        once the merge reaches its newest log. Each candidate is read and checked
+        against the remaining filters until the page is full.
+        """
+        filters = filters or LogFilters()
+        lo = filters.start_date.timestamp() if filters.start_date and filters.start_date != datetime.min else float('-inf')
+        hi = filters.end_date.timestamp() if filters.end_date else float('inf')
+        cursor = None
+        if filters.cursor:
+            cursor_timestamp, cursor_id = decode_cursor(filters.cursor)
+            cursor = (cursor_timestamp.timestamp(), cursor_id)
+        matches = log_matcher(filters)
+
+        with self._lock:
+            pending = sorted(
+                (s for s in self._segments if len(s) and s.max_timestamp >= lo and s.min_timestamp < hi),
+                key=lambda s: s.max_timestamp,
+                reverse=True,
+            )
+            filtered_logs: List[Log] = []
+            # Only the header and body_keys filters need the payload
+            summary = not (filters.header_values or filters.body_keys)
+            for segment, position in self._merge(pending, lo, hi, cursor):
+                record = segment.read(position, summary)
+                if matches(record):
+                    filtered_logs.append(to_log(record, summary=True))
+                    if len(filtered_logs) >= filters.limit:
+                        break
+            return filtered_logs
+
+    def _merge(self, pending: List[Segment], lo: float, hi: float, cursor: Optional[Tuple[float, int]]) -> Iterator[Tuple[Segment, int]]:
+        """Merge the segments newest first. ``pending`` is sorted by newest log, so a segment joins the merge when the next log to yield is no newer than its newest one."""
+        heap: List[Tuple[float, int, int, Iterator[Tuple[float, int, int]], Segment, int]] = []
+        order = itertools.count()
+
+        def push(segment: Segment, entries: Iterator[Tuple[float, int, int]]) -> None:
+            for timestamp, log_id, position in entries:
+                heapq.heappush(heap, (-timestamp, -log_id, next(order), entries, segment, position))
+                return
+
+        remaining = iter(pending)
+        next_segment = next(remaining, None)
+        while True:
+            while next_segment is not None and (not heap or next_segment.max_timestamp >= -heap[0][0]):
+                push(next_segment, next_segment.newest_first(lo, hi, cursor))
+                next_segment = next(remaining, None)
+            if not heap:
+                return
+            _, _, _, entries, segment, position = heapq.heappop(heap)
+            yield segment, position
+            push(segment, entries)
+
+    def fetch_log(self, log_id: int) -> Optional[Log]:
+        """Fetch a single log entry by ID."""
+        with self._lock:
+            for segment in reversed(self._segments):
+                position = segment.find(log_id)
+                if position is not None:
+                    return to_log(segment.read(position))
+            return None
+
+    def cleanup(self, retention_options: RetentionOptions) -> int:
+        """Clean up old logs by deleting whole segments.
+
+        A segment goes once all of its logs are older than the cutoff, or while
+        the segments after it still hold max_records logs, so up to a segment more
+        than max_records may be kept.
+        """
+        if not retention_options.enabled:
+            return 0
+
+        with self._lock:
+            deleted = 0
+
+            # 1. Delete older than X hours
+            if retention_options.cleanup_older_than_hours > 0:
+                cutoff = (datetime.now() - timedelta(hours=retention_options.cleanup_older_than_hours)).timestamp()
+                for segment in [s for s in self._segments if len(s) and s.max_timestamp < cutoff]:
+                    deleted += self._delete(segment)
+
+            # 2. Enforce max_records, oldest segments first
+            if retention_options.max_records > 0:
+                total = sum(len(s) for s in self._segments)
+                while self._segments and total - len(self._segments[0]) >= retention_options.max_records:
+                    count = self._delete(self._segments[0])
+                    total -= count
+                    deleted += count
+
+            return deleted
+
+    def _delete(self, segment: Segment) -> int:
+        count = len(segment)
+        segment.delete()
+        self._segments.remove(segment)
+        if segment is self._active:
+            self._active = None
+        return count
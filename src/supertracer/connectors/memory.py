@@ -1,170 +1,1008 @@
-from typing import List, Optional, Dict, Set
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Dict, Set, Tuple
 from datetime import datetime, timedelta
+import gc
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
 import threading
+import zlib
 
 from supertracer.connectors.base import BaseConnector
+from supertracer.connectors.snapshot import SnapshotReader, SnapshotWriter
+from supertracer.connectors.sql import status_class_range
 from supertracer.types.logs import Log
-from supertracer.types.filters import LogFilters
+from supertracer.types.filters import LogFilters, decode_cursor
 from supertracer.types.options import RetentionOptions
 
+# Fields kept in the payload store, only read by fetch_log
+PAYLOAD_FIELDS = (
+    'headers', 'request_query', 'request_body', 'response_headers', 'response_body', 'stack_trace',
+    'client_ip', 'user_agent', 'request_size_bytes', 'request_body_truncated', 'response_size_bytes',
+)
+# Stored in the integer columns for a missing status code or duration
+MISSING = -1
+# The compression dictionary is taken from the start of the first payload
+ZDICT_SIZE = 4096
+# Number of logs fetch_logs filters at a time
+MIN_SCAN_CHUNK_SIZE = 256
+MAX_SCAN_CHUNK_SIZE = 8192
+# Evicted entries at the start of a posting list are removed once there are this many
+POSTINGS_COMPACT_SIZE = 1024
+# Column values of a slot that was allocated but not written yet
+EMPTY_ROW = (0, 0.0, MISSING, MISSING, 0, 0, None, None, None, None, None, 0, 0, 0)
+# Bytes each log takes whatever its content: its column entries plus its status, method and level postings
+ROW_BYTES = 8 + 8 + 2 + 4 + 2 + 2 + 5 * 8 + 4 + 4 + 1 + 3 * 8
+
+
+def status_matcher(status_code: str) -> Callable[[int], bool]:
+    """Return a function telling whether a status code matches a filter like '404', '5XX' or '2X0'."""
+    if status_code.isdigit():
+        code = int(status_code)
+        return lambda value: value == code
+    status_range = status_class_range(status_code)
+    if status_range is not None:
+        low, high = status_range
+        return lambda value: low <= value <= high
+    # Wildcards match any digit
+    pattern = re.compile(re.escape(status_code.lower()).replace('x', r'\d'))
+    return lambda value: pattern.fullmatch(str(value)) is not None
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the three-character substrings of a lowercased text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def newest_first(segments: List[Tuple[array, int, int]]) -> Iterator[int]:
+    """Merge posting list segments (entries, start, end) into one descending sequence."""
+    iterators = [map(entries.__getitem__, range(end - 1, start - 1, -1)) for entries, start, end in segments if end > start]
+    if len(iterators) == 1:
+        return iterators[0]
+    return heapq.merge(*iterators, reverse=True)
+
+
+class PostingLists:
+    """Sorted sequence numbers of the logs holding each value of a column.
+
+    Logs are evicted oldest first, so an evicted log is always the first live
+    entry of its list. Evicted entries are skipped with a per-list offset and
+    removed in bulk.
+    """
+
+    def __init__(self) -> None:
+        self._lists: Dict[Hashable, array] = {}
+        self._starts: Dict[Hashable, int] = {}
+
+    def keys(self) -> List[Hashable]:
+        return list(self._lists)
+
+    def items(self) -> Iterator[Tuple[Hashable, array, int]]:
+        """Yield each key with its list and the position of its first live entry."""
+        for key, entries in self._lists.items():
+            yield key, entries, self._starts[key]
+
+    def load(self, key: Hashable, entries: array, head: int) -> None:
+        """Set the list of a key read from a snapshot, skipping the entries before ``head``."""
+        start = bisect_left(entries, head)
+        if start < len(entries):
+            self._lists[key] = entries
+            self._starts[key] = start
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by the lists, their keys and the dicts holding them."""
+        size = sys.getsizeof(self._lists) + sys.getsizeof(self._starts)
+        for key, entries in self._lists.items():
+            size += sys.getsizeof(key) + sys.getsizeof(entries)
+        return size
+
+    def add(self, key: Hashable, seq: int) -> None:
+        entries = self._lists.get(key)
+        if entries is None:
+            entries = self._lists[key] = array('q')
+            self._starts[key] = 0
+        if not entries or entries[-1] < seq:
+            entries.append(seq)
+        else:
+            entries.insert(bisect_left(entries, seq, self._starts[key]), seq)
+
+    def remove_oldest(self, key: Hashable) -> None:
+        entries = self._lists[key]
+        start = self._starts[key] + 1
+        if start == len(entries):
+            del self._lists[key]
+            del self._starts[key]
+        elif start >= POSTINGS_COMPACT_SIZE and start * 2 >= len(entries):
+            del entries[:start]
+            self._starts[key] = 0
+        else:
+            self._starts[key] = start
+
+    def shift(self, key: Hashable, from_seq: int) -> None:
+        """Add one to the entries from ``from_seq`` on, after logs moved up a slot."""
+        entries = self._lists[key]
+        for i in range(len(entries) - 1, self._starts[key] - 1, -1):
+            if entries[i] < from_seq:
+                break
+            entries[i] += 1
+
+    def discard(self, keys: Iterable[Hashable], seq: int) -> None:
+        """Remove the entries of a log dropped before it reaches the head of the buffer."""
+        lists, starts = self._lists, self._starts
+        for key in keys:
+            entries = lists[key]
+            start = starts[key]
+            i = bisect_left(entries, seq, start)
+            if i == start:
+                self.remove_oldest(key)
+            elif i - start < len(entries) - i:
+                # Dropped logs are usually old ones, move the shorter side of the list over the entry
+                entries[start + 1:i + 1] = entries[start:i]
+                self.remove_oldest(key)
+            else:
+                del entries[i]
+
+    def segment(self, key: Hashable, lo: int, hi: int) -> Tuple[array, int, int]:
+        """Return the list for ``key`` with the positions of its entries in [lo, hi)."""
+        entries = self._lists.get(key)
+        if entries is None:
+            return array('q'), 0, 0
+        start = self._starts[key]
+        return entries, bisect_left(entries, lo, start), bisect_left(entries, hi, start)
+
+
 class MemoryConnector(BaseConnector):
     """In-memory implementation of the connector.
-    
-    Uses a list for storage and a dictionary for O(1) ID lookups.
+
+    Logs are kept in a fixed-capacity ring buffer, so once it is full every new log
+    replaces the oldest one. The fields shown in the log list are stored column by
+    column: numbers in typed arrays, methods and log levels as small integer codes
+    and paths as interned strings. Headers, bodies and the other detail fields are
+    only needed by fetch_log and are kept apart as compressed JSON.
+
+    The buffer is kept sorted by timestamp, so time ranges are found by bisecting,
+    and posting lists for status codes, methods and log levels let filtered
+    queries visit only the logs that match. With ``search_index``, text searches
+    are narrowed with a trigram index over content and URL.
+
+    With ``max_bytes`` set, every save frees memory as soon as the logs go over
+    budget: first the payloads of the oldest logs that are not errors, then the
+    payloads of errors, then whole logs that are not errors, and errors last.
+
+    With ``snapshot_path`` set, the logs are written to a binary snapshot file
+    periodically, on shutdown and on disconnect, and connect() reloads them.
     Thread-safe using RLock.
+
+    Args:
+        capacity (int): Maximum number of logs kept in memory.
+        search_index (bool): Index content and URL by trigram for search_text and endpoint filters. Roughly doubles the memory per log.
+        max_bytes (Optional[int]): Approximate memory budget for the stored logs, payloads and indexes.
+        snapshot_path (Optional[str]): File the logs are saved to and reloaded from across restarts.
+        snapshot_interval_seconds (float): Seconds between periodic snapshots, 0 to only save on shutdown.
     """
-    
-    def __init__(self):
-        self._logs: List[Log] = []
-        self._logs_by_id: Dict[int, Log] = {}
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        search_index: bool = False,
+        max_bytes: Optional[int] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval_seconds: float = 60.0,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if snapshot_interval_seconds < 0:
+            raise ValueError("snapshot_interval_seconds must be non-negative")
+        self.capacity = capacity
+        self.search_index = search_index
+        self.max_bytes = max_bytes
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval_seconds = snapshot_interval_seconds
         self._next_id: int = 1
         self._lock = threading.RLock()
-        
+        self._connected = False
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stop = threading.Event()
+        # (head, tail, used bytes) when the snapshot file was last written or read
+        self._snapshot_version: Optional[Tuple[int, int, int]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # Sequence numbers of the oldest log and of the next one. A log lives in slot seq % capacity
+        self._head = 0
+        self._tail = 0
+        self._ids = array('q')
+        self._timestamps = array('d')
+        self._status_codes = array('h')
+        self._durations = array('i')
+        self._methods = array('H')
+        self._levels = array('H')
+        self._paths: List[Optional[str]] = []
+        self._urls: List[Optional[str]] = []
+        self._contents: List[Optional[str]] = []
+        self._error_messages: List[Optional[str]] = []
+        self._payloads: List[Optional[bytes]] = []
+        # Approximate bytes held by the texts and trigram postings of each log, and by its payload
+        self._text_sizes = array('i')
+        self._payload_sizes = array('i')
+        # Logs dropped to stay within max_bytes before reaching the head of the buffer
+        self._dropped = array('b')
+        self._dropped_count = 0
+        # Timestamp of the newest log evicted or dropped so far, every log saved after it is still here
+        self._removed_until = float('-inf')
+        self._used_bytes = 0
+        # Where each pass of _enforce_budget stopped, all logs before it were already visited
+        self._budget_cursors = [0, 0, 0]
+        # Method and log level names by code, code 0 stands for None
+        self._symbols: List[Optional[str]] = [None]
+        self._symbol_codes: Dict[str, int] = {}
+        # IDs normally increase from log to log and are found by bisecting.
+        # Once one arrives out of order, they are looked up here instead.
+        self._seq_by_id: Optional[Dict[int, int]] = None
+        self._payload_zdict: Optional[bytes] = None
+        self._status_postings = PostingLists()
+        self._method_postings = PostingLists()
+        self._level_postings = PostingLists()
+        # Trigrams of the lowercased content and URL
+        self._trigram_postings = PostingLists()
+
+    def _index_keys(self, slot: int) -> Iterator[Tuple[PostingLists, Hashable]]:
+        """Yield the posting lists the log in a slot belongs to, with its key in each."""
+        yield self._status_postings, self._status_codes[slot]
+        yield self._method_postings, self._methods[slot]
+        yield self._level_postings, self._levels[slot]
+        for key in self._trigram_keys(slot):
+            yield self._trigram_postings, key
+
+    def _trigram_keys(self, slot: int) -> Set[str]:
+        keys: Set[str] = set()
+        if self.search_index:
+            for text in (self._contents[slot], self._urls[slot]):
+                if text:
+                    keys |= trigrams(text.lower())
+        return keys
+
+    def search_index_bytes(self) -> int:
+        """Return the approximate memory used by the trigram index, in bytes."""
+        with self._lock:
+            return self._trigram_postings.size_bytes()
+
+    def _column_names(self) -> Tuple[str, ...]:
+        return (
+            '_ids', '_timestamps', '_status_codes', '_durations', '_methods', '_levels',
+            '_paths', '_urls', '_contents', '_error_messages', '_payloads',
+            '_text_sizes', '_payload_sizes', '_dropped',
+        )
+
+    def _columns(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._column_names())
+
+    def _named_postings(self) -> Dict[str, PostingLists]:
+        return {
+            'status': self._status_postings,
+            'method': self._method_postings,
+            'level': self._level_postings,
+            'trigram': self._trigram_postings,
+        }
+
+    def _count(self) -> int:
+        return self._tail - self._head - self._dropped_count
+
+    def memory_usage(self) -> Dict[str, Optional[int]]:
+        """Return the approximate bytes used by the stored logs, the budget and the number of logs."""
+        with self._lock:
+            return {'used_bytes': self._used_bytes, 'max_bytes': self.max_bytes, 'logs': self._count()}
+
+    def complete_since(self) -> Optional[datetime]:
+        """Return the timestamp of the newest log evicted or dropped, or None if none was.
+
+        Every log saved with a later timestamp is still in memory.
+        """
+        with self._lock:
+            if self._removed_until == float('-inf'):
+                return None
+            return datetime.fromtimestamp(self._removed_until)
+
     def connect(self) -> None:
-        """Establish connection (no-op for memory)."""
-        pass
-        
+        """Reload the last snapshot and start saving new ones, if snapshot_path is set."""
+        if self._connected:
+            return
+        self._connected = True
+        if not self.snapshot_path:
+            return
+        if os.path.exists(self.snapshot_path):
+            try:
+                self.load_snapshot()
+            except Exception as exc:
+                print(f"SuperTracer Error: Could not load snapshot {self.snapshot_path}: {exc}")
+        if self.snapshot_interval_seconds > 0:
+            self._snapshot_stop.clear()
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name="supertracer-snapshot", daemon=True)
+            self._snapshot_thread.start()
+
     def disconnect(self) -> None:
-        """Close connection (clear data)."""
+        """Close connection (clear data), saving a last snapshot first if snapshot_path is set."""
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        self.shutdown()
+        self._connected = False
         with self._lock:
-            self._logs.clear()
-            self._logs_by_id.clear()
-            
+            self._reset()
+
+    def shutdown(self) -> None:
+        """Save a snapshot, if snapshot_path is set."""
+        if self.snapshot_path and self._connected:
+            try:
+                self.save_snapshot()
+            except Exception as exc:
+                print(f"SuperTracer Error: Could not save snapshot {self.snapshot_path}: {exc}")
+
+    def _snapshot_loop(self) -> None:
+        while not self._snapshot_stop.wait(self.snapshot_interval_seconds):
+            # Skip the write when nothing changed since the last one
+            if (self._head, self._tail, self._used_bytes) == self._snapshot_version:
+                continue
+            try:
+                self.save_snapshot()
+            except Exception as exc:
+                print(f"SuperTracer Error: Could not save snapshot {self.snapshot_path}: {exc}")
+
     def init_db(self) -> None:
         """Initialize the database (no-op)."""
         pass
-        
+
     def save_log(self, log: Log) -> int:
         """Save a log entry to memory."""
         with self._lock:
-            log_id = self._next_id
-            self._next_id += 1
-            
-            # Create a copy to avoid mutation issues and ensure ID is set
-            new_log = log.copy()
-            new_log['id'] = log_id
-            
-            # Ensure timestamp is datetime
-            if not isinstance(new_log['timestamp'], datetime):
-                 if isinstance(new_log['timestamp'], (int, float)):
-                     new_log['timestamp'] = datetime.fromtimestamp(new_log['timestamp'])
-            
-            self._logs.append(new_log)
-            self._logs_by_id[log_id] = new_log
-            return log_id
+            return self._append(log)
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries under a single lock acquisition."""
+        with self._lock:
+            return [self._append(log) for log in logs]
+
+    def _append(self, log: Log) -> int:
+        # Keep an ID generated in-process, otherwise assign the next one
+        log_id = log.get('id') or self._next_id
+        self._next_id = max(self._next_id, log_id + 1)
+
+        if self._tail - self._head == self.capacity:
+            self._evict(1)
+
+        timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else float(log['timestamp'])
+        status_code = log.get('status_code')
+        duration_ms = log.get('duration_ms')
+        path = log.get('path')
+        payload = self._encode_payload(log)
+        row = (
+            log_id,
+            timestamp,
+            MISSING if status_code is None else status_code,
+            MISSING if duration_ms is None else duration_ms,
+            self._symbol_code(log.get('method')),
+            self._symbol_code(log.get('log_level')),
+            sys.intern(path) if path is not None else None,
+            log.get('url'),
+            log.get('content'),
+            log.get('error_message'),
+            payload,
+            0,
+            0 if payload is None else sys.getsizeof(payload),
+            0,
+        )
+
+        capacity = self.capacity
+        position = self._tail
+        if self._tail > self._head:
+            last = (self._tail - 1) % capacity
+            if timestamp < self._timestamps[last]:
+                # Keep the buffer sorted by time. Logs usually arrive in order, so few have to move
+                timestamps = self._timestamps
+                position = self._head + bisect_right(
+                    range(self._head, self._tail), timestamp, key=lambda seq: timestamps[seq % capacity]
+                )
+            if self._seq_by_id is None and (position < self._tail or log_id <= self._ids[last]):
+                self._seq_by_id = {self._ids[seq % capacity]: seq for seq in range(self._head, self._tail)}
+            if position < self._tail:
+                # The logs from position on move up, revisit them
+                self._budget_cursors = [min(cursor, position) for cursor in self._budget_cursors]
+
+        if self._tail % capacity == len(self._ids):
+            # The buffer is still growing towards its capacity
+            for column, value in zip(self._columns(), EMPTY_ROW):
+                column.append(value)
+        if position < self._tail:
+            self._shift_up(position)
+        else:
+            self._tail += 1
+
+        slot = position % capacity
+        for column, value in zip(self._columns(), row):
+            column[slot] = value
+        text_size = 0
+        for postings, key in self._index_keys(slot):
+            postings.add(key, position)
+            if postings is self._trigram_postings:
+                text_size += 8
+        for text in row[7:10]:
+            if text:
+                text_size += sys.getsizeof(text)
+        self._text_sizes[slot] = text_size
+        self._used_bytes += ROW_BYTES + text_size + self._payload_sizes[slot]
+        if self._seq_by_id is not None:
+            self._seq_by_id[log_id] = position
+        if self.max_bytes is not None and self._used_bytes > self.max_bytes:
+            self._enforce_budget()
+        return log_id
+
+    def _shift_up(self, position: int) -> None:
+        """Move the logs from ``position`` on up one slot, leaving ``position`` free."""
+        capacity = self.capacity
+        columns = self._columns()
+        for seq in range(self._tail, position, -1):
+            destination, source = seq % capacity, (seq - 1) % capacity
+            for column in columns:
+                column[destination] = column[source]
+        self._tail += 1
+
+        moved = range(position + 1, self._tail)
+        for postings, key in {entry for seq in moved for entry in self._index_keys(seq % capacity)}:
+            postings.shift(key, position)
+        assert self._seq_by_id is not None
+        for seq in moved:
+            self._seq_by_id[self._ids[seq % capacity]] = seq
+
+    def _evict(self, count: int) -> None:
+        """Drop the ``count`` oldest logs."""
+        if count:
+            self._removed_until = max(self._removed_until, self._timestamps[(self._head + count - 1) % self.capacity])
+        for seq in range(self._head, self._head + count):
+            slot = seq % self.capacity
+            if self._seq_by_id is not None and self._seq_by_id.get(self._ids[slot]) == seq:
+                del self._seq_by_id[self._ids[slot]]
+            for postings, key in self._index_keys(slot):
+                postings.remove_oldest(key)
+            self._used_bytes -= ROW_BYTES + self._text_sizes[slot] + self._payload_sizes[slot]
+            self._text_sizes[slot] = self._payload_sizes[slot] = 0
+            if self._dropped[slot]:
+                self._dropped[slot] = 0
+                self._dropped_count -= 1
+            # Release the objects now instead of when the slot is reused
+            self._paths[slot] = self._urls[slot] = self._contents[slot] = None
+            self._error_messages[slot] = self._payloads[slot] = None
+        self._head += count
+
+    def _is_error(self, slot: int) -> bool:
+        return self._status_codes[slot] >= 400 or bool(self._error_messages[slot])
+
+    def _drop_payload(self, slot: int) -> None:
+        self._used_bytes -= self._payload_sizes[slot]
+        self._payload_sizes[slot] = 0
+        self._payloads[slot] = None
+
+    def _drop(self, seq: int) -> None:
+        """Drop a log that is not at the head of the buffer, leaving its slot empty until the head gets there."""
+        slot = seq % self.capacity
+        self._removed_until = max(self._removed_until, self._timestamps[slot])
+        # Its texts are released, so it leaves the trigram index now
+        self._trigram_postings.discard(self._trigram_keys(slot), seq)
+        self._drop_payload(slot)
+        self._used_bytes -= self._text_sizes[slot]
+        self._text_sizes[slot] = 0
+        self._paths[slot] = self._urls[slot] = self._contents[slot] = self._error_messages[slot] = None
+        self._dropped[slot] = 1
+        self._dropped_count += 1
+
+    def _enforce_budget(self) -> None:
+        """Free memory, oldest logs first, until the logs fit in max_bytes.
+
+        Drops the payloads of logs that are not errors, then the payloads of
+        errors, then logs that are not errors, and evicts errors last.
+        """
+        assert self.max_bytes is not None
+        capacity = self.capacity
+        payload_sizes, dropped = self._payload_sizes, self._dropped
+        for index in range(3):
+            seq = max(self._budget_cursors[index], self._head)
+            while self._used_bytes > self.max_bytes and seq < self._tail:
+                slot = seq % capacity
+                if index == 2:
+                    if not dropped[slot] and not self._is_error(slot):
+                        if seq == self._head:
+                            self._evict(1)
+                        else:
+                            self._drop(seq)
+                elif payload_sizes[slot] and self._is_error(slot) == (index == 1):
+                    self._drop_payload(slot)
+                seq += 1
+            self._budget_cursors[index] = seq
+        if self._dropped_count and self._dropped_count >= self._count():
+            # Dropped logs still hold their slots, reclaim them once there are as many as live logs
+            self._compact()
+        while self._used_bytes > self.max_bytes and self._tail > self._head:
+            self._evict(1)
+
+    def _compact(self) -> None:
+        """Rebuild the buffer without the dropped logs."""
+        columns = self._columns()
+        rows = [
+            tuple(column[seq % self.capacity] for column in columns)
+            for seq in range(self._head, self._tail)
+            if not self._dropped[seq % self.capacity]
+        ]
+        rebuild_ids = self._seq_by_id is not None
+        symbols, symbol_codes, payload_zdict = self._symbols, self._symbol_codes, self._payload_zdict
+        removed_until = self._removed_until
+        self._reset()
+        self._symbols, self._symbol_codes, self._payload_zdict = symbols, symbol_codes, payload_zdict
+        self._removed_until = removed_until
+        if rebuild_ids:
+            self._seq_by_id = {}
+        columns = self._columns()
+        for seq, row in enumerate(rows):
+            for column, value in zip(columns, row):
+                column.append(value)
+            for postings, key in self._index_keys(seq):
+                postings.add(key, seq)
+            self._used_bytes += ROW_BYTES + self._text_sizes[seq] + self._payload_sizes[seq]
+            if self._seq_by_id is not None:
+                self._seq_by_id[self._ids[seq]] = seq
+        self._tail = len(rows)
+
+    def _in_order(self, column: Any) -> Any:
+        """Return the values of a column from the oldest log to the newest."""
+        start = self._head % self.capacity
+        end = start + self._tail - self._head
+        if end <= len(column):
+            return column[start:end]
+        return column[start:] + column[:end - len(column)]
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        """Write the logs in memory to a snapshot file, snapshot_path by default.
+
+        The columns are copied under the lock and encoded after releasing it.
+        """
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path given")
+        with self._lock:
+            version = (self._head, self._tail, self._used_bytes)
+            columns = [self._in_order(column) for column in self._columns()]
+            postings = {
+                name: [(key, entries[start:]) for key, entries, start in postings_lists.items()]
+                for name, postings_lists in self._named_postings().items()
+            }
+            header = {
+                'head': self._head,
+                'tail': self._tail,
+                'next_id': self._next_id,
+                'symbols': self._symbols,
+                'ids_sorted': self._seq_by_id is None,
+                'search_index': self.search_index,
+                'removed_until': self._removed_until if self._removed_until > float('-inf') else None,
+            }
+            zdict = self._payload_zdict
+
+        writer = SnapshotWriter(header)
+        (ids, timestamps, status_codes, durations, methods, levels, paths, urls, contents, error_messages,
+         payloads, text_sizes, payload_sizes, dropped) = columns
+        for name, values in (
+            ('ids', ids), ('timestamps', timestamps), ('status_codes', status_codes), ('durations', durations),
+            ('methods', methods), ('levels', levels), ('text_sizes', text_sizes), ('payload_sizes', payload_sizes),
+            ('dropped', dropped),
+        ):
+            writer.add_array(name, values)
+        for name, values in (('paths', paths), ('urls', urls), ('contents', contents), ('error_messages', error_messages)):
+            writer.add_texts(name, values)
+        writer.add_blobs('payloads', payloads)
+        writer.add('zdict', zdict or b'', present=zdict is not None)
+        for name, lists in postings.items():
+            # All lists of an index in one array, the header says which key each run of entries belongs to
+            writer.add_array(f'postings.{name}', array('q', b''.join(entries.tobytes() for _, entries in lists)))
+            writer.header[f'postings.{name}'] = [[key, len(entries)] for key, entries in lists]
+        writer.write(path)
+        self._snapshot_version = version
+
+    def load_snapshot(self, path: Optional[str] = None) -> None:
+        """Replace the logs in memory with the ones in a snapshot file, snapshot_path by default."""
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path given")
+        # Every object created while loading is kept, collections in between would only rescan them
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self._load_snapshot(path)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _load_snapshot(self, path: str) -> None:
+        with SnapshotReader(path) as reader, self._lock:
+            header = reader.header
+            # Only the newest logs fit if the capacity shrank
+            tail = header['tail']
+            head = max(header['head'], tail - self.capacity)
+            skip = head - header['head']
+            if head == tail:
+                # Nothing to place, start the empty buffer from slot 0
+                head = tail = 0
+            rows: List[Any] = [
+                reader.array(name, skip)
+                for name in ('ids', 'timestamps', 'status_codes', 'durations', 'methods', 'levels')
+            ]
+            rows.append(reader.texts('paths', intern=True))
+            rows += [reader.texts(name) for name in ('urls', 'contents', 'error_messages')]
+            rows.append(reader.blobs('payloads'))
+            if skip:
+                rows[6:] = [values[skip:] for values in rows[6:]]
+            rows += [reader.array(name, skip) for name in ('text_sizes', 'payload_sizes', 'dropped')]
+
+            self._reset()
+            self._head, self._tail = head, tail
+            self._next_id = header['next_id']
+            if header['removed_until'] is not None:
+                self._removed_until = header['removed_until']
+            if skip:
+                # The logs that no longer fit count as removed
+                self._removed_until = max(self._removed_until, reader.array('timestamps', skip - 1, 1)[0])
+            self._symbols = header['symbols']
+            self._symbol_codes = {name: code for code, name in enumerate(self._symbols) if name is not None}
+            if header['sections']['zdict']['present']:
+                self._payload_zdict = reader.section('zdict')
+            if not header['ids_sorted']:
+                self._seq_by_id = dict(zip(rows[0], range(head, tail)))
+            self._place(rows)
+
+            for name, postings in self._named_postings().items():
+                if name == 'trigram' and not (self.search_index and header['search_index']):
+                    continue
+                offset = 0
+                for key, count in header[f'postings.{name}']:
+                    postings.load(key, reader.array(f'postings.{name}', offset, count), head)
+                    offset += count
+            if self.search_index != header['search_index']:
+                self._rebuild_search_index()
+
+            count = tail - head
+            self._dropped_count = self._dropped.count(1)
+            self._used_bytes = ROW_BYTES * count + sum(self._text_sizes) + sum(self._payload_sizes)
+            self._budget_cursors = [head] * 3
+            self._snapshot_version = (self._head, self._tail, self._used_bytes)
+            # The snapshot may have been taken with a larger max_bytes or without the search index
+            if self.max_bytes is not None and self._used_bytes > self.max_bytes:
+                self._enforce_budget()
+
+    def _place(self, rows: List[Any]) -> None:
+        """Set the columns to the loaded logs, oldest first, with each log in slot seq % capacity."""
+        capacity = self.capacity
+        count = self._tail - self._head
+        start = self._head % capacity
+        for name, values, empty in zip(self._column_names(), rows, EMPTY_ROW):
+            if isinstance(values, array):
+                filler = array(values.typecode, [empty])
+            else:
+                filler = [empty]
+            if start + count <= capacity:
+                column = filler * start + values
+            else:
+                wrapped = start + count - capacity
+                column = values[count - wrapped:] + filler * (capacity - count) + values[:count - wrapped]
+            setattr(self, name, column)
+
+    def _rebuild_search_index(self) -> None:
+        """Index the loaded logs by trigram, or drop their trigram bytes, when the snapshot was taken with the other setting."""
+        self._trigram_postings = PostingLists()
+        for seq in range(self._head, self._tail):
+            slot = seq % self.capacity
+            keys = self._trigram_keys(slot)
+            for key in keys:
+                self._trigram_postings.add(key, seq)
+            texts = (self._urls[slot], self._contents[slot], self._error_messages[slot])
+            self._text_sizes[slot] = 8 * len(keys) + sum(sys.getsizeof(text) for text in texts if text)
+
+    def _symbol_code(self, name: Optional[str]) -> int:
+        if name is None:
+            return 0
+        code = self._symbol_codes.get(name)
+        if code is None:
+            code = self._symbol_codes[name] = len(self._symbols)
+            self._symbols.append(name)
+        return code
+
+    def _encode_payload(self, log: Log) -> Optional[bytes]:
+        values = [log.get(field) for field in PAYLOAD_FIELDS]
+        if all(value is None for value in values):
+            return None
+        raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+        if self._payload_zdict is None:
+            # Later payloads mostly repeat the header names and values of the first one
+            self._payload_zdict = raw[:ZDICT_SIZE]
+            return raw
+        compressor = zlib.compressobj(1, zdict=self._payload_zdict)
+        return compressor.compress(raw) + compressor.flush()
+
+    def _decode_payload(self, blob: bytes) -> Dict[str, Any]:
+        # Uncompressed payloads are JSON lists, zlib streams never start with '['
+        if blob[:1] != b'[':
+            decompressor = zlib.decompressobj(zdict=self._payload_zdict or b'')
+            blob = decompressor.decompress(blob)
+        return dict(zip(PAYLOAD_FIELDS, json.loads(blob)))
+
+    def _find(self, log_id: int) -> Optional[int]:
+        """Return the sequence number of the log with the given ID, if it is still in memory."""
+        if self._seq_by_id is not None:
+            return self._seq_by_id.get(log_id)
+        ids, capacity = self._ids, self.capacity
+        seq = self._head + bisect_left(range(self._head, self._tail), log_id, key=lambda s: ids[s % capacity])
+        if seq < self._tail and ids[seq % capacity] == log_id:
+            return seq
+        return None
+
+    def _summary(self, slot: int) -> Log:
+        """Build the list entry for the log in a slot, without its payload."""
+        status_code = self._status_codes[slot]
+        duration_ms = self._durations[slot]
+        return {
+            'id': self._ids[slot],
+            'content': self._contents[slot] or "",
+            'timestamp': datetime.fromtimestamp(self._timestamps[slot]),
+            'method': self._symbols[self._methods[slot]],
+            'path': self._paths[slot],
+            'url': self._urls[slot],
+            'headers': None,
+            'log_level': self._symbols[self._levels[slot]],
+            'status_code': None if status_code == MISSING else status_code,
+            'duration_ms': None if duration_ms == MISSING else duration_ms,
+            'client_ip': None,
+            'user_agent': None,
+            'request_query': None,
+            'request_body': None,
+            'request_size_bytes': None,
+            'request_body_truncated': None,
+            'response_headers': None,
+            'response_body': None,
+            'response_size_bytes': None,
+            'error_message': self._error_messages[slot],
+            'stack_trace': None,
+        }
 
     def fetch_logs(self, filters: Optional[LogFilters] = None) -> List[Log]:
-        """Fetch log entries from memory with filtering."""
+        """Fetch log entries from memory with filtering.
+
+        The time window is found by bisecting the timestamps. Within it, the logs
+        are taken from the smallest posting list among the status code, method and
+        log level filters, or scanned newest first if none of them is set. The
+        remaining filters are applied to chunks of candidates, one column at a time.
+        """
         with self._lock:
             # If no filters, return the last N logs (most recent)
             if not filters:
-                # Return reversed slice for most recent first
-                return list(reversed(self._logs[-20:]))
-
-            filtered_logs = []
-            limit = filters.limit
-            
-            # Pre-process filters for speed
-            start_date = filters.start_date
-            end_date = filters.end_date
-            search_text = filters.search_text.lower() if filters.search_text else None
-            endpoint = filters.endpoint.lower() if filters.endpoint else None
-            status_code = filters.status_code
-            log_level = filters.log_level
-            methods = set(filters.methods) if filters.methods else None
-            min_latency = filters.min_latency
-            max_latency = filters.max_latency
-            has_error = filters.has_error
-            
-            # Iterate in reverse order (newest first)
-            # We assume insertion order roughly correlates with timestamp
-            for log in reversed(self._logs):
-                # Date filters
-                if start_date and log['timestamp'] < start_date:
-                    continue
-                if end_date and log['timestamp'] >= end_date:
-                    continue
-                    
-                # Text search
-                if search_text:
-                    content = (log.get('content') or "").lower()
-                    if search_text not in content:
-                        continue
-                        
-                # Endpoint
-                if endpoint:
-                    url = (log.get('url') or "").lower()
-                    if endpoint not in url:
-                        continue
-                        
-                # Status Code
-                if status_code:
-                    log_status = str(log.get('status_code') or "")
-                    if status_code.isdigit():
-                        if log_status != status_code:
-                            continue
-                    else:
-                        # Handle wildcards like 2XX
-                        pattern = status_code.lower().replace('x', '')
-                        if not log_status.startswith(pattern):
-                            continue
-
-                # Log Level
-                if log_level and log_level != 'All Levels':
-                    if log.get('log_level') != log_level:
-                        continue
-                        
-                # Methods
-                if methods:
-                    if log.get('method') not in methods:
-                        continue
-                        
-                # Latency
-                duration = log.get('duration_ms') or 0
-                if min_latency is not None and duration < min_latency:
-                    continue
-                if max_latency is not None and duration > max_latency:
-                    continue
-                    
-                # Error
-                if has_error:
-                    is_error = (log.get('status_code') or 0) >= 400 or bool(log.get('error_message'))
-                    if not is_error:
-                        continue
-                
-                filtered_logs.append(log)
-                
-                if len(filtered_logs) >= limit:
+                dropped = self._dropped
+                recent = (seq % self.capacity for seq in range(self._tail - 1, self._head - 1, -1))
+                return [self._summary(slot) for slot in itertools.islice((slot for slot in recent if not dropped[slot]), 20)]
+
+            lo, hi = self._seq_range(filters)
+            candidates = self._index_candidates(filters, lo, hi)
+            if candidates is None:
+                return []
+            indexed, seqs = candidates
+            predicates = self._filter_predicates(filters, indexed)
+            if predicates is None:
+                return []
+
+            filtered_logs: List[Log] = []
+            capacity = self.capacity
+            # Chunks start small, as unselective filters fill the page from the newest logs alone
+            chunk_size = MIN_SCAN_CHUNK_SIZE
+            while True:
+                slots = [seq % capacity for seq in itertools.islice(seqs, chunk_size)]
+                if not slots:
                     break
-            
+                chunk_size = min(chunk_size * 2, MAX_SCAN_CHUNK_SIZE)
+                for predicate in predicates:
+                    slots = predicate(slots)
+                    if not slots:
+                        break
+                for slot in slots:
+                    filtered_logs.append(self._summary(slot))
+                    if len(filtered_logs) >= filters.limit:
+                        return filtered_logs
             return filtered_logs
 
+    def _seq_range(self, filters: LogFilters) -> Tuple[int, int]:
+        """Return the range of sequence numbers [lo, hi) of the logs inside the time window and before the cursor."""
+        timestamps, capacity = self._timestamps, self.capacity
+        seqs = range(self._head, self._tail)
+
+        def timestamp_of(seq: int) -> float:
+            return timestamps[seq % capacity]
+
+        lo, hi = self._head, self._tail
+        if filters.start_date and filters.start_date != datetime.min:
+            lo = self._head + bisect_left(seqs, filters.start_date.timestamp(), key=timestamp_of)
+        if filters.end_date:
+            hi = self._head + bisect_left(seqs, filters.end_date.timestamp(), key=timestamp_of)
+        if filters.cursor:
+            # Logs at the cursor's own timestamp are told apart by ID afterwards
+            cursor_timestamp, _ = decode_cursor(filters.cursor)
+            hi = min(hi, self._head + bisect_right(seqs, cursor_timestamp.timestamp(), key=timestamp_of))
+        return lo, max(lo, hi)
+
+    def _index_candidates(self, filters: LogFilters, lo: int, hi: int) -> Optional[Tuple[Optional[str], Iterator[int]]]:
+        """Choose where fetch_logs takes its candidates from.
+
+        Returns the name of the filter the candidates already satisfy, or None if
+        they still have to be checked against every filter, and the candidate
+        sequence numbers newest first. Returns None when no log can match.
+        """
+        options: List[Tuple[Optional[str], PostingLists, List[Hashable]]] = []
+        if filters.status_code:
+            # A class like 5XX is the union of the lists of the codes in it
+            matches = status_matcher(filters.status_code)
+            options.append(('status_code', self._status_postings, [code for code in self._status_postings.keys() if matches(code)]))
+        if filters.log_level and filters.log_level != 'All Levels':
+            level_code = self._symbol_codes.get(filters.log_level)
+            options.append(('log_level', self._level_postings, [level_code] if level_code is not None else []))
+        if filters.methods:
+            method_codes = [self._symbol_codes[m] for m in filters.methods if m in self._symbol_codes]
+            options.append(('methods', self._method_postings, method_codes))
+        if self.search_index:
+            for text in (filters.search_text, filters.endpoint):
+                option = self._trigram_option(text.lower(), lo, hi) if text else None
+                if option is not None:
+                    options.append(option)
+
+        best: Optional[Tuple[Optional[str], List[Tuple[array, int, int]], int]] = None
+        for name, postings, keys in options:
+            segments = [postings.segment(key, lo, hi) for key in keys]
+            size = sum(end - start for _, start, end in segments)
+            if size == 0:
+                return None
+            if best is None or size < best[2]:
+                best = (name, segments, size)
+
+        if best is None or best[2] >= hi - lo:
+            return None if lo == hi else (None, iter(range(hi - 1, lo - 1, -1)))
+        return best[0], newest_first(best[1])
+
+    def _trigram_option(self, text: str, lo: int, hi: int) -> Optional[Tuple[None, PostingLists, List[Hashable]]]:
+        """Return the candidates for a substring: the logs holding its rarest trigram.
+
+        They still need the substring check. Returns None for text shorter than a trigram.
+        """
+        keys = trigrams(text)
+        if not keys:
+            return None
+        sizes = {}
+        for key in keys:
+            _, start, end = self._trigram_postings.segment(key, lo, hi)
+            sizes[key] = end - start
+        # A trigram that no log has rules out every log; an empty key list says so
+        rarest = min(keys, key=sizes.__getitem__)
+        return None, self._trigram_postings, [rarest] if sizes[rarest] else []
+
+    def _filter_predicates(self, filters: LogFilters, indexed: Optional[str] = None) -> Optional[List[Callable[[List[int]], List[int]]]]:
+        """Turn the filters into functions that narrow a list of slots, cheapest first.
+
+        The time window is already applied by _seq_range, and the ``indexed`` filter
+        by _index_candidates. Returns None when no log can match.
+        """
+        ids, status_codes, durations = self._ids, self._status_codes, self._durations
+        methods, levels, contents, urls = self._methods, self._levels, self._contents, self._urls
+        timestamps, error_messages = self._timestamps, self._error_messages
+        predicates: List[Callable[[List[int]], List[int]]] = []
+
+        # Logs dropped to stay within max_bytes
+        if self._dropped_count:
+            dropped = self._dropped
+            predicates.append(lambda slots: [s for s in slots if not dropped[s]])
+
+        # Only logs after the cursor position
+        if filters.cursor:
+            cursor_timestamp, cursor_id = decode_cursor(filters.cursor)
+            cursor = (cursor_timestamp.timestamp(), cursor_id)
+            predicates.append(lambda slots: [s for s in slots if (timestamps[s], ids[s]) < cursor])
+
+        # Status Code
+        if filters.status_code and indexed != 'status_code':
+            matches = status_matcher(filters.status_code)
+            predicates.append(lambda slots: [s for s in slots if matches(status_codes[s])])
+
+        # Log Level, compared by code. Unknown names match nothing
+        if filters.log_level and filters.log_level != 'All Levels' and indexed != 'log_level':
+            level_code = self._symbol_codes.get(filters.log_level)
+            if level_code is None:
+                return None
+            predicates.append(lambda slots: [s for s in slots if levels[s] == level_code])
+
+        # Methods
+        if filters.methods and indexed != 'methods':
+            method_codes = {self._symbol_codes[m] for m in filters.methods if m in self._symbol_codes}
+            if not method_codes:
+                return None
+            predicates.append(lambda slots: [s for s in slots if methods[s] in method_codes])
+
+        # Latency, a missing duration counts as 0
+        min_latency = filters.min_latency
+        max_latency = filters.max_latency
+        if min_latency is not None:
+            predicates.append(lambda slots: [s for s in slots if max(durations[s], 0) >= min_latency])
+        if max_latency is not None:
+            predicates.append(lambda slots: [s for s in slots if max(durations[s], 0) <= max_latency])
+
+        # Error
+        if filters.has_error:
+            predicates.append(lambda slots: [s for s in slots if status_codes[s] >= 400 or error_messages[s]])
+
+        # Text search
+        if filters.search_text:
+            search_text = filters.search_text.lower()
+            predicates.append(lambda slots: [s for s in slots if search_text in (contents[s] or "").lower()])
+
+        # Endpoint
+        if filters.endpoint:
+            endpoint = filters.endpoint.lower()
+            predicates.append(lambda slots: [s for s in slots if endpoint in (urls[s] or "").lower()])
+
+        # Headers and body keys, read from the payload
+        header_pairs = filters.header_pairs()
+        body_keys = filters.body_keys
+        if header_pairs or body_keys:
+            def payload_matches(slot: int) -> bool:
+                blob = self._payloads[slot]
+                payload = self._decode_payload(blob) if blob else {}
+                headers = payload.get('headers') or {}
+                if any(headers.get(name) != value for name, value in header_pairs):
+                    return False
+                body = payload.get('request_body')
+                return not body_keys or (isinstance(body, dict) and all(key in body for key in body_keys))
+
+            predicates.append(lambda slots: [s for s in slots if payload_matches(s)])
+
+        return predicates
+
     def fetch_log(self, log_id: int) -> Optional[Log]:
         """Fetch a single log entry by ID."""
         with self._lock:
-            return self._logs_by_id.get(log_id)
+            seq = self._find(log_id)
+            if seq is None or self._dropped[seq % self.capacity]:
+                return None
+            slot = seq % self.capacity
+            log = self._summary(slot)
+            blob = self._payloads[slot]
+            if blob:
+                log.update(self._decode_payload(blob))  # type: ignore[typeddict-item]
+            return log
 
     def cleanup(self, retention_options: RetentionOptions) -> int:
         """Clean up old logs based on retention options."""
         if not retention_options.enabled:
             return 0
-            
+
         with self._lock:
-            initial_count = len(self._logs)
-            original_logs = self._logs
-            
+            initial_count = self._count()
+
             # 1. Delete older than X hours
             if retention_options.cleanup_older_than_hours > 0:
-                cutoff_time = datetime.now() - timedelta(hours=retention_options.cleanup_older_than_hours)
-                self._logs = [log for log in self._logs if log['timestamp'] >= cutoff_time]
-                
+                cutoff = (datetime.now() - timedelta(hours=retention_options.cleanup_older_than_hours)).timestamp()
+                # The buffer is sorted by time, so the expired logs are the ones at its head
+                timestamps, capacity = self._timestamps, self.capacity
+                expired = bisect_left(range(self._head, self._tail), cutoff, key=lambda seq: timestamps[seq % capacity])
+                self._evict(expired)
+
             # 2. Enforce max_records
-            if retention_options.max_records > 0 and len(self._logs) > retention_options.max_records:
+            if retention_options.max_records > 0:
                 # Keep the last N records
-                self._logs = self._logs[-retention_options.max_records:]
-                
-            # Rebuild index if changed
-            if len(self._logs) < initial_count:
-                self._logs_by_id = {log['id']: log for log in self._logs}
-                
-            return initial_count - len(self._logs)
+                while self._count() > retention_options.max_records:
+                    self._evict(1)
+
+            return initial_count - self._count()
@@ -1,13 +1,45 @@
 import psycopg2
+from psycopg2.extensions import QueryCanceledError
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import csv
+import io
 import json
-from datetime import datetime, timedelta
-from typing import List, Optional, Any, Literal
-from supertracer.connectors.sql import SQLConnector
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Any, Literal, Tuple, TypeVar
+from supertracer.connectors.sql import PARTITION_NAME_FORMATS, PARTITION_SECONDS, SQLConnector
 from supertracer.types.logs import Log
-from supertracer.types.filters import LogFilters
+from supertracer.types.filters import LogFilters, decode_cursor
 from supertracer.types.options import RetentionOptions
 from supertracer.connectors.queries import postgresql as queries
 import os
+import re
+import threading
+import time
+
+T = TypeVar("T")
+
+PARTITIONED_TABLES = ("requests", "request_payloads")
+
+
+# An escaped NUL character, unless its backslash is itself escaped
+JSON_NUL = re.compile(r'(?<!\\)((?:\\\\)*)\\u0000')
+
+
+def strip_json_nul(text: str) -> str:
+    """Remove the NUL characters from JSON text, which JSONB columns reject."""
+    if '\\u0000' not in text:
+        return text
+    return JSON_NUL.sub(r'\1', text)
+
+
+def to_csv(rows: List[tuple]) -> io.StringIO:
+    """Write rows as CSV for COPY. None is left unquoted, which COPY reads as NULL."""
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator="\n").writerows(rows)
+    buffer.seek(0)
+    return buffer
 
 class PostgreSQLConnector(SQLConnector):
     """PostgreSQL implementation of the SQL connector.
@@ -19,6 +51,19 @@ class PostgreSQLConnector(SQLConnector):
         user (str): Database user.
         password (str): Database user's password.
         sslmode (str): SSL mode for the connection.
+        split_payloads (bool): Store headers, bodies and stack traces in a side table so list queries only read narrow rows.
+        pool_min_size (int): Connections opened up front and kept in the pool.
+        pool_max_size (int): Maximum number of concurrent connections. Callers wait for a free one beyond that.
+        statement_timeout_ms (int): Server-side timeout for each statement. 0 disables it.
+        connect_timeout (int): Seconds to wait when opening a connection.
+        health_check_interval (float): Connections idle for longer than this are checked before use.
+        ingest_mode (str): How batches are written: "insert" (multi-row INSERT) or "copy" (COPY FROM STDIN).
+        partition_by (Optional[str]): Create the tables range-partitioned by "day" or "hour" (UTC), so retention drops whole partitions.
+        partitions_ahead (int): Number of upcoming partitions created in advance.
+        detach_expired (bool): Detach expired partitions and keep them as standalone tables instead of dropping them.
+        json_columns (bool): Store headers, query parameters and bodies as JSONB instead of JSON text.
+        json_indexes (bool): Create GIN indexes for header and body key filters. Requires json_columns.
+        trigram_search (bool): Enable pg_trgm and index content and url for substring search.
     """
     
     def __init__(
@@ -28,67 +73,194 @@ class PostgreSQLConnector(SQLConnector):
         database: str = "supertracer",
         user: str = "postgres",
         password: str = "",
-        sslmode: Literal["disable", "allow", "prefer", "require", "verify-ca", "verify-full"] = "prefer"
+        sslmode: Literal["disable", "allow", "prefer", "require", "verify-ca", "verify-full"] = "prefer",
+        split_payloads: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        statement_timeout_ms: int = 0,
+        connect_timeout: int = 10,
+        health_check_interval: float = 30.0,
+        ingest_mode: Literal["insert", "copy"] = "insert",
+        partition_by: Optional[Literal["day", "hour"]] = None,
+        partitions_ahead: int = 2,
+        detach_expired: bool = False,
+        json_columns: bool = False,
+        json_indexes: bool = False,
+        trigram_search: bool = False,
     ):
         super().__init__()
+        if pool_min_size < 0 or pool_max_size < 1 or pool_min_size > pool_max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= pool_min_size <= pool_max_size and pool_max_size >= 1")
+        if ingest_mode not in ("insert", "copy"):
+            raise ValueError(f"Unsupported ingest_mode: {ingest_mode}")
+        if partition_by is not None and partition_by not in PARTITION_SECONDS:
+            raise ValueError(f"Unsupported partition_by: {partition_by}")
+        if partitions_ahead < 0:
+            raise ValueError("partitions_ahead must not be negative")
+        if json_indexes and not json_columns:
+            raise ValueError("json_indexes requires json_columns")
         self.host = host
         self.port = port
         self.database = database
         self.user = user
         self.password = password
         self.sslmode = sslmode
-        self.connection = None
-        self.cursor = None
+        self.split_payloads = split_payloads
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.statement_timeout_ms = statement_timeout_ms
+        self.connect_timeout = connect_timeout
+        self.health_check_interval = health_check_interval
+        self.ingest_mode = ingest_mode
+        self.partition_by = partition_by
+        self.partitions_ahead = partitions_ahead
+        self.detach_expired = detach_expired
+        self.json_columns = json_columns
+        self.json_indexes = json_indexes
+        self.trigram_search = trigram_search
+        # Driver errors caught around statements that are allowed to fail
+        self._errors: Tuple[type, ...] = (psycopg2.Error,)
+        # Upper bound of the partitions created so far
+        self._partitions_until = 0.0
+        self._partitions_lock = threading.Lock()
+        self._pool: Optional[ThreadedConnectionPool] = None
+        # ThreadedConnectionPool raises when exhausted, so callers wait for a slot first
+        self._slots = threading.BoundedSemaphore(pool_max_size)
+        self._last_used: Dict[int, float] = {}
     
     def connect(self) -> None:
-        """Establish connection to the PostgreSQL database."""
-        self.connection = psycopg2.connect(
+        """Open the connection pool to the PostgreSQL database."""
+        options = f"-c statement_timeout={self.statement_timeout_ms}" if self.statement_timeout_ms else None
+        self._pool = ThreadedConnectionPool(
+            self.pool_min_size,
+            self.pool_max_size,
             host=self.host,
             port=self.port,
             database=self.database,
             user=self.user,
             password=self.password,
-            sslmode=self.sslmode
+            sslmode=self.sslmode,
+            connect_timeout=self.connect_timeout,
+            options=options,
         )
-        self.cursor = self.connection.cursor()
     
     def disconnect(self) -> None:
-        """Close connection to the PostgreSQL database."""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        """Close every connection in the pool."""
+        if self._pool:
+            self._pool.closeall()
+            self._pool = None
+        self._last_used.clear()
+
+    def _checkout(self) -> Any:
+        """Get a pooled connection, replacing it if it was closed or fails a health check."""
+        assert self._pool is not None
+        connection = self._pool.getconn()
+        idle = time.monotonic() - self._last_used.get(id(connection), time.monotonic())
+        if not connection.closed and idle > self.health_check_interval:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                connection.rollback()
+            except psycopg2.Error:
+                pass
+        if connection.closed:
+            # The server went away, open a new connection instead
+            self._pool.putconn(connection, close=True)
+            connection = self._pool.getconn()
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        """Check out a connection for one operation, committed on success and rolled back on error."""
+        if self._pool is None:
+            raise ConnectionError("Database is not connected")
+        with self._slots:
+            connection = self._checkout()
+            try:
+                yield connection
+                connection.commit()
+            except Exception:
+                if not connection.closed:
+                    try:
+                        connection.rollback()
+                    except psycopg2.Error:
+                        pass
+                self._release(connection)
+                raise
+            self._release(connection)
+
+    def _release(self, connection: Any) -> None:
+        assert self._pool is not None
+        if connection.closed:
+            self._last_used.pop(id(connection), None)
+            self._pool.putconn(connection, close=True)
+        else:
+            self._last_used[id(connection)] = time.monotonic()
+            self._pool.putconn(connection)
+
+    def _run(self, operation: Callable[[Any], T], idempotent: bool = False) -> T:
+        """Run ``operation`` with a cursor in its own transaction, retrying once if the connection dropped.
+
+        Only idempotent operations are retried once they were sent, a write the
+        server committed before the connection dropped would be applied twice.
+        """
+        sent = False
+
+        def tracked(cursor: Any) -> T:
+            nonlocal sent
+            sent = True
+            return operation(cursor)
+
+        try:
+            return self._attempt(tracked)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as exc:
+            # A statement timeout is not a broken connection
+            if isinstance(exc, QueryCanceledError) or (sent and not idempotent):
+                raise
+            # The broken connection was dropped from the pool, try again on a new one
+            return self._attempt(operation)
+
+    def _attempt(self, operation: Callable[[Any], T]) -> T:
+        with self._connection() as connection:
+            with connection.cursor() as cursor:
+                return operation(cursor)
 
     def execute(self, query: str, params: tuple = ()) -> Any:
         """Execute a query without returning results (INSERT, UPDATE, DELETE, DDL)."""
-        if self.cursor is None:
-            raise ConnectionError("Database is not connected")
-            
-        self.cursor.execute(query, params)
-        # For INSERTs that return ID, we need to fetch it
-        if query.strip().upper().startswith("INSERT") and "RETURNING" in query.upper():
-            result = self.cursor.fetchone()
-            return result[0] if result else None
-        return None
+        def operation(cursor):
+            cursor.execute(query, params)
+            # For INSERTs that return ID, we need to fetch it
+            if query.strip().upper().startswith("INSERT") and "RETURNING" in query.upper():
+                result = cursor.fetchone()
+                return result[0] if result else None
+            return None
+
+        return self._run(operation)
     
     def query(self, query: str, params: tuple = ()) -> list:
         """Execute a query and return the results (SELECT)."""
-        if self.cursor is None:
-            raise ConnectionError("Database is not connected")
-            
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        def operation(cursor):
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        return self._run(operation, idempotent=True)
     
     def commit_transaction(self) -> None:
-        """Commit the current database transaction."""
-        if self.connection is None:
+        """Commit the current database transaction.
+
+        Each execute runs in its own transaction on a pooled connection and is
+        committed when it completes, so there is nothing left to commit here.
+        """
+        if self._pool is None:
             raise ConnectionError("Database is not connected")
-        self.connection.commit()
 
     def cleanup(self, retention_options: RetentionOptions) -> int:
         """Clean up old logs based on retention options using PostgreSQL syntax."""
         if not retention_options.enabled:
             return 0
+        if self.partition_by:
+            self._cleanup_partitions(retention_options)
+            return 0
             
         deleted_count = 0
         
@@ -100,58 +272,247 @@ class PostgreSQLConnector(SQLConnector):
             self.execute(queries.CLEANUP_OLDER_THAN, (timestamp_val,))
             self.commit_transaction()
             
+        # Drop payloads before the rows themselves
+        if retention_options.payload_retention_hours > 0:
+            cutoff_time = datetime.now() - timedelta(hours=retention_options.payload_retention_hours)
+            self.execute(queries.CLEANUP_PAYLOADS_OLDER_THAN, (cutoff_time.timestamp(),))
+            self.commit_transaction()
+            
         # 2. Enforce max_records
         if retention_options.max_records > 0:
-            # PostgreSQL syntax for keeping top N records
-            self.execute(queries.CLEANUP_MAX_RECORDS, (retention_options.max_records,))
+            # Delete everything older than the max_records-th newest log
+            self.execute(queries.CLEANUP_MAX_RECORDS, (retention_options.max_records - 1,))
             self.commit_transaction()
             
         return deleted_count
 
+    def _cleanup_partitions(self, retention_options: RetentionOptions) -> None:
+        """Expire whole partitions instead of deleting rows.
+
+        A partition is removed once all of its rows are past the retention limits,
+        so logs can outlive the limits by up to one partition length.
+        """
+        self.ensure_partitions()
+        now = time.time()
+        cutoffs: List[float] = []
+        if retention_options.cleanup_older_than_hours > 0:
+            cutoffs.append(now - retention_options.cleanup_older_than_hours * 3600)
+        if retention_options.max_records > 0:
+            rows = self.query(queries.NTH_NEWEST_TIMESTAMP, (retention_options.max_records,))
+            if rows:
+                cutoffs.append(rows[0][0])
+        row_cutoff = max(cutoffs) if cutoffs else None
+
+        payload_cutoff = row_cutoff
+        if retention_options.payload_retention_hours > 0:
+            payload_retention = now - retention_options.payload_retention_hours * 3600
+            payload_cutoff = max(payload_cutoff or payload_retention, payload_retention)
+
+        for table, cutoff in (("requests", row_cutoff), ("request_payloads", payload_cutoff)):
+            if cutoff is None:
+                continue
+            for (name,) in self.query(queries.LIST_PARTITIONS, (table,)):
+                bounds = self._partition_bounds(table, name)
+                if bounds and bounds[1] <= cutoff:
+                    statement = queries.DETACH_PARTITION if self.detach_expired else queries.DROP_PARTITION
+                    self.execute(statement.format(table=table, name=name))
+            # The default partition is the only one that still needs row deletes
+            self.execute(queries.CLEANUP_DEFAULT_PARTITION.format(table=table), (cutoff,))
+
+    def ensure_partitions(self) -> None:
+        """Create the default partition and the partitions for the current and upcoming periods."""
+        if not self.partition_by:
+            return
+        period = PARTITION_SECONDS[self.partition_by]
+        start = int(time.time()) // period * period
+        with self._partitions_lock:
+            for table in PARTITIONED_TABLES:
+                self.execute(queries.CREATE_DEFAULT_PARTITION.format(table=table))
+                for i in range(self.partitions_ahead + 1):
+                    lower = start + i * period
+                    name = self._partition_name(table, lower)
+                    try:
+                        self.execute(queries.CREATE_PARTITION.format(name=name, table=table, start=lower, end=lower + period))
+                    except self._errors as exc:
+                        # e.g. the default partition already holds rows for this range
+                        print(f"SuperTracer Error: {exc}")
+            self._partitions_until = start + (self.partitions_ahead + 1) * period
+
+    def _extend_partitions(self, logs: List[Log]) -> None:
+        # Create upcoming partitions once writes reach the last one
+        if not self.partition_by:
+            return
+        latest = max(
+            log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else log['timestamp']
+            for log in logs
+        )
+        if latest >= self._partitions_until - PARTITION_SECONDS[self.partition_by]:
+            self.ensure_partitions()
+
+    def _partition_name(self, table: str, lower: float) -> str:
+        assert self.partition_by is not None
+        start = datetime.fromtimestamp(lower, tz=timezone.utc)
+        return f"{table}_p{start.strftime(PARTITION_NAME_FORMATS[self.partition_by])}"
+
+    def _partition_bounds(self, table: str, name: str) -> Optional[Tuple[float, float]]:
+        """Return the (start, end) range of a partition from its name, or None if it isn't a time partition."""
+        assert self.partition_by is not None
+        prefix = f"{table}_p"
+        if not name.startswith(prefix):
+            return None
+        try:
+            start = datetime.strptime(name[len(prefix):], PARTITION_NAME_FORMATS[self.partition_by])
+        except ValueError:
+            return None
+        lower = start.replace(tzinfo=timezone.utc).timestamp()
+        return lower, lower + PARTITION_SECONDS[self.partition_by]
+
     def init_db(self) -> None:
         """Initialize the requests table schema with PostgreSQL-specific syntax."""
         # Create table if not exists
-        self.execute(queries.CREATE_TABLE)
+        if self.partition_by:
+            kind = self.query(queries.TABLE_KIND, ("requests",))
+            if kind and kind[0][0] != 'p':
+                raise ValueError(
+                    "The requests table already exists and is not partitioned. "
+                    "Use a new database or migrate the table before enabling partition_by."
+                )
+            self.execute(queries.CREATE_PARTITIONED_TABLE)
+        else:
+            self.execute(queries.CREATE_TABLE)
+        for name, column_type in queries.ADDED_COLUMNS:
+            self.execute(queries.ADD_COLUMN.format(name=name, type=column_type))
+        if self.query(queries.ID_COLUMN_TYPE) == [('integer',)]:
+            for statement in queries.UPGRADE_ID_TO_BIGINT:
+                self.execute(statement)
+        payload_table = queries.CREATE_PARTITIONED_PAYLOAD_TABLE if self.partition_by else queries.CREATE_PAYLOAD_TABLE
+        for statement in payload_table + queries.CREATE_INDEXES:
+            self.execute(statement)
+        if self.json_columns:
+            self._use_json_columns()
+        if self.trigram_search:
+            self._create_trigram_indexes()
+        self.ensure_partitions()
         self.commit_transaction()
+
+    def _create_trigram_indexes(self) -> None:
+        """Enable pg_trgm and create the trigram indexes used by search_text and endpoint."""
+        try:
+            self.execute(queries.CREATE_TRIGRAM_EXTENSION)
+        except self._errors as exc:
+            raise RuntimeError(
+                "trigram_search needs the pg_trgm extension. Run CREATE EXTENSION pg_trgm as a "
+                f"user with the required privileges, or disable trigram_search: {exc}"
+            ) from exc
+        for statement in queries.CREATE_TRIGRAM_INDEXES:
+            self.execute(statement)
+
+    def _to_json(self, value: Any) -> Optional[str]:
+        """Serialize a JSON column value without NUL characters, so it also fits a JSONB column."""
+        text = super()._to_json(value)
+        return strip_json_nul(text) if text is not None else None
+
+    def _use_json_columns(self) -> None:
+        """Convert the JSON text columns to JSONB and create their indexes."""
+        for table in ("requests", "request_payloads"):
+            column_types = dict(self.query(queries.COLUMN_TYPES, (table,)))
+            for name in queries.JSON_COLUMNS:
+                if column_types.get(name) == 'text':
+                    # Rewrites the table once; values were written with json.dumps so they parse once NUL is removed
+                    self.execute(queries.ALTER_COLUMN_TO_JSONB.format(table=table, name=name))
+            if self.json_indexes:
+                for statement in queries.CREATE_JSON_INDEXES:
+                    self.execute(statement.format(table=table))
     
     def save_log(self, log: Log) -> int:
         """Save a log entry using PostgreSQL parameterized queries."""
-        
-        # Convert datetime to timestamp
-        timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else log['timestamp']
-        
-        def to_json(val):
-            return json.dumps(val) if val is not None else None
-        
-        log_id = self.execute(
-            queries.INSERT_LOG,
-            (
-                log.get('content'),
-                timestamp,
-                log.get('method'),
-                log.get('path'),
-                log.get('url'),
-                to_json(log.get('headers')),
-                log.get('log_level'),
-                log.get('status_code'),
-                log.get('duration_ms'),
-                log.get('client_ip'),
-                log.get('user_agent'),
-                to_json(log.get('request_query')),
-                to_json(log.get('request_body')),
-                to_json(log.get('response_headers')),
-                to_json(log.get('response_body')),
-                log.get('response_size_bytes'),
-                log.get('error_message'),
-                log.get('stack_trace')
-            )
-        )
+        self._extend_partitions([log])
+        if self.split_payloads:
+            # Row and payload are written in one transaction
+            return self.save_logs([log])[0]
+        if log.get('id'):
+            # Keep an ID generated in-process
+            log_id = self.execute(queries.INSERT_LOG_WITH_ID, self._insert_params(log) + (log['id'],))
+        else:
+            log_id = self.execute(queries.INSERT_LOG, self._insert_params(log))
         self.commit_transaction()
         return log_id
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries with a multi-row INSERT in a single transaction."""
+        if not logs:
+            return []
+        self._extend_partitions(logs)
+        if self.ingest_mode == "copy":
+            return self._run(lambda cursor: self._copy_logs(cursor, logs))
+        if all(log.get('id') for log in logs):
+            insert_query = queries.INSERT_LOGS_WITH_ID
+            params = [self._insert_params(log, self.split_payloads) + (log['id'],) for log in logs]
+        else:
+            insert_query = queries.INSERT_LOGS
+            params = [self._insert_params(log, self.split_payloads) for log in logs]
+            
+        def operation(cursor) -> List[int]:
+            rows = execute_values(cursor, insert_query, params, page_size=len(params), fetch=True)
+            log_ids = [row[0] for row in rows]
+            if self.split_payloads:
+                payloads = [self._payload_params(log, log_id) for log, log_id in zip(logs, log_ids)]
+                execute_values(cursor, queries.INSERT_PAYLOADS, payloads, page_size=len(payloads))
+            return log_ids
+
+        # One transaction for the whole batch
+        return self._run(operation)
+    
+    def _copy_logs(self, cursor: Any, logs: List[Log]) -> List[int]:
+        """Stream a batch into the requests table with COPY, reserving IDs from the sequence first."""
+        missing = sum(1 for log in logs if not log.get('id'))
+        reserved: List[int] = []
+        if missing:
+            cursor.execute(queries.RESERVE_IDS, (missing,))
+            reserved = sorted(row[0] for row in cursor.fetchall())
+        reserved_ids = iter(reserved)
+        log_ids = [log.get('id') or next(reserved_ids) for log in logs]
+
+        rows = [self._insert_params(log, self.split_payloads) + (log_id,) for log, log_id in zip(logs, log_ids)]
+        cursor.copy_expert(queries.COPY_LOGS, to_csv(rows))
+        if self.split_payloads:
+            payloads = [self._payload_params(log, log_id) for log, log_id in zip(logs, log_ids)]
+            cursor.copy_expert(queries.COPY_PAYLOADS, to_csv(payloads))
+        return log_ids
     
     def fetch_logs(self, filters: Optional[LogFilters] = None) -> List[Log]:
         """Fetch log entries using PostgreSQL parameterized queries."""
-        filters = filters or LogFilters()
+        query, params = self._build_fetch_logs_query(filters or LogFilters())
+        return [self._summary_from_row(row) for row in self.query(query, params)]
+
+    def _summary_from_row(self, row: Any) -> Log:
+        """Build a list entry from a FETCH_LOGS_BASE row."""
+        return {
+            'id': row[0],
+            'content': row[1] or "",
+            'timestamp': datetime.fromtimestamp(row[2]),
+            'method': row[3],
+            'path': row[4],
+            'url': row[5],
+            'headers': None,
+            'log_level': row[6],
+            'status_code': row[7],
+            'duration_ms': row[8],
+            'client_ip': None,
+            'user_agent': None,
+            'request_query': None,
+            'request_body': None,
+            'request_size_bytes': None,
+            'request_body_truncated': None,
+            'response_headers': None,
+            'response_body': None,
+            'response_size_bytes': None,
+            'error_message': row[9],
+            'stack_trace': None
+        }
+
+    def _build_fetch_logs_query(self, filters: LogFilters) -> Tuple[str, tuple]:
+        """Build the fetch_logs statement and its parameters for the given filters."""
         
         if filters.start_date == datetime.min:
             timestamp_value = 0.0
@@ -165,6 +526,12 @@ class PostgreSQLConnector(SQLConnector):
             query += " AND timestamp < %s"
             params.append(filters.end_date.timestamp())
 
+        if filters.cursor:
+            # Seek past the last log of the previous page
+            cursor_timestamp, cursor_id = decode_cursor(filters.cursor)
+            query += " AND (timestamp, id) < (%s, %s)"
+            params.extend([cursor_timestamp.timestamp(), cursor_id])
+
         if filters.search_text:
             query += " AND content ILIKE %s"
             params.append(f"%{filters.search_text}%")
@@ -187,8 +554,8 @@ class PostgreSQLConnector(SQLConnector):
             params.append(filters.log_level)
 
         if filters.methods:
-            query += " AND method IN %s"
-            params.append(tuple(filters.methods))
+            query += " AND method = ANY(%s)"
+            params.append(list(filters.methods))
             
         if filters.min_latency is not None:
             query += " AND duration_ms >= %s"
@@ -201,48 +568,37 @@ class PostgreSQLConnector(SQLConnector):
         if filters.has_error:
             query += " AND (status_code >= 400 OR error_message IS NOT NULL)"
 
-        query += " ORDER BY timestamp DESC LIMIT %s"
+        def payload_condition(condition: str, condition_params: list) -> str:
+            # Payload columns are in request_payloads for logs written with split payloads
+            if self.split_payloads:
+                params.extend(condition_params * 2)
+                return f" AND ({condition} OR id IN (SELECT id FROM request_payloads WHERE {condition}))"
+            params.extend(condition_params)
+            return f" AND {condition}"
+
+        for name, value in filters.header_pairs():
+            # Containment is served by the jsonb_path_ops index on headers
+            query += payload_condition("headers::jsonb @> %s::jsonb", [json.dumps({name: value})])
+
+        for key in filters.body_keys or []:
+            query += payload_condition(
+                "(request_body::jsonb ? %s AND jsonb_typeof(request_body::jsonb) = 'object')", [key]
+            )
+
+        query += " ORDER BY timestamp DESC, id DESC LIMIT %s"
         params.append(filters.limit)
         
-        rows = self.query(query, tuple(params))
-        
-        logs = []
-        for row in rows:
-            log: Log = {
-                'id': row[0],
-                'content': row[1] or "",
-                'timestamp': datetime.fromtimestamp(row[2]),
-                'method': row[3],
-                'path': row[4],
-                'url': row[5],
-                'headers': None,
-                'log_level': row[6],
-                'status_code': row[7],
-                'duration_ms': row[8],
-                'client_ip': None,
-                'user_agent': None,
-                'request_query': None,
-                'request_body': None,
-                'response_headers': None,
-                'response_body': None,
-                'response_size_bytes': None,
-                'error_message': row[9],
-                'stack_trace': None
-            }
-            logs.append(log)
-        
-        return logs
+        return query, tuple(params)
 
     def fetch_log(self, log_id: int) -> Optional[Log]:
         """Fetch a single log entry by ID."""
         
         rows = self.query(queries.FETCH_LOG_BY_ID, (log_id,))
-        
-        if not rows:
-            return None
-            
-        row = rows[0]
-        log: Log = {
+        return self._log_from_row(rows[0]) if rows else None
+
+    def _log_from_row(self, row: Any) -> Log:
+        """Build a full log entry from a FETCH_LOG_BY_ID row."""
+        return {
             'id': row[0],
             'content': row[1] or "",
             'timestamp': datetime.fromtimestamp(row[2]),
@@ -257,10 +613,11 @@ class PostgreSQLConnector(SQLConnector):
             'user_agent': row[11],
             'request_query': json.loads(row[12]) if row[12] else None,
             'request_body': json.loads(row[13]) if row[13] else None,
+            'request_size_bytes': row[19],
+            'request_body_truncated': bool(row[20]) if row[20] is not None else None,
             'response_headers': json.loads(row[14]) if row[14] else None,
             'response_body': json.loads(row[15]) if row[15] else None,
             'response_size_bytes': row[16],
             'error_message': row[17],
             'stack_trace': row[18]
         }
-        return log
@@ -1,7 +1,7 @@
 
 CREATE_TABLE = """
   CREATE TABLE IF NOT EXISTS requests (
-      id SERIAL PRIMARY KEY,
+      id BIGSERIAL PRIMARY KEY,
       content TEXT,
       timestamp DOUBLE PRECISION NOT NULL,
       method TEXT,
@@ -24,16 +24,173 @@ CREATE_TABLE = """
 """
 
 
+# Range-partitioned variant of CREATE_TABLE. The primary key has to include the
+# partition key, and partitions are attached by the connector.
+CREATE_PARTITIONED_TABLE = """
+  CREATE TABLE IF NOT EXISTS requests (
+      id BIGSERIAL,
+      content TEXT,
+      timestamp DOUBLE PRECISION NOT NULL,
+      method TEXT,
+      path TEXT,
+      url TEXT,
+      headers TEXT,
+      log_level TEXT,
+      status_code INTEGER,
+      duration_ms INTEGER,
+      client_ip TEXT,
+      user_agent TEXT,
+      request_query TEXT,
+      request_body TEXT,
+      response_headers TEXT,
+      response_body TEXT,
+      response_size_bytes INTEGER,
+      error_message TEXT,
+      stack_trace TEXT,
+      request_size_bytes INTEGER,
+      request_body_truncated BOOLEAN,
+      PRIMARY KEY (id, timestamp)
+  ) PARTITION BY RANGE (timestamp);
+"""
+
+# 'p' for a partitioned table, 'r' for a regular one, no row if it doesn't exist
+TABLE_KIND = "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)"
+
+LIST_PARTITIONS = """
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(%s)
+"""
+
+CREATE_PARTITION = "CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM ({start}) TO ({end})"
+
+# Catches rows outside every partition, e.g. from a skewed clock
+CREATE_DEFAULT_PARTITION = "CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+
+DROP_PARTITION = "DROP TABLE IF EXISTS {name}"
+
+DETACH_PARTITION = "ALTER TABLE {table} DETACH PARTITION {name}"
+
+CLEANUP_DEFAULT_PARTITION = "DELETE FROM {table}_default WHERE timestamp < %s"
+
+# Timestamp of the newest log beyond max_records
+NTH_NEWEST_TIMESTAMP = "SELECT timestamp FROM requests ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET %s"
+
+# Columns added after the original schema, applied to existing databases on init.
+ADDED_COLUMNS = [
+    ("request_size_bytes", "INTEGER"),
+    ("request_body_truncated", "BOOLEAN"),
+]
+
+ADD_COLUMN = "ALTER TABLE requests ADD COLUMN IF NOT EXISTS {name} {type}"
+
+
 INSERT_LOG = """
     INSERT INTO requests (
         content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
         client_ip, user_agent, request_query, request_body, response_headers, response_body,
-        response_size_bytes, error_message, stack_trace
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+"""
+
+# Used when the log ID was generated in-process (e.g. snowflake IDs)
+INSERT_LOG_WITH_ID = """
+    INSERT INTO requests (
+        content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
+        client_ip, user_agent, request_query, request_body, response_headers, response_body,
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated, id
     )
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     RETURNING id
 """
 
+# Multi-row variant of INSERT_LOG for psycopg2.extras.execute_values
+INSERT_LOGS = """
+    INSERT INTO requests (
+        content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
+        client_ip, user_agent, request_query, request_body, response_headers, response_body,
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated
+    )
+    VALUES %s
+    RETURNING id
+"""
+
+INSERT_LOGS_WITH_ID = """
+    INSERT INTO requests (
+        content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
+        client_ip, user_agent, request_query, request_body, response_headers, response_body,
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated, id
+    )
+    VALUES %s
+    RETURNING id
+"""
+
+# Bulk ingestion with COPY, columns in _insert_params order followed by id
+COPY_LOG_COLUMNS = (
+    "content", "timestamp", "method", "path", "url", "headers", "log_level", "status_code", "duration_ms",
+    "client_ip", "user_agent", "request_query", "request_body", "response_headers", "response_body",
+    "response_size_bytes", "error_message", "stack_trace", "request_size_bytes", "request_body_truncated", "id",
+)
+
+COPY_PAYLOAD_COLUMNS = (
+    "id", "timestamp", "headers", "request_query", "request_body", "response_headers", "response_body", "stack_trace",
+)
+
+COPY_LOGS = f"COPY requests ({', '.join(COPY_LOG_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+COPY_PAYLOADS = f"COPY request_payloads ({', '.join(COPY_PAYLOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# COPY can't return the generated IDs, so they are taken from the sequence first
+RESERVE_IDS = "SELECT nextval(pg_get_serial_sequence('requests', 'id')) FROM generate_series(1, %s)"
+
+# Client-generated 64-bit IDs don't fit the original SERIAL (int4) column
+ID_COLUMN_TYPE = """
+    SELECT data_type FROM information_schema.columns
+    WHERE table_name = 'requests' AND column_name = 'id' AND table_schema = current_schema()
+"""
+
+UPGRADE_ID_TO_BIGINT = [
+    "ALTER TABLE requests ALTER COLUMN id TYPE BIGINT",
+    "ALTER SEQUENCE IF EXISTS requests_id_seq AS BIGINT",
+]
+
+# Payload columns that can be stored as JSONB instead of JSON text
+JSON_COLUMNS = ("headers", "request_query", "request_body", "response_headers", "response_body")
+
+COLUMN_TYPES = """
+    SELECT column_name, data_type FROM information_schema.columns
+    WHERE table_name = %s AND table_schema = current_schema()
+"""
+
+# JSONB rejects \u0000, so escaped NUL characters not preceded by another backslash are removed first
+ALTER_COLUMN_TO_JSONB = (
+    "ALTER TABLE {table} ALTER COLUMN {name} TYPE JSONB "
+    r"USING regexp_replace({name}, '(?<!\\)((?:\\\\)*)\\u0000', '\1', 'g')::jsonb"
+)
+
+# jsonb_path_ops is smaller and faster for the @> containment used by header filters,
+# while the default jsonb_ops also supports the ? key existence used by body key filters
+CREATE_JSON_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_{table}_headers ON {table} USING GIN (headers jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_request_body ON {table} USING GIN (request_body)",
+]
+
+# Trigram indexes serve ILIKE '%...%' substring filters for patterns of 3+ characters
+CREATE_TRIGRAM_EXTENSION = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
+CREATE_TRIGRAM_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_requests_content_trgm ON requests USING GIN (content gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_requests_url_trgm ON requests USING GIN (url gin_trgm_ops)",
+    # search_text only matches content, an error_message index from earlier versions has no filter to serve
+    "DROP INDEX IF EXISTS idx_requests_error_message_trgm",
+]
+
+# Listing order, cursor seeks, time range filters and retention
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_requests_timestamp ON requests (timestamp, id)",
+]
+
 FETCH_LOGS_BASE = """
     SELECT 
         id, content, timestamp, method, path, url, log_level, status_code, duration_ms, error_message
@@ -41,20 +198,70 @@ FETCH_LOGS_BASE = """
     WHERE timestamp >= %s
 """
 
+# Side table for bulky payload columns, used when payloads are split
+CREATE_PAYLOAD_TABLE = [
+    """
+    CREATE TABLE IF NOT EXISTS request_payloads (
+        id BIGINT PRIMARY KEY REFERENCES requests (id) ON DELETE CASCADE,
+        timestamp DOUBLE PRECISION NOT NULL,
+        headers TEXT,
+        request_query TEXT,
+        request_body TEXT,
+        response_headers TEXT,
+        response_body TEXT,
+        stack_trace TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_request_payloads_timestamp ON request_payloads (timestamp)",
+]
+
+# Partitioned variant of CREATE_PAYLOAD_TABLE, expired together with the requests partitions
+CREATE_PARTITIONED_PAYLOAD_TABLE = [
+    """
+    CREATE TABLE IF NOT EXISTS request_payloads (
+        id BIGINT NOT NULL,
+        timestamp DOUBLE PRECISION NOT NULL,
+        headers TEXT,
+        request_query TEXT,
+        request_body TEXT,
+        response_headers TEXT,
+        response_body TEXT,
+        stack_trace TEXT,
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp)
+    """,
+]
+
+INSERT_PAYLOADS = """
+    INSERT INTO request_payloads (
+        id, timestamp, headers, request_query, request_body, response_headers, response_body, stack_trace
+    )
+    VALUES %s
+"""
+
+# Payload columns come from request_payloads when they were split out of the row.
+# JSON columns are read as text whether they are stored as TEXT or JSONB.
 FETCH_LOG_BY_ID = """
     SELECT 
-        id, content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
-        client_ip, user_agent, request_query, request_body, response_headers, response_body,
-        response_size_bytes, error_message, stack_trace
-    FROM requests
-    WHERE id = %s
+        r.id, r.content, r.timestamp, r.method, r.path, r.url, COALESCE(p.headers, r.headers)::text,
+        r.log_level, r.status_code, r.duration_ms, r.client_ip, r.user_agent,
+        COALESCE(p.request_query, r.request_query)::text, COALESCE(p.request_body, r.request_body)::text,
+        COALESCE(p.response_headers, r.response_headers)::text, COALESCE(p.response_body, r.response_body)::text,
+        r.response_size_bytes, r.error_message, COALESCE(p.stack_trace, r.stack_trace),
+        r.request_size_bytes, r.request_body_truncated
+    FROM requests r
+    LEFT JOIN request_payloads p ON p.id = r.id
+    WHERE r.id = %s
 """
 
 CLEANUP_OLDER_THAN = "DELETE FROM requests WHERE timestamp < %s"
 
+CLEANUP_PAYLOADS_OLDER_THAN = "DELETE FROM request_payloads WHERE timestamp < %s"
+
+# Deletes everything older than the last row to keep, found by its offset in the index
 CLEANUP_MAX_RECORDS = """
-    DELETE FROM requests 
-    WHERE id NOT IN (
-        SELECT id FROM requests ORDER BY timestamp DESC LIMIT %s
+    DELETE FROM requests
+    WHERE (timestamp, id) < (
+        SELECT timestamp, id FROM requests ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET %s
     )
 """
@@ -23,15 +23,84 @@ CREATE_TABLE = """
   );
 """
 
+# Columns added after the original schema, applied to existing databases on init.
+ADDED_COLUMNS = [
+    ("request_size_bytes", "INTEGER"),
+    ("request_body_truncated", "INTEGER"),
+]
+
+TABLE_COLUMNS = "PRAGMA table_info(requests)"
+
+ADD_COLUMN = "ALTER TABLE requests ADD COLUMN {name} {type}"
+
+# Schema migrations, applied in order by init_db. The number of applied migrations is
+# stored in PRAGMA user_version, so only append to this list; never edit an entry that
+# has already shipped.
+MIGRATIONS = [
+    # 1: indexes for the dashboard's filter shapes and for retention deletes
+    [
+        # Default listing, time range filters and retention
+        "CREATE INDEX IF NOT EXISTS idx_requests_timestamp ON requests (timestamp, id)",
+        # Equality filters keep the listing order within the matching rows
+        "CREATE INDEX IF NOT EXISTS idx_requests_status_code ON requests (status_code, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_requests_log_level ON requests (log_level, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_requests_method ON requests (method, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_requests_duration ON requests (duration_ms, timestamp)",
+        # Only failed requests, which are a small fraction of the table
+        """
+        CREATE INDEX IF NOT EXISTS idx_requests_errors ON requests (timestamp, id)
+        WHERE status_code >= 400 OR error_message IS NOT NULL
+        """,
+    ],
+    # 2: side table for bulky payload columns, used when payloads are split
+    [
+        """
+        CREATE TABLE IF NOT EXISTS request_payloads (
+            id INTEGER PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            headers TEXT,
+            request_query TEXT,
+            request_body TEXT,
+            response_headers TEXT,
+            response_body TEXT,
+            stack_trace TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_request_payloads_timestamp ON request_payloads (timestamp)",
+        """
+        CREATE TRIGGER IF NOT EXISTS request_payloads_delete AFTER DELETE ON requests BEGIN
+            DELETE FROM request_payloads WHERE id = old.id;
+        END
+        """,
+    ],
+]
+
+SCHEMA_VERSION = "PRAGMA user_version"
+
+SET_SCHEMA_VERSION = "PRAGMA user_version = {version}"
+
+
 INSERT_LOG = """
     INSERT INTO requests (
         content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
         client_ip, user_agent, request_query, request_body, response_headers, response_body,
-        response_size_bytes, error_message, stack_trace
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) 
+"""
+
+# Used when the log ID was generated in-process (e.g. snowflake IDs)
+INSERT_LOG_WITH_ID = """
+    INSERT INTO requests (
+        content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
+        client_ip, user_agent, request_query, request_body, response_headers, response_body,
+        response_size_bytes, error_message, stack_trace, request_size_bytes, request_body_truncated, id
     )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
 """
 
+LAST_INSERT_ID = "SELECT last_insert_rowid()"
+
 FETCH_LOGS_BASE = """
     SELECT 
         id, content, timestamp, method, path, url, log_level, status_code, duration_ms, error_message
@@ -39,20 +108,89 @@ FETCH_LOGS_BASE = """
     WHERE timestamp >= ?
 """
 
+INSERT_PAYLOAD = """
+    INSERT INTO request_payloads (
+        id, timestamp, headers, request_query, request_body, response_headers, response_body, stack_trace
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Payload columns come from request_payloads when they were split out of the row
 FETCH_LOG_BY_ID = """
     SELECT 
-        id, content, timestamp, method, path, url, headers, log_level, status_code, duration_ms,
-        client_ip, user_agent, request_query, request_body, response_headers, response_body,
-        response_size_bytes, error_message, stack_trace
-    FROM requests
-    WHERE id = ?
+        r.id, r.content, r.timestamp, r.method, r.path, r.url, COALESCE(p.headers, r.headers),
+        r.log_level, r.status_code, r.duration_ms, r.client_ip, r.user_agent,
+        COALESCE(p.request_query, r.request_query), COALESCE(p.request_body, r.request_body),
+        COALESCE(p.response_headers, r.response_headers), COALESCE(p.response_body, r.response_body),
+        r.response_size_bytes, r.error_message, COALESCE(p.stack_trace, r.stack_trace),
+        r.request_size_bytes, r.request_body_truncated
+    FROM requests r
+    LEFT JOIN request_payloads p ON p.id = r.id
+    WHERE r.id = ?
 """
 
 CLEANUP_OLDER_THAN = "DELETE FROM requests WHERE timestamp < ?"
 
+CLEANUP_PAYLOADS_OLDER_THAN = "DELETE FROM request_payloads WHERE timestamp < ?"
+
+# Row count and ID range of a shard of ShardedSQLiteConnector
+SHARD_STATS = "SELECT COUNT(*), MIN(id), MAX(id) FROM requests"
+
+# Deletes everything older than the last row to keep, found by its offset in the index
 CLEANUP_MAX_RECORDS = """
-    DELETE FROM requests 
-    WHERE id NOT IN (
-        SELECT id FROM requests ORDER BY timestamp DESC, id DESC LIMIT ?
+    DELETE FROM requests
+    WHERE (timestamp, id) < (
+        SELECT timestamp, id FROM requests ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?
     )
 """
+
+# Optional FTS5 index over text columns, kept in sync with requests by triggers.
+# It stores no copy of the text (external content), only the index.
+FTS_COLUMNS = ("content", "error_message", "url")
+
+FTS_TABLE_COLUMNS = "PRAGMA table_info(requests_fts)"
+
+CREATE_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS requests_fts USING fts5(
+        {columns}, content='requests', content_rowid='id', prefix='2 3'
+    )
+"""
+
+CREATE_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_insert AFTER INSERT ON requests BEGIN
+        INSERT INTO requests_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_delete AFTER DELETE ON requests BEGIN
+        INSERT INTO requests_fts (requests_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS requests_fts_update AFTER UPDATE ON requests BEGIN
+        INSERT INTO requests_fts (requests_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        INSERT INTO requests_fts (rowid, {columns}) VALUES (new.id, {new_columns});
+    END
+    """,
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS requests_fts_insert",
+    "DROP TRIGGER IF EXISTS requests_fts_delete",
+    "DROP TRIGGER IF EXISTS requests_fts_update",
+    "DROP TABLE IF EXISTS requests_fts",
+]
+
+REBUILD_FTS = "INSERT INTO requests_fts (requests_fts) VALUES ('rebuild')"
+
+# Same columns as FETCH_LOGS_BASE, restricted to the rows matching a full-text query
+FETCH_LOGS_SEARCH_BASE = """
+    SELECT 
+        id, content, timestamp, method, path, url, log_level, status_code, duration_ms, error_message
+    FROM requests
+    JOIN (
+        SELECT rowid AS match_id, rank FROM requests_fts WHERE requests_fts MATCH ?
+    ) AS matches ON matches.match_id = requests.id
+    WHERE timestamp >= ?
+"""
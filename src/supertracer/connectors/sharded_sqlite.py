@@ -0,0 +1,347 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from supertracer.connectors.base import BaseConnector
+from supertracer.connectors.queries import sqlite as queries
+from supertracer.connectors.sql import PARTITION_NAME_FORMATS, PARTITION_SECONDS
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.logs import Log
+from supertracer.types.filters import LogFilters, decode_cursor
+from supertracer.types.options import RetentionOptions
+
+# The UTC start of the shard's period, in the format of its partition length
+SHARD_NAME = re.compile(r"supertracer-(\d{8}|\d{10})\.db$")
+# Files SQLite keeps next to a database
+SQLITE_SUFFIXES = ("", "-wal", "-shm", "-journal")
+
+
+class Shard:
+    """A shard file, the period it covers and the rows known to be in it."""
+
+    def __init__(self, path: str, lower: float, upper: float):
+        self.path = path
+        self.lower = lower
+        self.upper = upper
+        self.count = 0
+        self.min_id: Optional[int] = None
+        self.max_id: Optional[int] = None
+        self.connector: Optional[SQLiteConnector] = None
+        # Queries and writes in progress, the shard is only closed once there are none
+        self.users = 0
+        self.expired = False
+
+    def track(self, count: int, min_id: Optional[int], max_id: Optional[int]) -> None:
+        if not count or min_id is None or max_id is None:
+            return
+        self.count += count
+        self.min_id = min_id if self.min_id is None else min(self.min_id, min_id)
+        self.max_id = max_id if self.max_id is None else max(self.max_id, max_id)
+
+    def unlink(self) -> None:
+        for suffix in SQLITE_SUFFIXES:
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+
+class ShardedSQLiteConnector(BaseConnector):
+    """Connector that writes each day or hour of logs to its own SQLite file.
+
+    Each shard is a regular SQLite database, written and read through its own
+    SQLiteConnector. fetch_logs queries the shards that overlap the requested
+    time range, newest first, and merges their pages; an older shard is only
+    queried once the page reaches its period. Retention deletes whole shard
+    files, so cleanup is instant and the disk space is freed right away.
+
+    Args:
+        directory (str): Directory holding the shard files.
+        shard_by (str): "day" or "hour" (UTC), the period each shard file covers.
+        max_open_shards (int): Number of shards kept open. Others are opened again when a query reaches them.
+        **sqlite_options: Options for the SQLiteConnector of each shard, such as full_text_search or split_payloads.
+    """
+
+    def __init__(
+        self,
+        directory: str = "supertracer_shards",
+        shard_by: Literal["day", "hour"] = "day",
+        max_open_shards: int = 4,
+        **sqlite_options: Any,
+    ):
+        if shard_by not in PARTITION_SECONDS:
+            raise ValueError(f"Unsupported shard_by: {shard_by}")
+        if max_open_shards < 1:
+            raise ValueError("max_open_shards must be at least 1")
+        if "db_path" in sqlite_options:
+            raise ValueError("db_path is set per shard, use directory instead")
+        # Fail on invalid options now rather than when the first shard is opened
+        SQLiteConnector(**sqlite_options)
+        self.directory = directory
+        self.shard_by = shard_by
+        self.max_open_shards = max_open_shards
+        self.sqlite_options = sqlite_options
+        self._shards: Dict[str, Shard] = {}
+        # Open shards, least recently used first
+        self._open: "OrderedDict[str, Shard]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def connect(self) -> None:
+        """Find the shards in the directory and read how many logs each one holds."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for name in sorted(os.listdir(self.directory)):
+                match = SHARD_NAME.match(name)
+                if not match:
+                    continue
+                # Shards written with another shard_by are kept, with their own period
+                period = "day" if len(match.group(1)) == 8 else "hour"
+                start = datetime.strptime(match.group(1), PARTITION_NAME_FORMATS[period])
+                lower = start.replace(tzinfo=timezone.utc).timestamp()
+                shard = Shard(os.path.join(self.directory, name), lower, lower + PARTITION_SECONDS[period])
+                try:
+                    with self._use(shard) as connector:
+                        shard.track(*connector.query(queries.SHARD_STATS)[0])
+                except sqlite3.Error as exc:
+                    print(f"SuperTracer Error: {shard.path}: {exc}")
+                    continue
+                self._shards[shard.path] = shard
+                if shard.max_id is not None:
+                    self._next_id = max(self._next_id, shard.max_id + 1)
+
+    def disconnect(self) -> None:
+        with self._lock:
+            for shard in self._open.values():
+                if shard.connector is not None:
+                    shard.connector.disconnect()
+                    shard.connector = None
+            self._open.clear()
+            self._shards.clear()
+
+    def init_db(self) -> None:
+        """Nothing to create here, each shard is created with its schema on its first write."""
+        pass
+
+    @contextmanager
+    def _use(self, shard: Shard) -> Iterator[SQLiteConnector]:
+        """Open a shard if needed and keep it open while the caller uses it."""
+        with self._lock:
+            if shard.connector is None:
+                connector = SQLiteConnector(db_path=shard.path, **self.sqlite_options)
+                connector.connect()
+                try:
+                    connector.init_db()
+                except Exception:
+                    connector.disconnect()
+                    raise
+                shard.connector = connector
+            shard.users += 1
+            self._open[shard.path] = shard
+            self._open.move_to_end(shard.path)
+            self._close_idle()
+        try:
+            yield shard.connector
+        finally:
+            with self._lock:
+                shard.users -= 1
+                self._close_idle()
+
+    def _close_idle(self) -> None:
+        """Close the least recently used shards beyond max_open_shards, and delete expired shards no one uses any more."""
+        excess = len(self._open) - self.max_open_shards
+        for shard in list(self._open.values()):
+            if shard.users or not (shard.expired or excess > 0):
+                continue
+            if shard.connector is not None:
+                shard.connector.disconnect()
+                shard.connector = None
+            del self._open[shard.path]
+            excess -= 1
+            # A new shard may have been started for the same period since it expired
+            if shard.expired and shard.path not in self._shards:
+                shard.unlink()
+
+    def _shard_for(self, timestamp: float) -> Shard:
+        period = PARTITION_SECONDS[self.shard_by]
+        lower = timestamp // period * period
+        start = datetime.fromtimestamp(lower, tz=timezone.utc)
+        path = os.path.join(self.directory, f"supertracer-{start.strftime(PARTITION_NAME_FORMATS[self.shard_by])}.db")
+        shard = self._shards.get(path)
+        if shard is None:
+            shard = self._shards[path] = Shard(path, lower, lower + period)
+        return shard
+
+    def save_log(self, log: Log) -> int:
+        return self.save_logs([log])[0]
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries, in one transaction per shard they fall in."""
+        if not logs:
+            return []
+        groups: Dict[str, Tuple[Shard, List[Log]]] = {}
+        with self._lock:
+            log_ids = []
+            for log in logs:
+                # IDs are assigned here rather than by SQLite, so they are unique across shards
+                log_id = log.get('id') or self._next_id
+                self._next_id = max(self._next_id, log_id + 1)
+                log_ids.append(log_id)
+                timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else float(log['timestamp'])
+                shard = self._shard_for(timestamp)
+                groups.setdefault(shard.path, (shard, []))[1].append(dict(log, id=log_id))  # type: ignore[arg-type]
+
+        for shard, shard_logs in groups.values():
+            with self._use(shard) as connector:
+                saved_ids = connector.save_logs(shard_logs)
+            with self._lock:
+                shard.track(len(saved_ids), min(saved_ids), max(saved_ids))
+        return log_ids
+
+    def fetch_logs(self, filters: Optional[LogFilters] = None) -> List[Log]:
+        """Fetch log entries from the shards that overlap the time range.
+
+        Every shard orders its page by time, so the pages are merged newest first.
+        A shard's logs are all older than the end of its period, so it is only
+        queried once the merge gets there, and only for the rest of the page.
+        With ``order_by='relevance'``, each shard ranks its own matches and the
+        shards are taken newest first.
+        """
+        filters = filters or LogFilters()
+        lo = filters.start_date.timestamp() if filters.start_date and filters.start_date != datetime.min else float('-inf')
+        hi = filters.end_date.timestamp() if filters.end_date else float('inf')
+        cursor_timestamp = decode_cursor(filters.cursor)[0].timestamp() if filters.cursor else float('inf')
+        with self._lock:
+            shards = sorted(
+                (s for s in self._shards.values() if s.count and s.upper > lo and s.lower < hi and s.lower <= cursor_timestamp),
+                key=lambda s: s.upper,
+                reverse=True,
+            )
+
+        if filters.order_by == 'relevance' and filters.search_text:
+            logs: List[Log] = []
+            for shard in shards:
+                logs.extend(self._fetch_shard(shard, filters, filters.limit - len(logs)))
+                if len(logs) >= filters.limit:
+                    break
+            return logs
+        return self._merge(shards, filters)
+
+    def _merge(self, shards: List[Shard], filters: LogFilters) -> List[Log]:
+        heap: List[Tuple[float, int, int, Log, Iterator[Log]]] = []
+        order = itertools.count()
+
+        def push(logs: Iterator[Log]) -> None:
+            for log in logs:
+                heapq.heappush(heap, (-log['timestamp'].timestamp(), -log['id'], next(order), log, logs))
+                return
+
+        merged: List[Log] = []
+        remaining = iter(shards)
+        shard = next(remaining, None)
+        while len(merged) < filters.limit:
+            # Every log merged so far is newer than the shard, so it only has to fill the rest of the page
+            while shard is not None and (not heap or shard.upper >= -heap[0][0]):
+                push(iter(self._fetch_shard(shard, filters, filters.limit - len(merged))))
+                shard = next(remaining, None)
+            if not heap:
+                break
+            _, _, _, log, logs = heapq.heappop(heap)
+            merged.append(log)
+            push(logs)
+        return merged
+
+    def _fetch_shard(self, shard: Shard, filters: LogFilters, limit: int) -> List[Log]:
+        try:
+            with self._use(shard) as connector:
+                return connector.fetch_logs(filters.model_copy(update={'limit': limit}))
+        except sqlite3.Error as exc:
+            # One unreadable shard shouldn't hide the logs of the others
+            print(f"SuperTracer Error: {shard.path}: {exc}")
+            return []
+
+    def fetch_log(self, log_id: int) -> Optional[Log]:
+        """Fetch a single log entry by ID from the shards whose ID range holds it."""
+        with self._lock:
+            shards = sorted(
+                (s for s in self._shards.values() if s.min_id is not None and s.max_id is not None and s.min_id <= log_id <= s.max_id),
+                key=lambda s: s.upper,
+                reverse=True,
+            )
+        for shard in shards:
+            try:
+                with self._use(shard) as connector:
+                    log = connector.fetch_log(log_id)
+            except sqlite3.Error as exc:
+                # Another shard may hold a log with the same ID range
+                print(f"SuperTracer Error: {shard.path}: {exc}")
+                continue
+            if log is not None:
+                return log
+        return None
+
+    def cleanup(self, retention_options: RetentionOptions) -> int:
+        """Clean up old logs by deleting whole shard files.
+
+        A shard is deleted once its period ends before the cutoff, or once the
+        newer shards hold max_records logs, so logs can outlive the limits by up
+        to one shard. Payload retention is left to each remaining shard.
+        """
+        if not retention_options.enabled:
+            return 0
+
+        now = time.time()
+        deleted_count = 0
+        with self._lock:
+            newest_first = sorted(self._shards.values(), key=lambda s: s.upper, reverse=True)
+
+            # 1. Delete older than X hours
+            if retention_options.cleanup_older_than_hours > 0:
+                cutoff = now - retention_options.cleanup_older_than_hours * 3600
+                for shard in newest_first:
+                    if shard.upper <= cutoff:
+                        deleted_count += self._expire(shard)
+
+            # 2. Enforce max_records
+            if retention_options.max_records > 0:
+                kept = 0
+                for shard in newest_first:
+                    if shard.expired:
+                        continue
+                    if kept >= retention_options.max_records:
+                        deleted_count += self._expire(shard)
+                    kept += shard.count
+
+            shards = [s for s in newest_first if not s.expired]
+
+        # Drop payloads in the shards that still have some past their retention
+        if retention_options.payload_retention_hours > 0:
+            payload_cutoff = now - retention_options.payload_retention_hours * 3600
+            payload_options = RetentionOptions(
+                enabled=True,
+                max_records=0,
+                cleanup_older_than_hours=0,
+                payload_retention_hours=retention_options.payload_retention_hours,
+            )
+            for shard in shards:
+                if shard.lower < payload_cutoff and shard.count:
+                    with self._use(shard) as connector:
+                        connector.cleanup(payload_options)
+
+        return deleted_count
+
+    def _expire(self, shard: Shard) -> int:
+        """Forget a shard and delete its files, or leave them to the last query still reading it."""
+        del self._shards[shard.path]
+        shard.expired = True
+        if shard.path not in self._open:
+            shard.unlink()
+        else:
+            self._close_idle()
+        return shard.count
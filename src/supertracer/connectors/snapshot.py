@@ -0,0 +1,163 @@
+"""Binary snapshot files, used by MemoryConnector to survive restarts.
+
+A snapshot is a magic line, the length of a JSON header, the header and then
+the data sections back to back. The header holds the small values and where
+each section starts. Sections hold whole columns: typed arrays as raw bytes,
+texts joined by a separator character and payloads concatenated, so reading a
+snapshot copies each section out of a memory map once, with no per-row parsing.
+"""
+from array import array
+from typing import Any, Dict, List, Optional
+import itertools
+import json
+import mmap
+import operator
+import os
+import struct
+import sys
+
+MAGIC = b"SUPERTRACER SNAPSHOT\n"
+VERSION = 1
+HEADER_LENGTH = struct.Struct("<I")
+
+
+def pick_separator(texts: List[str]) -> str:
+    """Return a character that none of the texts contain."""
+    joined = "".join(texts)
+    # Control characters first, then the private use planes
+    for code in itertools.chain(range(32), range(0xE000, 0x110000)):
+        if chr(code) not in joined:
+            return chr(code)
+    raise ValueError("No separator character left for the snapshot texts")
+
+
+class SnapshotWriter:
+    """Collects sections in memory and writes them to a snapshot file.
+
+    Args:
+        header (Dict[str, Any]): JSON-serializable values stored in the header.
+    """
+
+    def __init__(self, header: Dict[str, Any]):
+        self.header = dict(header, version=VERSION, byteorder=sys.byteorder, sections={})
+        self._sections: List[bytes] = []
+        self._offset = 0
+
+    def add(self, name: str, data: bytes, **info: Any) -> None:
+        self.header['sections'][name] = dict(info, offset=self._offset, length=len(data))
+        self._sections.append(data)
+        self._offset += len(data)
+
+    def add_array(self, name: str, values: array) -> None:
+        self.add(name, values.tobytes(), typecode=values.typecode)
+
+    def add_texts(self, name: str, values: List[Optional[str]]) -> None:
+        """Add a column of texts, keeping None apart from empty strings."""
+        texts = [value or "" for value in values]
+        separator = pick_separator(texts)
+        self.add(name, separator.join(texts).encode("utf-8", "surrogatepass"), separator=separator, count=len(texts))
+        self.add_array(f"{name}.none", array('b', [value is None for value in values]))
+
+    def add_blobs(self, name: str, values: List[Optional[bytes]]) -> None:
+        """Add a column of byte strings, keeping None apart from empty ones."""
+        blobs = [value or b"" for value in values]
+        self.add(name, b"".join(blobs))
+        self.add_array(f"{name}.lengths", array('i', map(len, blobs)))
+        self.add_array(f"{name}.none", array('b', [value is None for value in values]))
+
+    def write(self, path: str) -> None:
+        """Write the snapshot to a temporary file and move it over ``path``, so a crash never leaves half a snapshot."""
+        header = json.dumps(self.header, separators=(',', ':')).encode()
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(MAGIC)
+            file.write(HEADER_LENGTH.pack(len(header)))
+            file.write(header)
+            for data in self._sections:
+                file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+
+class SnapshotReader:
+    """Reads the sections of a snapshot file through a memory map.
+
+    Args:
+        path (str): Path of the snapshot file.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a SuperTracer snapshot")
+            start = len(MAGIC) + HEADER_LENGTH.size
+            (length,) = HEADER_LENGTH.unpack(self._map[len(MAGIC):start])
+            self.header: Dict[str, Any] = json.loads(self._map[start:start + length])
+            if self.header.get('version') != VERSION:
+                raise ValueError(f"Unsupported snapshot version: {self.header.get('version')}")
+            self._base = start + length
+        except Exception:
+            self._map.close()
+            raise
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._map.close()
+
+    def _bounds(self, name: str) -> slice:
+        info = self.header['sections'][name]
+        start = self._base + info['offset']
+        return slice(start, start + info['length'])
+
+    def section(self, name: str) -> bytes:
+        return self._map[self._bounds(name)]
+
+    def array(self, name: str, start: int = 0, count: Optional[int] = None) -> array:
+        """Read an array section, or ``count`` items of it from ``start`` on."""
+        values = array(self.header['sections'][name]['typecode'])
+        bounds = self._bounds(name)
+        begin = bounds.start + start * values.itemsize
+        end = bounds.stop if count is None else begin + count * values.itemsize
+        # Straight from the map, without an intermediate bytes copy
+        with memoryview(self._map) as view:
+            values.frombytes(view[begin:end])
+        if self.header['byteorder'] != sys.byteorder:
+            values.byteswap()
+        return values
+
+    def texts(self, name: str, intern: bool = False) -> List[Optional[str]]:
+        """Read a column of texts, with ``intern`` to intern each of them."""
+        info = self.header['sections'][name]
+        if not info['count']:
+            return []
+        with memoryview(self._map) as view:
+            text = str(view[self._bounds(name)], "utf-8", "surrogatepass")
+        values = text.split(info['separator'])
+        if intern:
+            # Intern each distinct text once, then share it between the rows
+            interned = {value: sys.intern(value) for value in set(values)}
+            values = list(map(interned.__getitem__, values))
+        return self._restore_none(name, values)
+
+    def blobs(self, name: str) -> List[Optional[bytes]]:
+        data = self.section(name)
+        ends = list(itertools.accumulate(self.array(f"{name}.lengths")))
+        starts = [0] + ends[:-1]
+        return self._restore_none(name, [data[start:end] for start, end in zip(starts, ends)])
+
+    def _restore_none(self, name: str, values: List[Any]) -> List[Any]:
+        """Put None back where the ``.none`` section says, going over whichever of the two kinds of value is rarer."""
+        none = self.array(f"{name}.none")
+        if none.count(1) * 2 <= len(none):
+            for i in itertools.compress(itertools.count(), none):
+                values[i] = None
+            return values
+        restored: List[Any] = [None] * len(values)
+        for i in itertools.compress(itertools.count(), map(operator.not_, none)):
+            restored[i] = values[i]
+        return restored
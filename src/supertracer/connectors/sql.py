@@ -1,11 +1,37 @@
 from abc import abstractmethod
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 from supertracer.connectors.base import BaseConnector
 from supertracer.types.logs import Log
 from supertracer.types.filters import LogFilters
 from supertracer.types.options import RetentionOptions
 from datetime import datetime, timedelta
 import json
+import re
+
+# Bulky columns that can be stored in a payload table apart from the list rows
+PAYLOAD_COLUMNS = ('headers', 'request_query', 'request_body', 'response_headers', 'response_body', 'stack_trace')
+
+# Partition length in seconds and the UTC start time format used in partition and shard names
+PARTITION_SECONDS = {"day": 86400, "hour": 3600}
+PARTITION_NAME_FORMATS = {"day": "%Y%m%d", "hour": "%Y%m%d%H"}
+
+
+def status_class_range(status_code: str) -> Optional[Tuple[int, int]]:
+    """Return the (low, high) range for a status class filter such as '5XX' or '40x'.
+
+    Returns None for filters that are not a digit prefix followed by wildcards.
+    """
+    match = re.fullmatch(r'([1-5]\d{0,2})([xX]*)', status_code)
+    if not match or len(status_code) != 3:
+        return None
+    prefix, wildcards = match.groups()
+    scale = 10 ** len(wildcards)
+    low = int(prefix) * scale
+    return low, low + scale - 1
+
+def json_key_path(key: str) -> str:
+    """Return the JSON path of a top-level key, e.g. $."x-tenant"."""
+    return '$."' + key.replace('"', '') + '"'
 
 class SQLConnector(BaseConnector):
     """Base SQL connector that handles common SQL operations.
@@ -31,6 +57,64 @@ class SQLConnector(BaseConnector):
         """Save a log entry to the database."""
         pass
     
+    def _insert_params(self, log: Log, split_payloads: bool = False) -> tuple:
+        """Build the INSERT_LOG parameters for a log entry.
+
+        With ``split_payloads`` the bulky columns are left empty, as they are stored
+        in the payload table instead.
+        """
+        # Convert datetime to timestamp
+        timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else log['timestamp']
+        
+        if split_payloads:
+            payload: tuple = (None,) * len(PAYLOAD_COLUMNS)
+        else:
+            payload = self._payload_values(log)
+        headers, request_query, request_body, response_headers, response_body, stack_trace = payload
+
+        return (
+            log.get('content'),
+            timestamp,
+            log.get('method'),
+            log.get('path'),
+            log.get('url'),
+            headers,
+            log.get('log_level'),
+            log.get('status_code'),
+            log.get('duration_ms'),
+            log.get('client_ip'),
+            log.get('user_agent'),
+            request_query,
+            request_body,
+            response_headers,
+            response_body,
+            log.get('response_size_bytes'),
+            log.get('error_message'),
+            stack_trace,
+            log.get('request_size_bytes'),
+            log.get('request_body_truncated'),
+        )
+
+    def _payload_params(self, log: Log, log_id: int) -> tuple:
+        """Build the INSERT_PAYLOAD parameters for a log entry."""
+        timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else log['timestamp']
+        return (log_id, timestamp) + self._payload_values(log)
+
+    def _to_json(self, value: Any) -> Optional[str]:
+        """Serialize a JSON column value."""
+        return json.dumps(value) if value is not None else None
+
+    def _payload_values(self, log: Log) -> tuple:
+        to_json = self._to_json
+        return (
+            to_json(log.get('headers')),
+            to_json(log.get('request_query')),
+            to_json(log.get('request_body')),
+            to_json(log.get('response_headers')),
+            to_json(log.get('response_body')),
+            log.get('stack_trace'),
+        )
+    
     @abstractmethod
     def fetch_logs(
         self, 
@@ -1,13 +1,40 @@
 import sqlite3
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 import json
 from datetime import datetime, timedelta
-from supertracer.connectors.sql import SQLConnector
+from supertracer.connectors.sql import SQLConnector, json_key_path, status_class_range
 from supertracer.types.options import RetentionOptions
 from supertracer.types.logs import Log
-from supertracer.types.filters import LogFilters
+from supertracer.types.filters import LogFilters, decode_cursor
 from supertracer.connectors.queries import sqlite as queries
+from contextlib import contextmanager
+from urllib.request import pathname2url
 import os
+import queue
+import re
+import threading
+
+JOURNAL_MODES = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def to_fts_query(search_text: str) -> Optional[str]:
+    """Convert dashboard search text into an FTS5 query.
+
+    Quoted text is matched as a phrase and every other word as a prefix, so
+    ``"connection reset" user`` finds rows with that phrase and a word starting
+    with ``user``. Returns None if the text has nothing to search for.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search_text):
+        # A stray quote in a word is not a phrase, drop it
+        text = phrase if phrase else word.replace('"', '').rstrip('*')
+        if not re.search(r'\w', text):
+            continue
+        quoted = '"' + text.replace('"', '""') + '"'
+        terms.append(quoted if phrase else quoted + '*')
+    return ' '.join(terms) if terms else None
+
 
 
 class SQLiteConnector(SQLConnector):
@@ -15,26 +42,85 @@ class SQLiteConnector(SQLConnector):
     
     Args:
         db_path (str): Path to the SQLite database file.
+        full_text_search (bool): Serve ``search_text`` from an FTS5 index instead of a LIKE scan.
+        search_columns (Sequence[str]): Columns indexed for full-text search: content, error_message and/or url.
+        read_connections (int): Maximum number of read-only connections used by queries. 0 reads through the writer connection.
+        journal_mode (str): SQLite journal mode. WAL lets reads run while logs are written.
+        synchronous (str): SQLite synchronous setting. NORMAL is durable in WAL mode except on power loss.
+        cache_size_kb (int): Page cache size per connection, in KiB.
+        mmap_size (int): Bytes of the database file to memory-map per connection. 0 disables mmap.
+        busy_timeout_ms (int): How long a connection waits for a lock before failing.
+        split_payloads (bool): Store headers, bodies and stack traces in a side table so list queries only read narrow rows.
     """
     
-    def __init__(self, db_path: str = "supertracer.db"):
+    def __init__(
+        self,
+        db_path: str = "supertracer.db",
+        full_text_search: bool = False,
+        search_columns: Sequence[str] = ("content",),
+        read_connections: int = 4,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size_kb: int = 16384,
+        mmap_size: int = 256 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+        split_payloads: bool = False,
+    ):
         super().__init__()
         self.db_path = db_path
+        if not search_columns:
+            raise ValueError("search_columns must not be empty")
+        for column in search_columns:
+            if column not in queries.FTS_COLUMNS:
+                raise ValueError(f"Unsupported search column: {column}")
+        if journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal_mode: {journal_mode}")
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+        if read_connections < 0:
+            raise ValueError("read_connections must not be negative")
+        self.full_text_search = full_text_search
+        self.search_columns = tuple(search_columns)
+        self.read_connections = read_connections
+        self.journal_mode = journal_mode.upper()
+        self.synchronous = synchronous.upper()
+        self.cache_size_kb = int(cache_size_kb)
+        self.mmap_size = int(mmap_size)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.split_payloads = split_payloads
+
+        # The writer connection and its cursor are used from the writer, cleanup and
+        # request threads; reads go through a pool of read-only connections
+        self._lock = threading.RLock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._pool_lock = threading.Lock()
         
+    @property
+    def _shares_connection(self) -> bool:
+        # Other connections can't open a private in-memory database
+        return self.read_connections == 0 or self.db_path in ("", ":memory:")
+
     def execute(self, query: str, params: tuple = ()) -> Any:
         """Execute a query (INSERT, UPDATE, DELETE, DDL)."""
-        self.cursor.execute(query, params)
-        self.connection.commit()
-        return self.cursor.lastrowid
+        with self._lock:
+            self.cursor.execute(query, params)
+            self.connection.commit()
+            return self.cursor.lastrowid
     
     def query(self, query: str, params: tuple = ()) -> list:
         """Execute a query and return the results (SELECT)."""
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        if self._shares_connection:
+            with self._lock:
+                self.cursor.execute(query, params)
+                return self.cursor.fetchall()
+        with self._reader() as connection:
+            return connection.execute(query, params).fetchall()
         
     def commit_transaction(self) -> None:
         """Commit the current database transaction."""
-        self.connection.commit()
+        with self._lock:
+            self.connection.commit()
     
     def connect(self) -> None:
         """Establish connection to the SQLite database."""
@@ -42,69 +128,209 @@ class SQLiteConnector(SQLConnector):
             self.db_path, 
             check_same_thread=False  # Allow usage across multiple threads
         )
+        # WAL lets the read connections see committed data while a write is in progress
+        self.connection.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        self.connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        self._configure(self.connection)
         self.cursor = self.connection.cursor()
+
+    def _configure(self, connection: sqlite3.Connection) -> None:
+        """Apply the per-connection pragmas."""
+        connection.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        # A negative cache_size is in KiB rather than pages
+        connection.execute(f"PRAGMA cache_size = -{self.cache_size_kb}")
+        connection.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = "file:" + pathname2url(os.path.abspath(self.db_path)) + "?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._configure(connection)
+        connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, opening one if the pool isn't full."""
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._reader_count < self.read_connections
+                if can_open:
+                    self._reader_count += 1
+            if can_open:
+                try:
+                    connection = self._open_reader()
+                except Exception:
+                    with self._pool_lock:
+                        self._reader_count -= 1
+                    raise
+            else:
+                connection = self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
     
     def init_db(self) -> None:
         """Initialize the requests table schema."""
         # Create table if not exists
         self.execute(queries.CREATE_TABLE)
+        self._add_missing_columns()
         self.commit_transaction()
+        self._migrate()
+        if self.full_text_search:
+            self._init_full_text_search()
+
+    def _add_missing_columns(self) -> None:
+        """Add columns introduced after the original schema to an existing table."""
+        existing = {row[1] for row in self.query(queries.TABLE_COLUMNS)}
+        for name, column_type in queries.ADDED_COLUMNS:
+            if name not in existing:
+                self.execute(queries.ADD_COLUMN.format(name=name, type=column_type))
+    
+    def _migrate(self) -> None:
+        """Apply pending schema migrations, each one in its own transaction."""
+        version = self.query(queries.SCHEMA_VERSION)[0][0]
+        for target in range(version + 1, len(queries.MIGRATIONS) + 1):
+            with self._lock:
+                try:
+                    self.cursor.execute("BEGIN")
+                    for statement in queries.MIGRATIONS[target - 1]:
+                        self.cursor.execute(statement)
+                    self.cursor.execute(queries.SET_SCHEMA_VERSION.format(version=target))
+                    self.connection.commit()
+                except Exception:
+                    self.connection.rollback()
+                    raise
+    
+    def _init_full_text_search(self) -> None:
+        """Create the FTS5 index and its triggers, indexing existing rows when it is new."""
+        existing = tuple(row[1] for row in self.query(queries.FTS_TABLE_COLUMNS))
+        if existing == self.search_columns:
+            return
+
+        columns = ', '.join(self.search_columns)
+        new_columns = ', '.join(f'new.{column}' for column in self.search_columns)
+        old_columns = ', '.join(f'old.{column}' for column in self.search_columns)
+        with self._lock:
+            try:
+                self.cursor.execute("BEGIN")
+                # The indexed columns changed, start over
+                for statement in queries.DROP_FTS:
+                    self.cursor.execute(statement)
+                self.cursor.execute(queries.CREATE_FTS_TABLE.format(columns=columns))
+                for statement in queries.CREATE_FTS_TRIGGERS:
+                    self.cursor.execute(statement.format(columns=columns, new_columns=new_columns, old_columns=old_columns))
+                self.cursor.execute(queries.REBUILD_FTS)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
     
     def save_log(self, log: Log) -> int:
         """Save a log entry to the database."""
-        
-        # Convert datetime to timestamp
-        timestamp = log['timestamp'].timestamp() if isinstance(log['timestamp'], datetime) else log['timestamp']
-        
-        # Serialize JSON fields
-        def to_json(val):
-            return json.dumps(val) if val is not None else None
-
-        res = self.execute(
-            queries.INSERT_LOG,
-            (
-                log.get('content'),
-                timestamp,
-                log.get('method'),
-                log.get('path'),
-                log.get('url'),
-                to_json(log.get('headers')),
-                log.get('log_level'),
-                log.get('status_code'),
-                log.get('duration_ms'),
-                log.get('client_ip'),
-                log.get('user_agent'),
-                to_json(log.get('request_query')),
-                to_json(log.get('request_body')),
-                to_json(log.get('response_headers')),
-                to_json(log.get('response_body')),
-                log.get('response_size_bytes'),
-                log.get('error_message'),
-                log.get('stack_trace')
-            )
-        )
+        if self.split_payloads:
+            # Row and payload are written in one transaction
+            return self.save_logs([log])[0]
+        if log.get('id'):
+            # Keep an ID generated in-process
+            self.execute(queries.INSERT_LOG_WITH_ID, self._insert_params(log) + (log['id'],))
+            return log['id']
+        res = self.execute(queries.INSERT_LOG, self._insert_params(log))
         self.commit_transaction()
         return res
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save a batch of log entries with executemany in a single transaction."""
+        if not logs:
+            return []
+            
+        with self._lock:
+            try:
+                if all(log.get('id') for log in logs):
+                    params = [self._insert_params(log, self.split_payloads) + (log['id'],) for log in logs]
+                    self.cursor.executemany(queries.INSERT_LOG_WITH_ID, params)
+                    log_ids = [log['id'] for log in logs]
+                else:
+                    params = [self._insert_params(log, self.split_payloads) for log in logs]
+                    self.cursor.executemany(queries.INSERT_LOG, params)
+                    self.cursor.execute(queries.LAST_INSERT_ID)
+                    last_id = self.cursor.fetchone()[0]
+                    # Rows inserted in one transaction get consecutive IDs
+                    log_ids = list(range(last_id - len(logs) + 1, last_id + 1))
+                if self.split_payloads:
+                    self.cursor.executemany(
+                        queries.INSERT_PAYLOAD,
+                        [self._payload_params(log, log_id) for log, log_id in zip(logs, log_ids)],
+                    )
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+        return log_ids
     
     def fetch_logs(
         self, 
         filters: Optional[LogFilters] = None,
     ) -> List[Log]:
         """Fetch log entries from the database."""
+        select_query, params = self._build_fetch_logs_query(filters or LogFilters())
+        rows = self.query(select_query, params)
+        logs: List[Log] = []
+        for row in rows:
+            log: Log = {
+                'id': row[0],
+                'content': row[1] or "",
+                'timestamp': datetime.fromtimestamp(row[2]),
+                'method': row[3],
+                'path': row[4],
+                'url': row[5],
+                'headers': None,
+                'log_level': row[6],
+                'status_code': row[7],
+                'duration_ms': row[8],
+                'client_ip': None,
+                'user_agent': None,
+                'request_query': None,
+                'request_body': None,
+                'request_size_bytes': None,
+                'request_body_truncated': None,
+                'response_headers': None,
+                'response_body': None,
+                'response_size_bytes': None,
+                'error_message': None,
+                'stack_trace': None
+            }
+            logs.append(log)
+        return logs
+
+    def _build_fetch_logs_query(self, filters: LogFilters) -> Tuple[str, tuple]:
+        """Build the fetch_logs statement and its parameters for the given filters."""
         # Use a safe minimum timestamp (Unix epoch start or later)
-        filters = filters or LogFilters()
         if filters.start_date == datetime.min:
             timestamp_value = 0.0  # Unix epoch (1970-01-01)
         else:
             timestamp_value = filters.start_date.timestamp() if filters and filters.start_date else 0.0
-        select_query = queries.FETCH_LOGS_BASE
-        params: List = [timestamp_value]
+        fts_query = to_fts_query(filters.search_text) if self.full_text_search and filters.search_text else None
+        if fts_query:
+            select_query = queries.FETCH_LOGS_SEARCH_BASE
+            params: List = [fts_query, timestamp_value]
+        else:
+            select_query = queries.FETCH_LOGS_BASE
+            params = [timestamp_value]
 
         if filters.end_date:
             select_query += " AND timestamp < ?"
             params.append(filters.end_date.timestamp())
 
-        if filters.search_text:
+        if filters.cursor:
+            # Seek past the last log of the previous page
+            cursor_timestamp, cursor_id = decode_cursor(filters.cursor)
+            select_query += " AND (timestamp, id) < (?, ?)"
+            params.extend([cursor_timestamp.timestamp(), cursor_id])
+
+        if filters.search_text and not fts_query:
             select_query += " AND content LIKE ?"
             params.append(f"%{filters.search_text}%")
             
@@ -115,12 +341,17 @@ class SQLiteConnector(SQLConnector):
         if filters.status_code:
             # Handle status code filtering
             # If it's a specific number, exact match
-            # If it contains wildcards or partial, use LIKE on string cast
+            # If it's a class like 5XX, a range
+            # Otherwise, use LIKE on string cast
             if filters.status_code.isdigit():
                 select_query += " AND status_code = ?"
                 params.append(int(filters.status_code))
+            elif status_class_range(filters.status_code):
+                # 2XX, 4XX etc. as a range so the status code index applies
+                select_query += " AND status_code BETWEEN ? AND ?"
+                params.extend(status_class_range(filters.status_code))
             else:
-                # Handle 2XX, 4XX etc or partial matches
+                # Handle partial matches
                 pattern = filters.status_code.replace('X', '_').replace('x', '_')
                 select_query += " AND CAST(status_code AS TEXT) LIKE ?"
                 params.append(pattern)
@@ -145,35 +376,28 @@ class SQLiteConnector(SQLConnector):
         if filters.has_error:
             select_query += " AND (status_code >= 400 OR error_message IS NOT NULL)"
 
-        select_query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        def payload_condition(condition: str, condition_params: list) -> str:
+            # Payload columns are in request_payloads for logs written with split payloads
+            if self.split_payloads:
+                params.extend(condition_params * 2)
+                return f" AND ({condition} OR id IN (SELECT id FROM request_payloads WHERE {condition}))"
+            params.extend(condition_params)
+            return f" AND {condition}"
+
+        for name, value in filters.header_pairs():
+            select_query += payload_condition("json_extract(headers, ?) = ?", [json_key_path(name), value])
+
+        for key in filters.body_keys or []:
+            select_query += payload_condition("json_type(request_body, ?) IS NOT NULL", [json_key_path(key)])
+
+        if fts_query and filters.order_by == 'relevance':
+            # FTS5 rank is bm25, lower is better
+            select_query += " ORDER BY matches.rank, timestamp DESC, id DESC LIMIT ?"
+        else:
+            select_query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
         params.append(filters.limit)
         
-        rows = self.query(select_query, tuple(params))
-        logs: List[Log] = []
-        for row in rows:
-            log: Log = {
-                'id': row[0],
-                'content': row[1] or "",
-                'timestamp': datetime.fromtimestamp(row[2]),
-                'method': row[3],
-                'path': row[4],
-                'url': row[5],
-                'headers': None,
-                'log_level': row[6],
-                'status_code': row[7],
-                'duration_ms': row[8],
-                'client_ip': None,
-                'user_agent': None,
-                'request_query': None,
-                'request_body': None,
-                'response_headers': None,
-                'response_body': None,
-                'response_size_bytes': None,
-                'error_message': None,
-                'stack_trace': None
-            }
-            logs.append(log)
-        return logs
+        return select_query, tuple(params)
 
     def fetch_log(self, log_id: int) -> Optional[Log]:
         """Fetch a single log entry by ID."""
@@ -199,6 +423,8 @@ class SQLiteConnector(SQLConnector):
             'user_agent': row[11],
             'request_query': json.loads(row[12]) if row[12] else None,
             'request_body': json.loads(row[13]) if row[13] else None,
+            'request_size_bytes': row[19],
+            'request_body_truncated': bool(row[20]) if row[20] is not None else None,
             'response_headers': json.loads(row[14]) if row[14] else None,
             'response_body': json.loads(row[15]) if row[15] else None,
             'response_size_bytes': row[16],
@@ -209,6 +435,10 @@ class SQLiteConnector(SQLConnector):
 
     def disconnect(self) -> None:
         """Close connection to the SQLite database."""
+        with self._pool_lock:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._reader_count = 0
         if self.cursor:
             self.cursor.close()
         if self.connection:
@@ -229,12 +459,15 @@ class SQLiteConnector(SQLConnector):
             self.execute(queries.CLEANUP_OLDER_THAN, (timestamp_val,))
             self.commit_transaction()
             
+        # Drop payloads before the rows themselves
+        if retention_options.payload_retention_hours > 0:
+            cutoff_time = datetime.now() - timedelta(hours=retention_options.payload_retention_hours)
+            self.execute(queries.CLEANUP_PAYLOADS_OLDER_THAN, (cutoff_time.timestamp(),))
+            
         # 2. Enforce max_records
         if retention_options.max_records > 0:
-            # Delete oldest records if count > max_records
-            # DELETE FROM requests WHERE id NOT IN (SELECT id FROM requests ORDER BY timestamp DESC LIMIT ?)
-            
-            self.execute(queries.CLEANUP_MAX_RECORDS, (retention_options.max_records,))
+            # Delete everything older than the max_records-th newest log
+            self.execute(queries.CLEANUP_MAX_RECORDS, (retention_options.max_records - 1,))
             self.commit_transaction()
             
         return deleted_count
@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import List, Optional
+
+from supertracer.connectors.base import BaseConnector
+from supertracer.connectors.memory import PAYLOAD_FIELDS, MemoryConnector
+from supertracer.services.ids import SnowflakeIdGenerator
+from supertracer.services.writer import LogWriter
+from supertracer.types.logs import Log
+from supertracer.types.filters import LogFilters
+from supertracer.types.options import RetentionOptions, WriterOptions
+
+
+class TieredConnector(BaseConnector):
+    """Connector that keeps the recent logs in memory in front of a durable connector.
+
+    Logs are saved to the hot MemoryConnector right away and spilled to the cold
+    connector in batches by a background LogWriter. fetch_logs is answered from
+    memory alone when the page is newer than every log memory no longer holds,
+    and merged with the cold tier otherwise. fetch_log checks memory first.
+
+    Logs without an ID get a snowflake ID when they are saved, so they keep the
+    same ID in both tiers. The spill blocks save_logs while its queue is full by
+    default, so the cold tier never misses a log; logs dropped under another
+    backpressure policy are reported and counted in ``spill_dropped``.
+
+    Args:
+        cold (BaseConnector): Durable connector every log is spilled to.
+        node_id (int): Node ID of the snowflake IDs, unique among the processes writing to the cold tier. See SnowflakeIdGenerator.
+        hot (Optional[MemoryConnector]): In-memory tier for the recent logs. Defaults to MemoryConnector().
+        spill_options (Optional[WriterOptions]): Batch size, flush interval, queue bound and backpressure of the spill to the cold tier.
+    """
+
+    def __init__(
+        self,
+        cold: BaseConnector,
+        node_id: int,
+        hot: Optional[MemoryConnector] = None,
+        spill_options: Optional[WriterOptions] = None,
+    ):
+        if isinstance(cold, MemoryConnector):
+            raise ValueError("The cold tier must be a durable connector")
+        self.cold = cold
+        self.hot = hot if hot is not None else MemoryConnector()
+        if spill_options is None:
+            spill_options = WriterOptions(flush_size=500, flush_interval_seconds=1.0, backpressure='block')
+        self.spill_writer = LogWriter(cold, spill_options)
+        self._ids = SnowflakeIdGenerator(node_id)
+        # Timestamp of the newest log the cold tier held before this process wrote to it.
+        # None until init_db has read it, every page is merged with the cold tier until then.
+        self._cold_until: Optional[datetime] = None
+
+    def connect(self) -> None:
+        """Connect both tiers and start spilling to the cold tier."""
+        self.hot.connect()
+        self.cold.connect()
+        self.spill_writer.start()
+
+    def disconnect(self) -> None:
+        """Spill the pending logs, then disconnect both tiers."""
+        self.spill_writer.stop()
+        self.hot.disconnect()
+        self.cold.disconnect()
+
+    def shutdown(self) -> None:
+        """Spill the pending logs, then shut down both tiers."""
+        self.spill_writer.stop()
+        self.hot.shutdown()
+        self.cold.shutdown()
+
+    def init_db(self) -> None:
+        """Initialize both tiers and read the newest log of the cold tier."""
+        self.hot.init_db()
+        self.cold.init_db()
+        newest = self.cold.fetch_logs(LogFilters(limit=1))
+        self._cold_until = newest[0]['timestamp'] if newest else datetime.min
+
+    def save_log(self, log: Log) -> int:
+        """Save a log entry."""
+        return self.save_logs([log])[0]
+
+    def save_logs(self, logs: List[Log]) -> List[int]:
+        """Save log entries to memory and queue them for the cold tier."""
+        # Copies, so the caller's logs don't get the ID before it is returned
+        logs = [dict(log) for log in logs]  # type: ignore[misc]
+        for log in logs:
+            if not log.get('id'):
+                log['id'] = self._ids.next_id()
+        ids = self.hot.save_logs(logs)
+        dropped = self.spill_writer.dropped
+        for log in logs:
+            self.spill_writer.submit(log)
+        if self.spill_writer.dropped > dropped:
+            print(f"SuperTracer Error: {self.spill_writer.dropped - dropped} logs dropped from the spill queue, they are only kept in memory")
+        return ids
+
+    @property
+    def spill_dropped(self) -> int:
+        """Number of logs dropped from the spill queue, so missing from the cold tier."""
+        return self.spill_writer.dropped
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queued logs are in the cold tier. Returns False on timeout."""
+        return self.spill_writer.flush(timeout)
+
+    def _hot_since(self) -> Optional[datetime]:
+        """Return the time after which memory holds every log, or None if that is not known."""
+        if self._cold_until is None:
+            return None
+        removed_until = self.hot.complete_since()
+        if removed_until is None:
+            return self._cold_until
+        return max(self._cold_until, removed_until)
+
+    def _hot_covers(self, filters: LogFilters, logs: List[Log]) -> bool:
+        """Return whether a page from memory is the same the cold tier would give."""
+        since = self._hot_since()
+        if since is None:
+            return False
+        if len(logs) >= filters.limit:
+            return logs[-1]['timestamp'] > since
+        return filters.start_date is not None and filters.start_date > since
+
+    def fetch_logs(self, filters: Optional[LogFilters] = None) -> List[Log]:
+        """Fetch log entries from memory, merged with the cold tier when memory may miss some.
+
+        With ``order_by='relevance'``, only the cold tier can rank the matches, so
+        logs still waiting to be spilled are left out.
+        """
+        filters = filters or LogFilters()
+        if filters.order_by == 'relevance' and filters.search_text:
+            return self.cold.fetch_logs(filters)
+
+        hot_logs = self.hot.fetch_logs(filters)
+        if self._hot_covers(filters, hot_logs):
+            return hot_logs
+        # Logs are in both tiers once spilled, the copy in memory wins
+        merged = {log['id']: log for log in self.cold.fetch_logs(filters)}
+        merged.update((log['id'], log) for log in hot_logs)
+        logs = sorted(merged.values(), key=lambda log: (log['timestamp'], log['id']), reverse=True)
+        return logs[:filters.limit]
+
+    def fetch_log(self, log_id: int) -> Optional[Log]:
+        """Fetch a log from memory, or from the cold tier if memory no longer has it or its payload."""
+        log = self.hot.fetch_log(log_id)
+        if log is not None and any(log.get(field) is not None for field in PAYLOAD_FIELDS):
+            return log
+        # Memory may have dropped the payload to stay within max_bytes
+        return self.cold.fetch_log(log_id) or log
+
+    def cleanup(self, retention_options: RetentionOptions) -> int:
+        """Apply retention to both tiers. Returns the count the cold tier reports."""
+        if not retention_options.enabled:
+            return 0
+        # Queued logs would otherwise reach the cold tier after the cleanup and outlive it
+        self.spill_writer.flush()
+        self.hot.cleanup(retention_options)
+        return self.cold.cleanup(retention_options)
@@ -1,3 +1,4 @@
 from .logger_middleware import add_logger_middleware
+from .asgi_logger_middleware import ASGILoggerMiddleware, add_asgi_logger_middleware
 
-__all__ = ["add_logger_middleware"]
+__all__ = ["add_logger_middleware", "ASGILoggerMiddleware", "add_asgi_logger_middleware"]
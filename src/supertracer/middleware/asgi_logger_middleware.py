@@ -0,0 +1,147 @@
+from typing import Any, Dict, Optional
+from fastapi import FastAPI
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import time
+import traceback
+from supertracer.types.options import SupertracerOptions
+from supertracer.services.metrics import MetricsService
+from supertracer.services.writer import LogWriter
+from supertracer.middleware.capture import BodyCapture, capture_receive
+from supertracer.middleware.logger_middleware import (
+    _should_skip_logging,
+    _capture_request_data,
+    _build_log_entry,
+    _persist_log,
+    _filter_headers,
+)
+
+
+class ASGILoggerMiddleware:
+    """Raw ASGI middleware for logging requests and responses.
+
+    Wraps the ``receive`` and ``send`` channels directly instead of going through
+    Starlette's ``BaseHTTPMiddleware`` machinery, so no extra task or response copy
+    is created per request. Chunks are passed through to the app and the client
+    unchanged while they are recorded for the log.
+
+    Args:
+        app: The ASGI application to wrap.
+        options: Supertracer options for configuring logging behavior.
+        connector: Database connector to save logs.
+        broadcaster: Log broadcaster to notify subscribers of new logs.
+        metrics_service: Service to record metrics about requests.
+        writer: Optional write-behind queue. If given, logs are saved in the background.
+    """
+    def __init__(self, app: ASGIApp, options: SupertracerOptions, connector, broadcaster, metrics_service: MetricsService, writer: Optional[LogWriter] = None):
+        self.app = app
+        self.options = options
+        self.connector = connector
+        self.broadcaster = broadcaster
+        self.metrics_service = metrics_service
+        self.writer = writer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        request_data = _capture_request_data(request, self.options)
+        if _should_skip_logging(request, request_data["url"], self.options):
+            await self.app(scope, receive, send)
+            return
+
+        capture_options = self.options.capture_options
+        response_capture = BodyCapture(capture_options.max_response_body_size)
+        response_start: Dict[str, Any] = {}
+
+        if capture_options.capture_request_body:
+            request_capture = BodyCapture(capture_options.max_request_body_size)
+            request_data["body_capture"] = request_capture
+            receive = capture_receive(receive, request_capture)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body" and capture_options.capture_response_body:
+                response_capture.feed(message.get("body", b""))
+            await send(message)
+
+        start_time = time.time()
+        error_message = None
+        stack_trace = None
+        status_code = 500
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            status_code = response_start.get("status", 500)
+            if status_code >= 400:
+                error_message = f"HTTP {status_code} Error"
+        except Exception as exc:
+            status_code = response_start.get("status", 500)
+            error_message = str(exc)
+            stack_trace = traceback.format_exc()
+            raise
+        finally:
+            duration_ms = int((time.time() - start_time) * 1000)
+            response_headers, response_body, response_size = _capture_response_data(response_start, response_capture, self.options)
+
+            log_entry = _build_log_entry(
+                request_data=request_data,
+                response_headers=response_headers,
+                response_body=response_body,
+                response_size=response_size,
+                status_code=status_code,
+                duration_ms=duration_ms,
+                error_message=error_message,
+                stack_trace=stack_trace,
+            )
+
+            await _persist_log(self.connector, self.broadcaster, self.metrics_service, log_entry, self.writer)
+
+
+def add_asgi_logger_middleware(options: SupertracerOptions, connector, broadcaster, metrics_service: MetricsService, app: FastAPI, writer: Optional[LogWriter] = None) -> None:
+    """Adds the raw ASGI logging middleware to the app.
+
+    Args:
+        options: Supertracer options for configuring logging behavior.
+        connector: Database connector to save logs.
+        broadcaster: Log broadcaster to notify subscribers of new logs.
+        metrics_service: Service to record metrics about requests.
+        app: The FastAPI application to add the middleware to.
+        writer: Optional write-behind queue. If given, logs are saved in the background.
+    """
+    app.add_middleware(
+        ASGILoggerMiddleware,
+        options=options,
+        connector=connector,
+        broadcaster=broadcaster,
+        metrics_service=metrics_service,
+        writer=writer,
+    )
+
+
+def _capture_response_data(response_start: Dict[str, Any], capture: BodyCapture, options: SupertracerOptions):
+    if not response_start:
+        return None, None, None
+
+    raw_headers = Headers(raw=response_start.get("headers", []))
+    headers = _filter_headers(dict(raw_headers), options.capture_options.exclude_headers)
+
+    body = None
+    if options.capture_options.capture_response_body:
+        body = capture.value()
+
+    size = raw_headers.get("content-length")
+    if size is not None:
+        try:
+            size = int(size)
+        except ValueError:
+            size = None
+    if size is None and options.capture_options.capture_response_body:
+        size = capture.size
+
+    return headers, body, size
+
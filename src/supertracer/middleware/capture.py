@@ -0,0 +1,63 @@
+from typing import Any, List, Optional
+from starlette.types import Message, Receive
+import json
+
+
+class BodyCapture:
+    """Keeps a bounded prefix of a body stream for the log.
+
+    Chunks are fed as they pass through the middleware. Only the first ``max_size``
+    bytes are retained, so capturing a large or streamed body costs O(max_size)
+    memory regardless of how big the body is. The total size is always counted.
+
+    Args:
+        max_size: Maximum number of bytes to keep for the log.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._chunks: List[bytes] = []
+        self._captured = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Record a chunk of the body."""
+        if not chunk:
+            return
+        self.size += len(chunk)
+        remaining = self.max_size - self._captured
+        if remaining > 0:
+            kept = chunk[:remaining]
+            self._chunks.append(kept)
+            self._captured += len(kept)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the body was larger than the captured prefix."""
+        return self.size > self._captured
+
+    def value(self) -> Optional[Any]:
+        """Return the captured body as parsed JSON, text, or a truncated text prefix."""
+        if self.max_size <= 0:
+            return None
+        body = b"".join(self._chunks)
+        if self.truncated:
+            return body.decode('utf-8', errors='ignore')
+        try:
+            return json.loads(body)
+        except:
+            return body.decode('utf-8', errors='ignore')
+
+
+def capture_receive(receive: Receive, capture: BodyCapture) -> Receive:
+    """Wrap an ASGI ``receive`` channel so request body chunks are fed to ``capture``.
+
+    Messages are returned to the app unchanged; only the bounded prefix kept by the
+    capture outlives each chunk.
+    """
+    async def receive_wrapper() -> Message:
+        message = await receive()
+        if message["type"] == "http.request":
+            capture.feed(message.get("body", b""))
+        return message
+
+    return receive_wrapper
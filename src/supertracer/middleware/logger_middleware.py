@@ -1,15 +1,16 @@
-from typing import Any, Callable, Optional, Dict, Tuple
+from typing import Any, Awaitable, Callable, Optional, Dict, Tuple
 from fastapi import Request, FastAPI
 from starlette.responses import StreamingResponse
 import time
 from datetime import datetime
-import json
 from supertracer.types.options import SupertracerOptions
 from supertracer.types.logs import Log
 from supertracer.services.metrics import MetricsService
+from supertracer.services.writer import LogWriter
+from supertracer.middleware.capture import BodyCapture, capture_receive
 import traceback
 
-def add_logger_middleware(options: SupertracerOptions, connector, broadcaster, metrics_service: MetricsService, app: FastAPI) -> None:
+def add_logger_middleware(options: SupertracerOptions, connector, broadcaster, metrics_service: MetricsService, app: FastAPI, writer: Optional[LogWriter] = None) -> None:
     """Creates a FastAPI middleware function for logging requests and responses and adds it to the app.
     
     Args:
@@ -17,48 +18,67 @@ def add_logger_middleware(options: SupertracerOptions, connector, broadcaster, m
         connector: Database connector to save logs.
         broadcaster: Log broadcaster to notify subscribers of new logs.
         metrics_service: Service to record metrics about requests.
+        writer: Optional write-behind queue. If given, logs are saved in the background.
     
     Returns:
         A FastAPI middleware function. yay
     """
     @app.middleware("http")
     async def log_requests(request: Request, call_next: Callable):
-        request_data = await _capture_request_data(request, options)
+        request_data = _capture_request_data(request, options)
 
         if _should_skip_logging(request, request_data["url"], options):
             return await call_next(request)
 
+        if options.capture_options.capture_request_body:
+            max_size = options.capture_options.max_request_body_size
+            request_data["body_capture"] = capture_request_body(request, max_size)
+
         start_time = time.time()
-        response: Optional[StreamingResponse] = None
-        error_message = None
-        stack_trace = None
-        status_code = 500
 
         try:
-            response = await call_next(request)
-            status_code = response.status_code if response else 500
-            if status_code >= 400:
-                error_message = f"HTTP {status_code} Error"
+            response: StreamingResponse = await call_next(request)
         except Exception as exc:
-            error_message = str(exc)
-            stack_trace = traceback.format_exc()
+            log_entry = _build_log_entry(
+                request_data=request_data,
+                response_headers=None,
+                response_body=None,
+                response_size=None,
+                status_code=500,
+                duration_ms=int((time.time() - start_time) * 1000),
+                error_message=str(exc),
+                stack_trace=traceback.format_exc(),
+            )
+            await _persist_log(connector, broadcaster, metrics_service, log_entry, writer)
             raise
-        finally:
-            duration_ms = int((time.time() - start_time) * 1000)
-            response_headers, response_body, response_size = await _capture_response_data(response, options)
+
+        duration_ms = int((time.time() - start_time) * 1000)
+        status_code = response.status_code
+        error_message = f"HTTP {status_code} Error" if status_code >= 400 else None
+        response_headers, response_size = _capture_response_headers(response, options)
+
+        async def finish(capture: Optional[BodyCapture]) -> None:
+            size = response_size
+            if size is None and capture is not None:
+                size = capture.size
 
             log_entry = _build_log_entry(
                 request_data=request_data,
                 response_headers=response_headers,
-                response_body=response_body,
-                response_size=response_size,
+                response_body=capture.value() if capture else None,
+                response_size=size,
                 status_code=status_code,
                 duration_ms=duration_ms,
                 error_message=error_message,
-                stack_trace=stack_trace,
+                stack_trace=None,
             )
+            await _persist_log(connector, broadcaster, metrics_service, log_entry, writer)
 
-            _persist_log(connector, broadcaster, metrics_service, log_entry)
+        if hasattr(response, "body_iterator") and options.capture_options.capture_response_body:
+            max_size = options.capture_options.max_response_body_size
+            capture_response_body(response, max_size, finish)
+        else:
+            await finish(None)
 
         return response
 
@@ -82,13 +102,14 @@ def _should_skip_logging(request: Request, url: str, options: SupertracerOptions
     return False
 
 
-async def _capture_request_data(request: Request, options: SupertracerOptions) -> Dict[str, Any]:
+def _capture_request_data(request: Request, options: SupertracerOptions) -> Dict[str, Any]:
     headers = _filter_headers(dict(request.headers), options.capture_options.exclude_headers)
 
-    body = None
-    if options.capture_options.capture_request_body:
-        max_size = options.capture_options.max_request_body_size
-        body = await capture_request_body(request, max_size)
+    content_length = request.headers.get("content-length")
+    try:
+        content_length = int(content_length) if content_length is not None else None
+    except ValueError:
+        content_length = None
 
     return {
         "method": request.method,
@@ -98,21 +119,14 @@ async def _capture_request_data(request: Request, options: SupertracerOptions) -
         "query_params": dict(request.query_params),
         "client_ip": request.client.host if request.client else None,
         "user_agent": headers.get("user-agent"),
-        "body": body,
+        "content_length": content_length,
+        "body_capture": None,
     }
 
 
-async def _capture_response_data(response: Optional[StreamingResponse], options: SupertracerOptions) -> Tuple[Optional[Dict[str, Any]], Optional[Any], Optional[int]]:
-    if not response:
-        return None, None, None
-
+def _capture_response_headers(response: StreamingResponse, options: SupertracerOptions) -> Tuple[Dict[str, Any], Optional[int]]:
     headers = _filter_headers(dict(response.headers), options.capture_options.exclude_headers)
 
-    body = None
-    if hasattr(response, "body_iterator") and options.capture_options.capture_response_body:
-        max_size = options.capture_options.max_response_body_size
-        body = await capture_response_body(response, max_size)
-
     size = response.headers.get("content-length")
     if size is not None:
         try:
@@ -120,7 +134,7 @@ async def _capture_response_data(response: Optional[StreamingResponse], options:
         except ValueError:
             size = None
 
-    return headers, body, size
+    return headers, size
 
 
 def _build_log_entry(
@@ -133,6 +147,11 @@ def _build_log_entry(
     error_message: Optional[str],
     stack_trace: Optional[str],
 ) -> Log:
+    body_capture: Optional[BodyCapture] = request_data["body_capture"]
+    request_size = request_data["content_length"]
+    if body_capture is not None and body_capture.size:
+        request_size = body_capture.size
+
     return {
         "id": 0,
         "content": f"{request_data['method']} {request_data['url']}",
@@ -147,7 +166,9 @@ def _build_log_entry(
         "client_ip": request_data["client_ip"],
         "user_agent": request_data["user_agent"],
         "request_query": request_data["query_params"],
-        "request_body": request_data["body"],
+        "request_body": body_capture.value() if body_capture else None,
+        "request_size_bytes": request_size,
+        "request_body_truncated": body_capture.truncated if body_capture else None,
         "response_headers": response_headers,
         "response_body": response_body,
         "response_size_bytes": response_size,
@@ -156,14 +177,24 @@ def _build_log_entry(
     }
 
 
-def _persist_log(connector, broadcaster, metrics_service: MetricsService, log_entry: Log) -> None:
+async def _persist_log(connector, broadcaster, metrics_service: MetricsService, log_entry: Log, writer: Optional[LogWriter] = None) -> None:
+    if writer is not None:
+        await writer.submit_async(log_entry, lambda log: _publish_log(broadcaster, metrics_service, log))
+        return
+
+    try:
+        log_entry["id"] = await connector.save_log_async(log_entry)
+        _publish_log(broadcaster, metrics_service, log_entry)
+    except Exception as exc:
+        print(f"SuperTracer Error: {exc}")
+
+
+def _publish_log(broadcaster, metrics_service: MetricsService, log_entry: Log) -> None:
     try:
-        log_id = connector.save_log(log_entry)
-        log_entry["id"] = log_id
         broadcaster.broadcast(log_entry)
 
         metrics_service.record_request(
-            id=log_id,
+            id=log_entry["id"],
             method=log_entry["method"] or "UNKNOWN",
             path=log_entry["path"] or "UNKNOWN",
             status_code=log_entry["status_code"] or 0,
@@ -180,53 +211,33 @@ def _filter_headers(headers: Dict[str, Any], excluded: Optional[list[str]]) -> D
     excluded_set = {h.lower() for h in excluded}
     return {k: v for k, v in headers.items() if k.lower() not in excluded_set}
     
-async def capture_request_body(request: Request, max_size: int) -> Optional[Any]:
-    """Capture and return the request body if within size limits."""
-    try:
-        body_bytes = await request.body()
-        if len(body_bytes) < max_size:
-            try:
-                return json.loads(body_bytes)
-            except:
-                return body_bytes.decode('utf-8', errors='ignore')
-    except Exception:
-        pass
-    return None
-
-async def capture_response_body(response: StreamingResponse, max_size: int) -> Optional[Any]:
-    """Capture and return the response body if within size limits.
-    
-    Since StreamingResponse body is an async generator, we need to consume it
-    and then reconstruct a new generator for the response to use.
+def capture_request_body(request: Request, max_size: int) -> BodyCapture:
+    """Capture the request body as the app reads it from the ASGI receive channel.
+
+    Only a prefix of up to ``max_size`` bytes is kept, together with the total size
+    and whether the body was truncated. Chunks reach the app unchanged.
     """
-    try:
-        body_chunks = []
-        body_size = 0
-        
-        # Consume the response body
-        async for chunk in response.body_iterator:
-            body_chunks.append(chunk)
-            body_size += len(chunk)
-            
-        # Reconstruct the body iterator for the actual response
-        async def new_body_iterator():
-            for chunk in body_chunks:
+    capture = BodyCapture(max_size)
+    # Downstream apps read the body through the request's receive channel
+    request._receive = capture_receive(request._receive, capture)
+    return capture
+
+def capture_response_body(response: StreamingResponse, max_size: int, on_complete: Callable[[BodyCapture], Awaitable[None]]) -> None:
+    """Tee the response body into a bounded capture without holding back the client.
+
+    The response's body iterator is replaced by one that forwards every chunk as soon
+    as it arrives and keeps at most ``max_size`` bytes for the log. ``on_complete`` is
+    awaited with the capture once the body has been fully sent or the stream is closed.
+    """
+    body_iterator = response.body_iterator
+
+    async def tee_body_iterator():
+        capture = BodyCapture(max_size)
+        try:
+            async for chunk in body_iterator:
+                capture.feed(chunk if isinstance(chunk, bytes) else chunk.encode(response.charset))
                 yield chunk
-                
-        response.body_iterator = new_body_iterator()
-        
-        # Process captured body if within limits
-        if body_size < max_size:
-            full_body = b"".join(body_chunks)
-            try:
-                return json.loads(full_body)
-            except:
-                return full_body.decode('utf-8', errors='ignore')
-                
-    except Exception as e:
-        print(f"Error capturing response body: {e}")
-        pass
-    return None
-
-
-  
+        finally:
+            await on_complete(capture)
+
+    response.body_iterator = tee_body_iterator()
@@ -3,13 +3,23 @@ from fastapi.responses import JSONResponse
 from supertracer.services.auth import AuthService
 from supertracer.connectors.base import BaseConnector
 from supertracer.types.options import ApiOptions
-from supertracer.types.logs import Log
-from supertracer.types.filters import LogFilters
-from typing import Optional, Annotated
+from supertracer.types.filters import LogFilters, encode_cursor
+from typing import Any, Dict, Optional, Annotated
+from urllib.parse import urlencode
 from supertracer.middleware.api_middleware import authenticate_request
 from supertracer.services.metrics import MetricsService
 
 
+def with_string_id(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a log or metric record with its ID as a string.
+
+    Snowflake IDs go beyond 2^53, which JavaScript numbers round.
+    """
+    if record.get('id') is None:
+        return dict(record)
+    return {**record, 'id': str(record['id'])}
+
+
 class APIService:
     """
     Service to handle API routes for SuperTracer.
@@ -31,14 +41,14 @@ class APIService:
 
         self._add_routes()
         
-    def get_log(self, id: int):
-        return self.connector.fetch_log(id)
+    async def get_log(self, id: int):
+        return await self.connector.fetch_log_async(id)
       
-    def query_logs(
+    async def query_logs(
       self,
       filters: Annotated[LogFilters, Query(...)],
     ):
-        return self.connector.fetch_logs(filters)
+        return await self.connector.fetch_logs_async(filters)
     
     def _add_routes(self):
         if not self.auth.api_enabled:
@@ -51,34 +61,37 @@ class APIService:
         ):
             if not authenticate_request(request, self.auth, self.auth.api_options):
                 return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
-            data = self.query_logs(filters)
-            last_date = data[-1]['timestamp'] if data else None
+            data = await self.query_logs(filters)
             res = {
-                "data": data,
+                "data": [with_string_id(log) for log in data],
                 "length": len(data)
             }
             
             # include a next_page_url if there are more logs
-            if last_date and filters.limit and len(data) == filters.limit:
+            if data and filters.limit and len(data) == filters.limit and filters.order_by == 'timestamp':
+                last = data[-1]
                 query = filters.model_dump(mode='json')
-                query['end_date'] = last_date.isoformat()
-                res['next_page_url'] = str(request.url).split('?')[0] + '?' + '&'.join([f"{key}={value}" for key, value in query.items() if value is not None])
+                query['cursor'] = encode_cursor(last['timestamp'], last['id'])
+                res['next_cursor'] = query['cursor']
+                res['next_page_url'] = str(request.url).split('?')[0] + '?' + urlencode({key: value for key, value in query.items() if value is not None}, doseq=True)
             return res
 
-        @self.router.get("/logs/{id}", response_model=Optional[Log])
+        @self.router.get("/logs/{id}")
         async def get_log_endpoint(id: int, request: Request):
             if not authenticate_request(request, self.auth, self.auth.api_options):
                 return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
             
-            
-            return self.get_log(id)
+            log = await self.get_log(id)
+            return with_string_id(log) if log else None
         
         @self.router.get("/metrics")
         async def get_metrics_endpoint(request: Request):
             if not authenticate_request(request, self.auth, self.auth.api_options):
                 return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
-            # For simplicity, return a placeholder metrics response
-            return self.metrics.get_summary()
+            summary = self.metrics.get_summary()
+            if summary.get('recent_errors'):
+                summary = {**summary, 'recent_errors': [with_string_id(error) for error in summary['recent_errors']]}
+            return summary
         
         
         
@@ -32,9 +32,7 @@ class CleanupService:
     async def _cleanup_task(self):
         while True:
             try:
-                # Run cleanup in executor to avoid blocking the event loop
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, self.connector.cleanup, self.retention_options)
+                await self.connector.cleanup_async(self.retention_options)
                 self.logger.info("SUPERTRACER: Cleanup task executed successfully")
             except Exception as e:
                 self.logger.error(f"SUPERTRACER: Cleanup task failed: {e}")
@@ -0,0 +1,68 @@
+from datetime import datetime
+import os
+import threading
+import time
+
+# 2024-01-01T00:00:00Z in milliseconds
+EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 41
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+class SnowflakeIdGenerator:
+    """
+    Generates time-ordered 64-bit log IDs in-process, without a database round trip.
+
+    Each ID packs 41 bits of milliseconds since 2024-01-01, a 10-bit node ID and a
+    12-bit per-millisecond sequence, so IDs sort by creation time and never collide
+    between nodes. Every process writing to the same storage needs its own node ID,
+    e.g. from the worker number. A generator refuses to run in a process forked
+    from the one that created it, since both would share its node ID.
+
+    Args:
+        node_id (int): Node ID between 0 and 1023, unique among the processes writing to the same storage.
+    """
+    def __init__(self, node_id: int):
+        if not 0 <= node_id <= MAX_NODE_ID:
+            raise ValueError(f'node_id must be between 0 and {MAX_NODE_ID}')
+        self._pid = os.getpid()
+        self.node_id = node_id
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        """Return the next ID. IDs from one generator are strictly increasing."""
+        with self._lock:
+            self._check_fork()
+            now_ms = int(time.time() * 1000) - EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond or the clock went backwards: keep counting from the
+                # last timestamp used, borrowing the next millisecond on overflow
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | self._sequence
+
+    def _check_fork(self) -> None:
+        # A forked worker would generate the same IDs as its parent and siblings
+        if os.getpid() != self._pid:
+            raise RuntimeError(
+                f'SnowflakeIdGenerator with node_id {self.node_id} was created in another process, '
+                'create one per process with its own node_id'
+            )
+
+
+def timestamp_from_id(log_id: int) -> datetime:
+    """Return the creation time encoded in a snowflake ID."""
+    ms = (log_id >> (NODE_BITS + SEQUENCE_BITS)) + EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000)
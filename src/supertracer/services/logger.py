@@ -4,15 +4,20 @@ from datetime import datetime
 from supertracer.connectors.base import BaseConnector
 from supertracer.types.logs import Log
 from supertracer.services.broadcaster import LogBroadcaster
+from supertracer.services.writer import LogWriter
 
 
 class DatabaseHandler(logging.Handler):
-    """Custom logging handler that saves logs to database using a connector."""
+    """Custom logging handler that saves logs to database using a connector.
     
-    def __init__(self, connector: BaseConnector, broadcaster: Optional[LogBroadcaster] = None, level=logging.NOTSET):
+    If a writer is given, logs are queued and saved in the background instead.
+    """
+    
+    def __init__(self, connector: BaseConnector, broadcaster: Optional[LogBroadcaster] = None, level=logging.NOTSET, writer: Optional[LogWriter] = None):
         super().__init__(level)
         self.connector = connector
         self.broadcaster = broadcaster
+        self.writer = writer
     
     def emit(self, record: logging.LogRecord) -> None:
         """Save log record to database."""
@@ -44,6 +49,8 @@ class DatabaseHandler(logging.Handler):
                 'user_agent': None,
                 'request_query': None,
                 'request_body': None,
+                'request_size_bytes': None,
+                'request_body_truncated': None,
                 'response_headers': None,
                 'response_body': None,
                 'response_size_bytes': None,
@@ -51,6 +58,11 @@ class DatabaseHandler(logging.Handler):
                 'stack_trace': None
             }
             
+            if self.writer:
+                # Never waits for room: emit may run on the event loop or on the writer thread itself
+                self.writer.submit_nowait(log, self.broadcaster.broadcast if self.broadcaster else None)
+                return
+            
             log_id = self.connector.save_log(log)
             log['id'] = log_id
             if self.broadcaster:
@@ -64,7 +76,8 @@ def setup_logger(
     connector: BaseConnector,
     broadcaster: Optional[LogBroadcaster] = None,
     level: int = logging.INFO,
-    format_string: Optional[str] = None
+    format_string: Optional[str] = None,
+    writer: Optional[LogWriter] = None
 ) -> logging.Logger:
     """Setup a logger that saves to database.
     
@@ -74,6 +87,7 @@ def setup_logger(
         broadcaster: Broadcaster to use for real-time updates
         level: Logging level (default: INFO)
         format_string: Custom format string (default: '%(levelname)s: %(message)s')
+        writer: Write-behind queue to save logs in the background (default: save synchronously)
     
     Returns:
         Configured logger instance
@@ -89,7 +103,7 @@ def setup_logger(
             logger.removeHandler(handler)
     
     # Create database handler
-    db_handler = DatabaseHandler(connector, broadcaster)
+    db_handler = DatabaseHandler(connector, broadcaster, writer=writer)
     
     # Set formatter
     formatter = logging.Formatter(format_string)
@@ -0,0 +1,278 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import threading
+import time
+from supertracer.connectors.base import BaseConnector
+from supertracer.types.logs import Log
+from supertracer.types.options import WriterOptions
+from supertracer.services.ids import SnowflakeIdGenerator
+
+SavedCallback = Callable[[Log], None]
+Entry = Tuple[int, Log, Optional[SavedCallback]]
+
+# Lower values are dropped first by the 'drop_level' backpressure policy
+LEVEL_PRIORITY = {
+    'DEBUG': 0,
+    'INFO': 1,
+    'HTTP': 1,
+    'WARN': 2,
+    'ERROR': 3,
+}
+DEFAULT_PRIORITY = 1
+
+
+def level_priority(log: Log) -> int:
+    return LEVEL_PRIORITY.get(log.get('log_level') or '', DEFAULT_PRIORITY)
+
+
+class LogWriter:
+    """
+    Write-behind queue between the middleware and the connector.
+
+    Logs are appended to a bounded in-process queue and written to the connector in
+    batches by a background thread, so request latency no longer includes storage
+    latency. Once a log has been saved and has its ID, its ``on_saved`` callback is
+    invoked. Logs submitted from an event loop get their callback run on that loop,
+    others from the writer thread.
+
+    With an ID generator, logs get their ID when they are submitted and ``on_saved``
+    runs right away, so callers never wait for storage.
+
+    Args:
+        connector (BaseConnector): The connector logs are written to.
+        options (WriterOptions): Queue size, flush and backpressure settings.
+        id_generator (Optional[SnowflakeIdGenerator]): Assigns IDs in-process instead of the connector.
+    """
+    def __init__(self, connector: BaseConnector, options: Optional[WriterOptions] = None, id_generator: Optional[SnowflakeIdGenerator] = None):
+        self.connector = connector
+        self.options = options if options else WriterOptions()
+        self.id_generator = id_generator
+        self.dropped = 0
+
+        # One queue per level priority, so 'drop_level' evicts without scanning.
+        # Entries carry a sequence number to write them back in submission order.
+        self._queues: Dict[int, Deque[Entry]] = {priority: deque() for priority in sorted(set(LEVEL_PRIORITY.values()))}
+        self._size = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        # Callers waiting in flush(), the writer thread writes partial batches while there are any
+        self._flushing = 0
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="supertracer-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue into the connector and stop the writer thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout if timeout is not None else self.options.shutdown_timeout_seconds)
+            self._thread = None
+
+    def submit(self, log: Log, on_saved: Optional[SavedCallback] = None) -> bool:
+        """Queue a log for writing. Returns False if the log was dropped.
+
+        With the 'block' policy this waits for room in the queue, so call
+        submit_async from the event loop instead.
+        """
+        on_saved = self._on_caller_loop(self._assign_id(log, on_saved))
+        with self._condition:
+            queued = self._enqueue(log, on_saved, wait=True)
+        assert queued is not None
+        return queued
+
+    def submit_nowait(self, log: Log, on_saved: Optional[SavedCallback] = None) -> bool:
+        """Queue a log without ever waiting for room. Returns False if the log was dropped.
+
+        With the 'block' policy and a full queue, the log is dropped and counted in
+        ``dropped``, so callers on the event loop or on the writer thread never stall.
+        """
+        on_saved = self._on_caller_loop(self._assign_id(log, on_saved))
+        with self._condition:
+            queued = self._enqueue(log, on_saved, wait=False)
+            if queued is None:
+                self.dropped += 1
+                return False
+        return queued
+
+    async def submit_async(self, log: Log, on_saved: Optional[SavedCallback] = None) -> bool:
+        """Queue a log from the event loop. Returns False if the log was dropped.
+
+        With the 'block' policy and a full queue, the wait for room happens in a
+        worker thread, so other requests keep being served meanwhile.
+        """
+        on_saved = self._on_caller_loop(self._assign_id(log, on_saved))
+        with self._condition:
+            queued = self._enqueue(log, on_saved, wait=False)
+        if queued is not None:
+            return queued
+        return await asyncio.to_thread(self._submit_waiting, log, on_saved)
+
+    def _submit_waiting(self, log: Log, on_saved: Optional[SavedCallback]) -> bool:
+        with self._condition:
+            queued = self._enqueue(log, on_saved, wait=True)
+        assert queued is not None
+        return queued
+
+    @staticmethod
+    def _on_caller_loop(on_saved: Optional[SavedCallback]) -> Optional[SavedCallback]:
+        """Wrap the callback to run on the caller's event loop, if it is called from one.
+
+        Subscribers such as the metrics and the UI buffers are only safe to use from the loop.
+        """
+        if on_saved is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return on_saved
+
+        def call_on_loop(log: Log) -> None:
+            try:
+                loop.call_soon_threadsafe(on_saved, log)
+            except RuntimeError:
+                # The loop is closed, nothing is left to notify
+                pass
+        return call_on_loop
+
+    def _assign_id(self, log: Log, on_saved: Optional[SavedCallback]) -> Optional[SavedCallback]:
+        """Give the log its ID on submit if there is an ID generator, and run the callback right away."""
+        if self.id_generator and not log.get('id'):
+            log['id'] = self.id_generator.next_id()
+            if on_saved:
+                on_saved(log)
+                return None
+        return on_saved
+
+    def _enqueue(self, log: Log, on_saved: Optional[SavedCallback], wait: bool) -> Optional[bool]:
+        """Append a log to its queue. Returns None if the queue is full and waiting is not allowed."""
+        if self._size >= self.options.max_queue_size:
+            if self.options.backpressure == 'block' and not wait:
+                return None
+            if not self._make_room(log):
+                self.dropped += 1
+                return False
+        self._queues[level_priority(log)].append((next(self._sequence), log, on_saved))
+        self._size += 1
+        if self._size >= min(self.options.flush_size, self.options.max_queue_size):
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write the queued logs right away and wait until they are written. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flushing += 1
+            try:
+                self._condition.notify_all()
+                while self._size or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flushing -= 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Number of logs waiting to be written."""
+        with self._condition:
+            return self._size + self._in_flight
+
+    def _make_room(self, log: Log) -> bool:
+        policy = self.options.backpressure
+
+        if policy == 'block':
+            while self._size >= self.options.max_queue_size and not self._stopping:
+                self._condition.notify_all()
+                self._condition.wait()
+            return self._size < self.options.max_queue_size
+
+        if policy == 'drop_oldest':
+            self._pop_oldest()
+            self.dropped += 1
+            return True
+
+        # drop_level: evict the oldest queued log with the lowest level, unless the
+        # incoming log is itself of that level or lower
+        lowest = next(priority for priority, queue in self._queues.items() if queue)
+        if level_priority(log) <= lowest:
+            return False
+        self._queues[lowest].popleft()
+        self._size -= 1
+        self.dropped += 1
+        return True
+
+    def _pop_oldest(self) -> Entry:
+        """Remove and return the first log submitted of those queued."""
+        oldest = min((queue for queue in self._queues.values() if queue), key=lambda queue: queue[0][0])
+        self._size -= 1
+        return oldest.popleft()
+
+    def _next_batch(self) -> List[Entry]:
+        with self._condition:
+            deadline = time.monotonic() + self.options.flush_interval_seconds
+            # A full queue is written right away, even when it holds less than a batch
+            batch_size = min(self.options.flush_size, self.options.max_queue_size)
+            while self._size < batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if (remaining <= 0 or self._flushing) and self._size:
+                    break
+                self._condition.wait(remaining if remaining > 0 else self.options.flush_interval_seconds)
+
+            batch = []
+            while self._size and len(batch) < self.options.flush_size:
+                batch.append(self._pop_oldest())
+            self._in_flight = len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+                if self._stopping and not self._size:
+                    return
+
+    def _write(self, batch: List[Entry]) -> None:
+        logs = [log for _, log, _ in batch]
+        try:
+            ids: List[Optional[int]] = list(self.connector.save_logs(logs))
+        except Exception as exc:
+            print(f"SuperTracer Error: {exc}")
+            # Retry one by one so a single bad log doesn't lose the whole batch
+            ids = [self._save_one(log) for log in logs]
+
+        for (_, log, on_saved), log_id in zip(batch, ids):
+            if log_id is None:
+                continue
+            log['id'] = log_id
+            if on_saved:
+                try:
+                    on_saved(log)
+                except Exception as exc:
+                    print(f"SuperTracer Error: {exc}")
+
+    def _save_one(self, log: Log) -> Optional[int]:
+        try:
+            return self.connector.save_log(log)
+        except Exception as exc:
+            print(f"SuperTracer Error: {exc}")
+            return None
@@ -18,7 +18,10 @@ from supertracer.services.broadcaster import LogBroadcaster
 from supertracer.services.api import APIService
 from supertracer.services.cleanup import CleanupService
 from supertracer.services.json_options import JSONOptionsService
+from supertracer.services.writer import LogWriter
+from supertracer.services.ids import SnowflakeIdGenerator
 from supertracer.middleware.logger_middleware import add_logger_middleware
+from supertracer.middleware.asgi_logger_middleware import add_asgi_logger_middleware
 
 
 class SuperTracer:
@@ -60,15 +63,19 @@ class SuperTracer:
         self.metrics_service = MetricsService(self.options.metrics_options)
         self.auth_service = AuthService(self.options.auth_options, self.options.api_options)
         self.broadcaster = LogBroadcaster()
+        self.writer = self._create_writer()
         
         
         self.logger = setup_logger('supertracer', 
                                    self.connector, 
                                    self.broadcaster,
                                    level=self.options.logger_options.level,
-                                   format_string=self.options.logger_options.format)
+                                   format_string=self.options.logger_options.format,
+                                   writer=self.writer)
         self._setup_ui()
         self._init_db()
+        self._start_writer()
+        self._add_shutdown()
         self._add_middleware()
         self._add_routes()
         self._add_api_routes()
@@ -145,7 +152,8 @@ class SuperTracer:
             
         return setup_logger(name, self.connector, self.broadcaster,
                             level=logger_opts.level,
-                            format_string=logger_opts.format)
+                            format_string=logger_opts.format,
+                            writer=self.writer)
 
     def create_logger(self, name: str, options: Optional[LoggerOptions] = None) -> None:
         """Create and configure a new logger that saves to the database.
@@ -163,8 +171,40 @@ class SuperTracer:
         self.connector.connect()
         self.connector.init_db()
 
+    def _create_writer(self) -> Optional[LogWriter]:
+        writer_options = self.options.writer_options
+        if not writer_options.enabled:
+            return None
+        
+        id_generator = None
+        if writer_options.id_strategy == 'snowflake':
+            assert writer_options.node_id is not None
+            id_generator = SnowflakeIdGenerator(writer_options.node_id)
+        return LogWriter(self.connector, writer_options, id_generator)
+
+    def _start_writer(self):
+        if not self.writer:
+            return
+        
+        self.writer.start()
+
+        @self.app.on_event("shutdown")
+        async def drain_writer():
+            # Drain in an executor so pending batches don't block the event loop
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.writer.stop)
+
+    def _add_shutdown(self):
+        # Registered after the writer, so the queue is drained first
+        @self.app.on_event("shutdown")
+        async def shutdown_connector():
+            await asyncio.to_thread(self.connector.shutdown)
+
     def _add_middleware(self):
-        add_logger_middleware(self.options, self.connector, self.broadcaster, self.metrics_service, self.app)
+        if self.options.capture_options.middleware_mode == 'http':
+            add_logger_middleware(self.options, self.connector, self.broadcaster, self.metrics_service, self.app, self.writer)
+        else:
+            add_asgi_logger_middleware(self.options, self.connector, self.broadcaster, self.metrics_service, self.app, self.writer)
         
 
     def _add_routes(self):
@@ -189,17 +229,17 @@ class SuperTracer:
             render_login_page(self.auth_service)
 
         @ui.page('/logs')
-        def logs_page():
+        async def logs_page():
             ui.query('.nicegui-content').classes('p-0')
             if not self.auth_service.is_authenticated():
                 ui.navigate.to('/login')
                 return
-            render_logs_page(self.connector, self.metrics_service, self.broadcaster, self.auth_service, page_size=self.options.ui_options.page_size)
+            await render_logs_page(self.connector, self.metrics_service, self.broadcaster, self.auth_service, page_size=self.options.ui_options.page_size)
 
         @ui.page('/logs/{log_id}')
-        def request_detail(log_id: int):
+        async def request_detail(log_id: int):
             ui.query('.nicegui-content').classes('p-0')
             if not self.auth_service.is_authenticated():
                 ui.navigate.to('/login')
                 return
-            render_request_detail_page(log_id, self.connector, self.auth_service)
+            await render_request_detail_page(log_id, self.connector, self.auth_service)
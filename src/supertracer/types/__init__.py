@@ -5,6 +5,7 @@ from .options import (
     ApiOptions,
     RetentionOptions,
     CaptureOptions,
+    WriterOptions,
     SupertracerOptions,
 )
 from .logs import Log
@@ -17,6 +18,7 @@ __all__ = [
     "ApiOptions",
     "RetentionOptions",
     "CaptureOptions",
+    "WriterOptions",
     "SupertracerOptions",
     "Log",
     "LogFilters",
@@ -1,5 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
+from typing import Literal, Tuple
+import base64
+import json
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    """Encode the position of a log in the listing order as an opaque cursor."""
+    raw = json.dumps([timestamp.isoformat(), log_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Return the (timestamp, id) position encoded in a cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, log_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
 
 class LogFilters(BaseModel):
     limit: int = 20
@@ -13,8 +33,38 @@ class LogFilters(BaseModel):
     min_latency: int | None = None
     max_latency: int | None = None
     has_error: bool | None = None
-    
+    # 'relevance' ranks search_text matches on connectors with a full-text index
+    order_by: Literal['timestamp', 'relevance'] = 'timestamp'
+    # Only logs after this position in the listing order, see encode_cursor
+    cursor: str | None = None
+    # Request headers that must match exactly, as "name=value"
+    header_values: list[str] | None = None
+    # Top-level keys that must be present in the request body
+    body_keys: list[str] | None = None
+
+    @field_validator('cursor')
+    @classmethod
+    def cursor_valid(cls, v: str | None) -> str | None:
+        if v is not None:
+            decode_cursor(v)
+        return v
+
+    @field_validator('header_values')
+    @classmethod
+    def header_values_valid(cls, v: list[str] | None) -> list[str] | None:
+        if v is not None and any('=' not in item for item in v):
+            raise ValueError('header_values must be formatted as name=value')
+        return v
+
+    def header_pairs(self) -> list[tuple[str, str]]:
+        """Return header_values as (name, value) pairs, with lowercase names as stored."""
+        pairs = []
+        for item in self.header_values or []:
+            name, value = item.split('=', 1)
+            pairs.append((name.strip().lower(), value))
+        return pairs
+
     def to_query_params(self) -> str:
         params = self.model_dump(exclude_none=True)
         return '&'.join([f"{key}={value}" for key, value in params.items()])
-    
\ No newline at end of file
+
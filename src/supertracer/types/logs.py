@@ -1,4 +1,4 @@
-from typing import Any, Dict, TypedDict, Optional
+from typing import Any, Dict, NotRequired, TypedDict, Optional
 from datetime import datetime
     
 class Log(TypedDict):
@@ -16,6 +16,8 @@ class Log(TypedDict):
     user_agent: Optional[str]
     request_query: Optional[Dict[str, Any]]
     request_body: Optional[Any]
+    request_size_bytes: NotRequired[Optional[int]]
+    request_body_truncated: NotRequired[Optional[bool]]
     response_headers: Optional[Dict[str, Any]]
     response_body: Optional[Any]
     response_size_bytes: Optional[int]
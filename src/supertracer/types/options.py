@@ -77,6 +77,8 @@ class RetentionOptions(BaseModel):
     max_records: int = 10000
     cleanup_interval_minutes: int = 30
     cleanup_older_than_hours: int = 24
+    # Headers, bodies and stack traces older than this are dropped; 0 keeps them as long as the log
+    payload_retention_hours: int = 0
     
     @field_validator('max_records')
     @classmethod
@@ -84,6 +86,13 @@ class RetentionOptions(BaseModel):
         if v < 0:
             raise ValueError('max_records must be non-negative')
         return v
+
+    @field_validator('payload_retention_hours')
+    @classmethod
+    def payload_retention_non_negative(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError('payload_retention_hours must be non-negative')
+        return v
         
     @field_validator('cleanup_interval_minutes')
     @classmethod
@@ -99,6 +108,7 @@ class CaptureOptions(BaseModel):
     max_response_body_size: int = 1024 * 10  # 10 KB
     exclude_headers: list[str] = Field(default_factory=lambda: ['authorization', 'cookie'])
     save_own_traces: bool = False
+    middleware_mode: Literal['asgi', 'http'] = 'asgi'
 
     @field_validator('max_request_body_size', 'max_response_body_size')
     @classmethod
@@ -107,6 +117,44 @@ class CaptureOptions(BaseModel):
             raise ValueError('Body size limit must be non-negative')
         return v
 
+class WriterOptions(BaseModel):
+    enabled: bool = True
+    max_queue_size: int = 10000
+    flush_size: int = 100
+    flush_interval_seconds: float = 0.5
+    backpressure: Literal['block', 'drop_oldest', 'drop_level'] = 'block'
+    shutdown_timeout_seconds: float = 10.0
+    id_strategy: Literal['connector', 'snowflake'] = 'connector'
+    node_id: int | None = None
+
+    @field_validator('max_queue_size', 'flush_size')
+    @classmethod
+    def sizes_positive(cls, v: int) -> int:
+        if v <= 0:
+            raise ValueError('Queue and flush sizes must be positive')
+        return v
+
+    @field_validator('flush_interval_seconds', 'shutdown_timeout_seconds')
+    @classmethod
+    def intervals_positive(cls, v: float) -> float:
+        if v <= 0:
+            raise ValueError('Writer intervals must be positive')
+        return v
+
+    @field_validator('node_id')
+    @classmethod
+    def node_id_in_range(cls, v: int | None) -> int | None:
+        if v is not None and not 0 <= v <= 1023:
+            raise ValueError('node_id must be between 0 and 1023')
+        return v
+
+    @model_validator(mode='after')
+    def check_snowflake_node(self) -> 'WriterOptions':
+        # Processes writing to the same storage with the same node ID would generate the same IDs
+        if self.id_strategy == 'snowflake' and self.node_id is None:
+            raise ValueError("id_strategy 'snowflake' requires a node_id, unique among the processes writing to the same storage")
+        return self
+
 class SupertracerOptions(BaseModel):
     logger_options: LoggerOptions = Field(default_factory=LoggerOptions)
     metrics_options: MetricsOptions = Field(default_factory=MetricsOptions)
@@ -115,4 +163,5 @@ class SupertracerOptions(BaseModel):
     retention_options: RetentionOptions = Field(default_factory=RetentionOptions)
     capture_options: CaptureOptions = Field(default_factory=CaptureOptions)
     ui_options: UIOptions = Field(default_factory=UIOptions)
+    writer_options: WriterOptions = Field(default_factory=WriterOptions)
  
\ No newline at end of file
@@ -66,9 +66,14 @@ def render_primary_filters(state: FilterState, on_change: Callable):
             ui.label('Response Code').classes('text-xs text-gray-400 font-medium')
             search_input('e.g., 200, 2X0').bind_value(state, 'status_code').on('change', on_change).classes('w-full')
 
+        def clear_filters():
+            state.reset()
+            # on_change may be async, NiceGUI awaits the returned coroutine
+            return on_change()
+
         # clear Filters Button
         with ui.column().classes('min-w-[100px] flex justify-end items-end'):
-            ui.button('Clear Filters', on_click=lambda: [state.reset(), on_change()]).props('outlined dark').classes('text-gray-400')
+            ui.button('Clear Filters', on_click=clear_filters).props('outlined dark').classes('text-gray-400')
 
 def render_endpoint_method_filters(state: FilterState, on_change: Callable):
     with ui.row().classes('w-full gap-4 flex-wrap md:flex-nowrap'):
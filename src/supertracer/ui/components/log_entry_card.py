@@ -7,7 +7,7 @@ def log_entry_card(
     timestamp: str,
     log_type: str,
     details: str,
-    log_id: Optional[int] = None,
+    log_id: Optional[str] = None,
     method: Optional[str] = None,
     endpoint: Optional[str] = None,
     status_code: Optional[int] = None,
@@ -72,7 +72,8 @@ class LogsTable:
             endpoint = parsed.path or '/'
         
         return {
-            'id': log.get('id'),
+            # As a string, JavaScript numbers round snowflake IDs
+            'id': str(log['id']) if log.get('id') else None,
             'timestamp': log['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
             'type': log.get('log_level') or ('HTTP' if log.get('method') else None),
             'details': log['content'],
@@ -27,6 +27,7 @@ def performance_card(log: Log):
         ui.label('Performance').classes('text-xl font-bold text-gray-400 mb-4')
         with ui.column().classes('space-y-3 w-full'):
             _metric_row('Latency', f"{log.get('duration_ms')}ms")
+            _metric_row('Request Size', f"{log.get('request_size_bytes') or 0} bytes" + (" (truncated)" if log.get('request_body_truncated') else ""))
             _metric_row('Response Size', f"{log.get('response_size_bytes') or 0} bytes")
             # Processing Time is usually same as Latency in this context unless we track more granularly
             _metric_row('Processing Time', f"{log.get('duration_ms')}ms")
@@ -1,7 +1,7 @@
 from nicegui import ui
 from typing import List, Dict, Any
 from datetime import datetime
-from supertracer.types.filters import LogFilters
+from supertracer.types.filters import LogFilters, encode_cursor
 from supertracer.ui.components.dashboard.dashboard import Dashboard
 from supertracer.ui.components.filters import FilterState, log_filters
 from supertracer.ui.components.logs_table import LogsTable
@@ -16,7 +16,7 @@ from supertracer.ui.utils.logs_page import match_log_filters, format_log_entry
 
 
 
-def render_logs_page(connector: BaseConnector, metrics_service: MetricsService, broadcaster: LogBroadcaster, auth_service: AuthService, page_size: int = 20):
+async def render_logs_page(connector: BaseConnector, metrics_service: MetricsService, broadcaster: LogBroadcaster, auth_service: AuthService, page_size: int = 20):
     """Renders the logs page with filters and log entries."""
     
     new_logs_buffer: List[Log] = []
@@ -49,9 +49,9 @@ def render_logs_page(connector: BaseConnector, metrics_service: MetricsService,
     # Pagination state
     pagination = {'limit': page_size}
     pagination_container = None
-    last_log_timestamp: Dict[str, datetime | None] = {'value': None}
+    next_cursor: Dict[str, str | None] = {'value': None}
 
-    def refresh_logs(e=None):
+    def current_filters() -> LogFilters:
         # Parse dates if present
         start_dt = None
         end_dt = None
@@ -77,8 +77,7 @@ def render_logs_page(connector: BaseConnector, metrics_service: MetricsService,
             except ValueError:
                 pass
 
-        # Fetch logs with current filters
-        filters = LogFilters(
+        return LogFilters(
             search_text=state.search_text,
             endpoint=state.endpoint,
             status_code=state.status_code,
@@ -91,15 +90,14 @@ def render_logs_page(connector: BaseConnector, metrics_service: MetricsService,
             end_date=end_dt,
             limit=pagination['limit']
         )
-        
-        logs_data: List[Log] = connector.fetch_logs(filters=filters)
-        
-        logs_table.set_logs(logs_data)
-        
+
+    def show_page(logs_data: List[Log]):
+        # Remember where the page ended so the next one continues from there
         if logs_data:
-            last_log_timestamp['value'] = logs_data[-1]['timestamp']
+            last = logs_data[-1]
+            next_cursor['value'] = encode_cursor(last['timestamp'], last['id'])
         else:
-            last_log_timestamp['value'] = None
+            next_cursor['value'] = None
             
         if pagination_container:
             pagination_container.clear()
@@ -107,50 +105,28 @@ def render_logs_page(connector: BaseConnector, metrics_service: MetricsService,
                 with pagination_container:
                     ui.button('Load More', on_click=load_more_logs).classes('w-full bg-gray-800 text-gray-400 hover:bg-gray-700')
 
-    def load_more_logs():
-        if not last_log_timestamp['value']:
+    async def refresh_logs(e=None):
+        # Fetch logs with current filters
+        logs_data: List[Log] = await connector.fetch_logs_async(filters=current_filters())
+        
+        logs_table.set_logs(logs_data)
+        show_page(logs_data)
+
+    async def load_more_logs():
+        if not next_cursor['value']:
             return
             
         if pagination_container:
             pagination_container.clear()
 
-        # Parse dates (same as refresh_logs)
-        start_dt = None
-        # Use the last timestamp as the end date for pagination
-        end_dt = last_log_timestamp['value']
-        
-        if state.start_date:
-            try:
-                clean_start = state.start_date.replace('/', '-')
-                if state.start_time:
-                    start_dt = datetime.strptime(f"{clean_start} {state.start_time}", '%Y-%m-%d %H:%M')
-                else:
-                    start_dt = datetime.strptime(clean_start, '%Y-%m-%d')
-            except ValueError: pass
+        filters = current_filters()
+        filters.cursor = next_cursor['value']
 
-        filters = LogFilters(
-            search_text=state.search_text,
-            endpoint=state.endpoint,
-            status_code=state.status_code,
-            log_level=state.log_level,
-            methods=state.methods,
-            min_latency=int(state.min_latency) if state.min_latency else None,
-            max_latency=int(state.max_latency) if state.max_latency else None,
-            has_error=state.has_error,
-            start_date=start_dt,
-            end_date=end_dt,
-            limit=pagination['limit']
-        )
-
-        logs_data: List[Log] = connector.fetch_logs(filters=filters)
+        logs_data: List[Log] = await connector.fetch_logs_async(filters=filters)
         
         if logs_data:
             logs_table.append_logs(logs_data)
-            last_log_timestamp['value'] = logs_data[-1]['timestamp']
-            
-            if pagination_container and len(logs_data) >= pagination['limit']:
-                with pagination_container:
-                    ui.button('Load More', on_click=load_more_logs).classes('w-full bg-gray-800 text-gray-400 hover:bg-gray-700')
+        show_page(logs_data)
 
 
     def flush_logs():
@@ -182,7 +158,7 @@ def render_logs_page(connector: BaseConnector, metrics_service: MetricsService,
         pagination_container = ui.row().classes('w-full max-w-7xl mx-auto justify-center pb-6')
         
         # Initial load
-        refresh_logs()
+        await refresh_logs()
 
     # Timer to flush logs every 500ms
     ui.timer(0.5, flush_logs)
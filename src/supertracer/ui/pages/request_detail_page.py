@@ -7,8 +7,8 @@ from supertracer.ui.components.request_detail_components import (
     request_info_section, response_info_section
 )
 
-def render_request_detail_page(log_id: int, connector: BaseConnector, auth_service: AuthService):
-    log = connector.fetch_log(log_id)
+async def render_request_detail_page(log_id: int, connector: BaseConnector, auth_service: AuthService):
+    log = await connector.fetch_log_async(log_id)
     
     if not log:
         with ui.column().classes('w-full min-h-screen bg-gray-900 p-6 items-center justify-center'):
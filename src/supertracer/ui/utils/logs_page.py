@@ -36,7 +36,8 @@ def match_log_filters(log: Log, filters: LogFilters) -> bool:
 def format_log_entry(log: Log) -> Dict[str, Any]:
   """Formats a log entry for display in the logs table."""
   return {
-      'id': log.get('id'),
+      # As a string, JavaScript numbers round snowflake IDs
+      'id': str(log['id']) if log.get('id') else None,
       'timestamp': log.get('timestamp').strftime('%Y-%m-%d %H:%M:%S') if log.get('timestamp') else '',
       'method': log.get('method') or '',
       'path': log.get('path') or '',
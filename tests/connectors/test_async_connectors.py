@@ -0,0 +1,64 @@
+import asyncio
+import sys
+import time
+import pytest
+from datetime import datetime
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.connectors.async_postgresql import AsyncPostgreSQLConnector
+from supertracer.types.filters import LogFilters
+
+def create_log(content="Test log"):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": None,
+        "log_level": "INFO",
+        "status_code": 200,
+        "duration_ms": 10,
+        "client_ip": None,
+        "user_agent": None,
+        "request_query": None,
+        "request_body": None,
+        "response_headers": None,
+        "response_body": None,
+        "response_size_bytes": None,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+class SlowConnector(MemoryConnector):
+    def fetch_logs(self, filters=None):
+        time.sleep(0.2)
+        return super().fetch_logs(filters)
+
+def test_async_adapters_use_sync_methods():
+    connector = MemoryConnector()
+
+    async def run():
+        log_id = await connector.save_log_async(create_log("first"))
+        await connector.save_logs_async([create_log("second")])
+        return log_id, await connector.fetch_logs_async(LogFilters()), await connector.fetch_log_async(log_id)
+
+    log_id, logs, log = asyncio.run(run())
+    assert [entry["content"] for entry in logs] == ["second", "first"]
+    assert log is not None and log["content"] == "first"
+
+def test_slow_fetch_does_not_block_event_loop():
+    connector = SlowConnector()
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*(connector.fetch_logs_async() for _ in range(4)))
+        return time.monotonic() - started
+
+    # The fetches run in worker threads instead of one after another on the loop
+    assert asyncio.run(run()) < 0.6
+
+def test_async_postgresql_requires_asyncpg(monkeypatch):
+    monkeypatch.setitem(sys.modules, "asyncpg", None)
+    with pytest.raises(ImportError, match="supertracer\\[asyncpg\\]"):
+        AsyncPostgreSQLConnector()
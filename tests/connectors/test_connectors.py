@@ -1,14 +1,16 @@
 import pytest
 from datetime import datetime, timedelta
+from supertracer.connectors.file import FileConnector
 from supertracer.connectors.memory import MemoryConnector
 from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.connectors.tiered import TieredConnector
 from supertracer.types.logs import Log
 from supertracer.types.filters import LogFilters
 from supertracer.types.options import RetentionOptions
 
 # Fixture to run tests against multiple connector implementations
-@pytest.fixture(params=["memory", "sqlite"])
-def connector(request):
+@pytest.fixture(params=["memory", "sqlite", "file", "tiered"])
+def connector(request, tmp_path):
     conn = None
     if request.param == "memory":
         conn = MemoryConnector()
@@ -18,6 +20,15 @@ def connector(request):
         conn = SQLiteConnector(db_path=":memory:")
         conn.connect()
         conn.init_db()
+    elif request.param == "file":
+        # A segment per save, so retention can delete single logs
+        conn = FileConnector(directory=str(tmp_path), segment_max_bytes=1)
+        conn.connect()
+        conn.init_db()
+    elif request.param == "tiered":
+        conn = TieredConnector(cold=SQLiteConnector(db_path=str(tmp_path / "cold.db")), node_id=1)
+        conn.connect()
+        conn.init_db()
     
     assert conn is not None, "Connector should be initialized"
     
@@ -70,6 +81,34 @@ def test_save_and_fetch_log(connector):
     # Check timestamp preservation (allowing for small precision loss in DBs)
     assert abs((fetched_log["timestamp"] - log["timestamp"]).total_seconds()) < 1.0
 
+def test_save_logs_batch(connector):
+    logs = [create_sample_log(content=f"Batch {i}") for i in range(5)]
+    log_ids = connector.save_logs(logs)
+
+    assert len(log_ids) == 5
+    assert len(set(log_ids)) == 5
+    for i, log_id in enumerate(log_ids):
+        assert connector.fetch_log(log_id)["content"] == f"Batch {i}"
+
+    # IDs keep increasing after a batch
+    assert connector.save_log(create_sample_log()) > max(log_ids)
+
+def test_save_log_keeps_client_generated_id(connector):
+    from supertracer.services.ids import SnowflakeIdGenerator
+    generator = SnowflakeIdGenerator(node_id=1)
+
+    log = create_sample_log(content="Snowflake")
+    log["id"] = generator.next_id()
+    assert connector.save_log(log) == log["id"]
+
+    batch = [create_sample_log(content=f"Snowflake {i}") for i in range(3)]
+    for entry in batch:
+        entry["id"] = generator.next_id()
+    assert connector.save_logs(batch) == [entry["id"] for entry in batch]
+
+    assert connector.fetch_log(log["id"])["content"] == "Snowflake"
+    assert connector.fetch_log(batch[2]["id"])["content"] == "Snowflake 2"
+
 def test_fetch_logs_pagination(connector):
     # Create 5 logs
     for i in range(5):
@@ -87,6 +126,25 @@ def test_fetch_logs_pagination(connector):
     # Should be the most recent ones (Log 4 and Log 3)
     assert "Log 4" in logs[0]["content"]
 
+def test_fetch_logs_cursor_pagination(connector):
+    from supertracer.types.filters import encode_cursor
+
+    # Logs that share a timestamp must not be skipped between pages
+    same_time = datetime.now()
+    for i in range(7):
+        connector.save_log(create_sample_log(content=f"Log {i}", timestamp=same_time))
+
+    contents = []
+    filters = LogFilters(limit=3)
+    while True:
+        logs = connector.fetch_logs(filters)
+        contents.extend(log["content"] for log in logs)
+        if len(logs) < filters.limit:
+            break
+        filters = LogFilters(limit=3, cursor=encode_cursor(logs[-1]["timestamp"], logs[-1]["id"]))
+
+    assert contents == [f"Log {i}" for i in reversed(range(7))]
+
 def test_fetch_logs_filtering(connector):
     connector.save_log(create_sample_log(content="Error occurred", level="ERROR", status=500))
     connector.save_log(create_sample_log(content="Success operation", level="INFO", status=200))
@@ -109,6 +167,34 @@ def test_fetch_logs_filtering(connector):
     assert len(logs) == 1
     assert "Success" in logs[0]["content"]
 
+def test_search_text_matches_content_only(connector):
+    log = create_sample_log(content="GET /orders", status=504)
+    log["error_message"] = "Upstream timeout"
+    connector.save_log(log)
+
+    # Every backend searches the same field, a term only in the error message matches nothing
+    assert connector.fetch_logs(LogFilters(search_text="timeout")) == []
+    assert [l["content"] for l in connector.fetch_logs(LogFilters(search_text="orders"))] == ["GET /orders"]
+
+def test_fetch_logs_header_and_body_filters(connector):
+    tenant_log = create_sample_log(content="Tenant 42")
+    tenant_log["headers"] = {"x-tenant": "42", "content-type": "application/json"}
+    tenant_log["request_body"] = {"order_id": 7, "items": []}
+    connector.save_log(tenant_log)
+    other_log = create_sample_log(content="Tenant 43")
+    other_log["headers"] = {"x-tenant": "43"}
+    other_log["request_body"] = "order_id"
+    connector.save_log(other_log)
+
+    logs = connector.fetch_logs(LogFilters(header_values=["X-Tenant=42"]))
+    assert [log["content"] for log in logs] == ["Tenant 42"]
+
+    logs = connector.fetch_logs(LogFilters(body_keys=["order_id"]))
+    assert [log["content"] for log in logs] == ["Tenant 42"]
+
+    logs = connector.fetch_logs(LogFilters(header_values=["x-tenant=42"], body_keys=["missing"]))
+    assert logs == []
+
 def test_cleanup_max_records(connector):
     # Create 10 logs
     for i in range(10):
@@ -151,3 +237,30 @@ def test_cleanup_older_than(connector):
     logs = connector.fetch_logs(LogFilters(limit=100))
     assert len(logs) == 1
     assert logs[0]["content"] == "New Log"
+
+def test_request_size_fields_roundtrip(connector):
+    log = create_sample_log()
+    log["request_size_bytes"] = 2048
+    log["request_body_truncated"] = True
+    log_id = connector.save_log(log)
+
+    fetched_log = connector.fetch_log(log_id)
+    assert fetched_log["request_size_bytes"] == 2048
+    assert fetched_log["request_body_truncated"] is True
+
+def test_sqlite_init_db_adds_missing_columns(tmp_path):
+    import sqlite3
+    from supertracer.connectors.queries import sqlite as queries
+
+    db_path = str(tmp_path / "old.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(queries.CREATE_TABLE)
+    legacy.commit()
+    legacy.close()
+
+    conn = SQLiteConnector(db_path=db_path)
+    conn.connect()
+    conn.init_db()
+    columns = {row[1] for row in conn.query(queries.TABLE_COLUMNS)}
+    assert {"request_size_bytes", "request_body_truncated"} <= columns
+    conn.disconnect()
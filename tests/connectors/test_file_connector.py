@@ -0,0 +1,145 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from supertracer.connectors.file import FileConnector
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.types.filters import LogFilters, encode_cursor
+from supertracer.types.options import RetentionOptions
+
+def create_log(content="Test log", log_id=0, status=200, timestamp=None, method="GET"):
+    return {
+        "id": log_id,
+        "content": content,
+        "timestamp": timestamp or datetime.now(),
+        "method": method,
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": {"host": "localhost", "x-tenant": "42"},
+        "log_level": "HTTP",
+        "status_code": status,
+        "duration_ms": 10,
+        "client_ip": "127.0.0.1",
+        "user_agent": "pytest",
+        "request_query": {"page": "2"},
+        "request_body": {"name": content},
+        "response_headers": {"content-type": "application/json"},
+        "response_body": {"ok": True},
+        "response_size_bytes": 11,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+def contents(logs):
+    return [log["content"] for log in logs]
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if not name.endswith(".idx"))
+
+@pytest.fixture(params=["binary", "ndjson"])
+def log_format(request):
+    return request.param
+
+def test_segments_rotate_and_reopen(tmp_path, log_format):
+    connector = FileConnector(directory=str(tmp_path), format=log_format, segment_max_bytes=2000)
+    connector.connect()
+    ids = []
+    for offset in range(0, 30, 5):
+        ids.extend(connector.save_logs([create_log(f"Log {i}") for i in range(offset, offset + 5)]))
+    assert len(segment_files(tmp_path)) > 1
+    connector.disconnect()
+
+    reopened = FileConnector(directory=str(tmp_path), format=log_format, segment_max_bytes=2000)
+    reopened.connect()
+    assert reopened.fetch_log(ids[3])["content"] == "Log 3"
+    assert contents(reopened.fetch_logs(LogFilters(limit=2))) == ["Log 29", "Log 28"]
+    # IDs carry on after the ones on disk
+    assert reopened.save_log(create_log("Log 30")) == ids[-1] + 1
+    reopened.disconnect()
+
+def test_payload_only_returned_by_fetch_log(tmp_path, log_format):
+    connector = FileConnector(directory=str(tmp_path), format=log_format)
+    connector.connect()
+    log_id = connector.save_log(create_log("With payload"))
+
+    summary = connector.fetch_logs(LogFilters(limit=1))[0]
+    assert summary["headers"] is None and summary["response_body"] is None
+    log = connector.fetch_log(log_id)
+    assert log["headers"] == {"host": "localhost", "x-tenant": "42"}
+    assert log["request_size_bytes"] is None
+    connector.disconnect()
+
+def test_filters_match_memory_connector(tmp_path, log_format):
+    start = datetime.now() - timedelta(hours=1)
+    connector = FileConnector(directory=str(tmp_path), format=log_format, segment_max_bytes=5000)
+    memory = MemoryConnector()
+    for connection in (connector, memory):
+        connection.connect()
+    for offset in range(0, 300, 25):
+        batch = []
+        for i in range(offset, offset + 25):
+            # Timestamps go back and forth, so segments overlap in time
+            log = create_log(f"Log {i}", status=(200, 404, 500)[i % 3], method=("GET", "POST")[i % 2],
+                             timestamp=start + timedelta(seconds=i + (i % 7) * 20))
+            log["error_message"] = "Timeout" if i % 10 == 0 else None
+            batch.append(log)
+        connector.save_logs(batch)
+        memory.save_logs(batch)
+
+    for filters in (
+        LogFilters(limit=40),
+        LogFilters(limit=30, status_code="5XX"),
+        LogFilters(limit=30, search_text="log 1", methods=["GET"]),
+        LogFilters(limit=30, start_date=start + timedelta(seconds=60), end_date=start + timedelta(seconds=120)),
+        LogFilters(limit=30, has_error=True, header_values=["X-Tenant=42"], body_keys=["name"]),
+    ):
+        expected = memory.fetch_logs(filters)
+        assert contents(connector.fetch_logs(filters)) == contents(expected)
+        cursor = encode_cursor(expected[-1]["timestamp"], expected[-1]["id"])
+        next_page = filters.model_copy(update={"cursor": cursor})
+        assert contents(connector.fetch_logs(next_page)) == contents(memory.fetch_logs(next_page))
+    connector.disconnect()
+
+def test_recovers_torn_write(tmp_path, log_format):
+    connector = FileConnector(directory=str(tmp_path), format=log_format)
+    connector.connect()
+    ids = connector.save_logs([create_log(f"Log {i}") for i in range(5)])
+    connector.disconnect()
+
+    # A crash after the data was written but before its index entry, then halfway through a record
+    index_path = tmp_path / "segment-00000001.idx"
+    os.truncate(index_path, os.path.getsize(index_path) - 30)
+    data_path = tmp_path / segment_files(tmp_path)[0]
+    size = os.path.getsize(data_path)
+    with open(data_path, "ab") as file:
+        file.write(b'{"id": 99, "content"')
+
+    reopened = FileConnector(directory=str(tmp_path), format=log_format)
+    reopened.connect()
+    assert os.path.getsize(data_path) == size
+    assert reopened.fetch_log(ids[4])["content"] == "Log 4"
+    assert reopened.save_log(create_log("Log 5")) == ids[4] + 1
+    assert contents(reopened.fetch_logs(LogFilters(limit=3))) == ["Log 5", "Log 4", "Log 3"]
+    reopened.disconnect()
+
+def test_cleanup_deletes_whole_segments(tmp_path):
+    connector = FileConnector(directory=str(tmp_path), segment_max_bytes=2000)
+    connector.connect()
+    old = datetime.now() - timedelta(hours=30)
+    connector.save_logs([create_log(f"Old {i}", timestamp=old) for i in range(10)])
+    connector.save_logs([create_log(f"New {i}") for i in range(10)])
+    files = segment_files(tmp_path)
+
+    deleted = connector.cleanup(RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=24))
+    assert deleted == 10
+    assert segment_files(tmp_path) == files[1:]
+    assert contents(connector.fetch_logs(LogFilters(limit=100))) == [f"New {i}" for i in reversed(range(10))]
+
+    # Never below max_records, so a segment is only deleted when the rest hold enough logs
+    assert connector.cleanup(RetentionOptions(enabled=True, max_records=15, cleanup_older_than_hours=0)) == 0
+    connector.disconnect()
+
+def test_rejects_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        FileConnector(directory=str(tmp_path), format="csv")
+    with pytest.raises(ValueError):
+        FileConnector(directory=str(tmp_path), segment_max_bytes=0)
@@ -0,0 +1,339 @@
+import pytest
+from datetime import datetime, timedelta
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.types.filters import LogFilters
+from supertracer.types.options import RetentionOptions
+
+def create_log(content="Test log", log_id=0, status=200, timestamp=None):
+    return {
+        "id": log_id,
+        "content": content,
+        "timestamp": timestamp or datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": {"host": "localhost", "x-tenant": "42"},
+        "log_level": "HTTP",
+        "status_code": status,
+        "duration_ms": 10,
+        "client_ip": "127.0.0.1",
+        "user_agent": "pytest",
+        "request_query": {"page": "2"},
+        "request_body": {"name": content},
+        "response_headers": {"content-type": "application/json"},
+        "response_body": {"ok": True},
+        "response_size_bytes": 11,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+def contents(logs):
+    return [log["content"] for log in logs]
+
+def test_full_buffer_replaces_oldest():
+    connector = MemoryConnector(capacity=3)
+    ids = connector.save_logs([create_log(f"Log {i}") for i in range(5)])
+
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["Log 4", "Log 3", "Log 2"]
+    assert connector.fetch_log(ids[1]) is None
+    assert connector.fetch_log(ids[4])["content"] == "Log 4"
+
+def test_payload_only_returned_by_fetch_log():
+    connector = MemoryConnector()
+    first = connector.save_log(create_log("first"))
+    second = connector.save_log(create_log("second"))
+
+    summary = connector.fetch_logs(LogFilters(limit=1))[0]
+    assert summary["headers"] is None and summary["response_body"] is None
+    # The first payload is stored as is, later ones are compressed against it
+    for log_id, content in ((first, "first"), (second, "second")):
+        log = connector.fetch_log(log_id)
+        assert log["headers"] == {"host": "localhost", "x-tenant": "42"}
+        assert log["request_body"] == {"name": content}
+        assert log["client_ip"] == "127.0.0.1"
+        assert log["status_code"] == 200
+
+def test_ids_out_of_order():
+    connector = MemoryConnector(capacity=4)
+    connector.save_logs([create_log("a", log_id=10), create_log("b", log_id=5), create_log("c", log_id=7)])
+
+    assert connector.fetch_log(5)["content"] == "b"
+    assert connector.fetch_log(10)["content"] == "a"
+    assert connector.fetch_log(8) is None
+
+    # Evicted logs can't be found by ID anymore
+    connector.save_logs([create_log("d", log_id=1), create_log("e", log_id=2)])
+    assert connector.fetch_log(10) is None
+    assert connector.fetch_log(2)["content"] == "e"
+
+def test_status_filters_scan_across_chunks():
+    connector = MemoryConnector(capacity=5000)
+    connector.save_logs([create_log(f"Log {i}", status=503 if i % 1000 == 0 else 200) for i in range(5000)])
+
+    assert contents(connector.fetch_logs(LogFilters(status_code="5XX", limit=10))) == [
+        "Log 4000", "Log 3000", "Log 2000", "Log 1000", "Log 0",
+    ]
+    assert len(connector.fetch_logs(LogFilters(status_code="50x", limit=10))) == 5
+    assert connector.fetch_logs(LogFilters(log_level="WARN")) == []
+
+def test_missing_status_and_duration():
+    connector = MemoryConnector()
+    log = create_log("app log")
+    log.update(status_code=None, duration_ms=None, method=None)
+    connector.save_log(log)
+
+    summary = connector.fetch_logs(LogFilters())[0]
+    assert (summary["status_code"], summary["duration_ms"], summary["method"]) == (None, None, None)
+    assert connector.fetch_logs(LogFilters(status_code="2XX")) == []
+
+def test_cleanup_older_than_evicts_from_head():
+    connector = MemoryConnector()
+    connector.save_log(create_log("old", timestamp=datetime.now() - timedelta(hours=3)))
+    connector.save_log(create_log("new"))
+
+    deleted = connector.cleanup(RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=1))
+    assert deleted == 1
+    assert contents(connector.fetch_logs(LogFilters())) == ["new"]
+
+def test_rejects_invalid_capacity():
+    with pytest.raises(ValueError):
+        MemoryConnector(capacity=0)
+
+def test_out_of_order_timestamps_are_kept_sorted():
+    connector = MemoryConnector()
+    now = datetime.now()
+    for content, seconds in (("a", 0), ("c", 20), ("b", 10), ("d", 30), ("early", -5)):
+        connector.save_log(create_log(content, timestamp=now + timedelta(seconds=seconds)))
+
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["d", "c", "b", "a", "early"]
+    window = LogFilters(start_date=now + timedelta(seconds=5), end_date=now + timedelta(seconds=25))
+    assert contents(connector.fetch_logs(window)) == ["c", "b"]
+    assert connector.fetch_log(connector.fetch_logs(LogFilters(limit=10))[3]["id"])["content"] == "a"
+
+def test_indexed_filters_match_scan():
+    import random
+
+    rng = random.Random(7)
+    connector = MemoryConnector(capacity=300)
+    now = datetime.now()
+    saved = []
+    for i in range(1000):
+        log = create_log(f"Log {i}", status=rng.choice([200, 201, 404, 500, 503]), timestamp=now + timedelta(seconds=i + rng.randint(-3, 3)))
+        log["method"] = rng.choice(["GET", "POST", "DELETE"])
+        log["log_level"] = rng.choice(["HTTP", "ERROR"])
+        log["id"] = connector.save_log(log)
+        saved.append(log)
+
+    # Only the newest 300 logs by time are still in memory
+    kept = sorted(saved, key=lambda log: log["timestamp"])[-300:]
+    for filters, matches in (
+        (LogFilters(status_code="5XX"), lambda log: log["status_code"] >= 500),
+        (LogFilters(status_code="404", methods=["GET", "POST"]), lambda log: log["status_code"] == 404 and log["method"] != "DELETE"),
+        (LogFilters(log_level="ERROR", methods=["DELETE"]), lambda log: log["log_level"] == "ERROR" and log["method"] == "DELETE"),
+        (
+            LogFilters(status_code="20X", start_date=now + timedelta(seconds=800), end_date=now + timedelta(seconds=900)),
+            lambda log: log["status_code"] < 300 and now + timedelta(seconds=800) <= log["timestamp"] < now + timedelta(seconds=900),
+        ),
+    ):
+        filters.limit = 1000
+        expected = {log["id"] for log in kept if matches(log)}
+        assert {log["id"] for log in connector.fetch_logs(filters)} == expected
+
+def test_search_index_matches_scan():
+    import random
+
+    rng = random.Random(11)
+    indexed, scanned = MemoryConnector(capacity=200, search_index=True), MemoryConnector(capacity=200)
+    now = datetime.now()
+    words = ["orders", "Users", "payment", "timeout", "refund"]
+    for i in range(600):
+        log = create_log(f"GET /{rng.choice(words)}/{i}", timestamp=now + timedelta(seconds=i + rng.randint(-3, 3)))
+        log["url"] = f"http://localhost/{rng.choice(words)}"
+        log["error_message"] = rng.choice([None, "Upstream timeout", "Card declined"])
+        indexed.save_log(dict(log))
+        scanned.save_log(dict(log))
+
+    for filters in (
+        LogFilters(search_text="users"),
+        LogFilters(search_text="TIMEOUT"),
+        LogFilters(search_text="declined"),
+        LogFilters(search_text="/5"),
+        LogFilters(search_text="missing"),
+        LogFilters(endpoint="refund", search_text="pay"),
+    ):
+        filters.limit = 1000
+        assert contents(indexed.fetch_logs(filters)) == contents(scanned.fetch_logs(filters))
+    # Like the SQL connectors, search_text only looks at the content
+    assert indexed.fetch_logs(LogFilters(search_text="declined")) == []
+
+    assert indexed.search_index_bytes() > 0
+    assert scanned.search_index_bytes() < indexed.search_index_bytes()
+    # Evicted logs leave the index
+    indexed.cleanup(RetentionOptions(enabled=True, max_records=1))
+    [kept] = indexed.fetch_logs(LogFilters(search_text="get"))
+    kept = indexed.fetch_log(kept["id"])
+    text = " ".join(filter(None, (kept["content"], kept["url"]))).lower()
+    assert set(indexed._trigram_postings.keys()) <= {text[i:i + 3] for i in range(len(text) - 2)}
+
+def test_max_bytes_drops_payloads_before_logs():
+    connector = MemoryConnector(max_bytes=20_000)
+    for i in range(40):
+        log = create_log(f"Log {i}")
+        log["response_body"] = {"data": [f"row {i}-{j}" for j in range(100)]}
+        connector.save_log(log)
+        assert connector.memory_usage()["used_bytes"] <= 20_000
+
+    logs = connector.fetch_logs(LogFilters(limit=100))
+    # Every log is still listed, only the newest ones kept their payload
+    assert len(logs) == 40 == connector.memory_usage()["logs"]
+    assert connector.fetch_log(logs[0]["id"])["response_body"] is not None
+    assert connector.fetch_log(logs[-1]["id"])["response_body"] is None
+    assert connector.fetch_log(logs[-1]["id"])["content"] == "Log 0"
+
+def test_max_bytes_keeps_errors_longest():
+    connector = MemoryConnector(max_bytes=30_000)
+    for i in range(300):
+        status = 500 if i % 10 == 0 else 200
+        connector.save_log(create_log(f"Log {i} status {status}", status=status))
+        assert connector.memory_usage()["used_bytes"] <= 30_000
+
+    logs = connector.fetch_logs(LogFilters(limit=300))
+    assert len(logs) == connector.memory_usage()["logs"] < 300
+    # The oldest errors outlive every request that succeeded before them
+    errors = [log for log in logs if log["status_code"] == 500]
+    assert errors[-1]["content"] == "Log 0 status 500"
+    assert min(int(log["content"].split()[1]) for log in logs if log["status_code"] == 200) > 200
+    assert connector.fetch_logs(LogFilters(search_text="Log 1 status 200")) == []
+    assert connector.fetch_logs(LogFilters(search_text="Log 10 status 500"))[0]["status_code"] == 500
+
+def test_rejects_invalid_max_bytes():
+    with pytest.raises(ValueError):
+        MemoryConnector(max_bytes=0)
+
+def test_max_bytes_keeps_indexes_consistent():
+    import random
+
+    rng = random.Random(3)
+    connector = MemoryConnector(capacity=500, max_bytes=40_000)
+    now = datetime.now()
+    for i in range(2000):
+        log = create_log(f"Log {i} {rng.choice(['alpha', 'beta'])}", status=rng.choice([200, 200, 200, 404, 500]), timestamp=now + timedelta(seconds=i + rng.randint(-5, 5)))
+        log["response_body"] = {"data": "x" * rng.randint(0, 2000)}
+        connector.save_log(log)
+        assert connector.memory_usage()["used_bytes"] <= 40_000
+
+    kept = connector.fetch_logs(LogFilters(limit=10_000))
+    assert len(kept) == connector.memory_usage()["logs"]
+    for filters, matches in (
+        (LogFilters(status_code="4XX"), lambda log: log["status_code"] == 404),
+        (LogFilters(search_text="beta"), lambda log: "beta" in log["content"]),
+        (LogFilters(has_error=True, search_text="alpha"), lambda log: log["status_code"] >= 400 and "alpha" in log["content"]),
+    ):
+        filters.limit = 10_000
+        assert connector.fetch_logs(filters) == [log for log in kept if matches(log)]
+    assert all(connector.fetch_log(log["id"])["content"] == log["content"] for log in kept)
+
+def test_complete_since_tracks_removed_logs(tmp_path):
+    path = str(tmp_path / "logs.snapshot")
+    start = datetime.now() - timedelta(minutes=10)
+    connector = MemoryConnector(capacity=5)
+    connector.save_logs([create_log(f"Log {i}", timestamp=start + timedelta(seconds=i)) for i in range(5)])
+    assert connector.complete_since() is None
+
+    connector.save_logs([create_log(f"Log {i}", timestamp=start + timedelta(seconds=i)) for i in range(5, 8)])
+    assert connector.complete_since() == start + timedelta(seconds=2)
+    connector.save_snapshot(path)
+
+    restored = MemoryConnector(capacity=5)
+    restored.load_snapshot(path)
+    assert restored.complete_since() == start + timedelta(seconds=2)
+    # Logs that no longer fit after loading count as removed too
+    smaller = MemoryConnector(capacity=2)
+    smaller.load_snapshot(path)
+    assert smaller.complete_since() == start + timedelta(seconds=5)
+
+def snapshot_logs(connector):
+    return [connector.fetch_log(log["id"]) for log in connector.fetch_logs(LogFilters(limit=10_000))]
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "logs.snapshot")
+    connector = MemoryConnector(capacity=50, search_index=True, max_bytes=15_000, snapshot_path=path, snapshot_interval_seconds=0)
+    connector.connect()
+    now = datetime.now()
+    for i in range(120):
+        log = create_log(f"Log {i} \x00 é", status=500 if i % 7 == 0 else 200, timestamp=now + timedelta(seconds=i % 60))
+        log["error_message"] = "boom" if i % 7 == 0 else None
+        connector.save_log(log)
+    # IDs out of order and a log without payload
+    connector.save_log({**create_log("Manual", log_id=5), "headers": None, "request_query": None, "request_body": None,
+                        "response_headers": None, "response_body": None, "client_ip": None, "user_agent": None,
+                        "response_size_bytes": None})
+    expected = snapshot_logs(connector)
+    usage = connector.memory_usage()
+    connector.disconnect()
+    assert connector.fetch_logs(LogFilters(limit=10)) == []
+
+    restored = MemoryConnector(capacity=50, search_index=True, max_bytes=15_000, snapshot_path=path)
+    restored.connect()
+    assert snapshot_logs(restored) == expected
+    assert restored.memory_usage() == usage
+    errors = restored.fetch_logs(LogFilters(search_text="log", status_code="5XX", limit=100))
+    assert [log["id"] for log in errors] == [log["id"] for log in expected if log["error_message"] == "boom"]
+    # New logs go on from the restored ones
+    new_id = restored.save_log(create_log("After restart", timestamp=now + timedelta(minutes=5)))
+    assert new_id > max(log["id"] for log in expected)
+    assert restored.fetch_logs(LogFilters(limit=1))[0]["content"] == "After restart"
+    restored.disconnect()
+
+def test_snapshot_into_smaller_buffer(tmp_path):
+    path = str(tmp_path / "logs.snapshot")
+    connector = MemoryConnector(capacity=100)
+    ids = connector.save_logs([create_log(f"Log {i}") for i in range(30)])
+    connector.save_snapshot(path)
+
+    for search_index in (True, False):
+        restored = MemoryConnector(capacity=10, search_index=search_index)
+        restored.load_snapshot(path)
+        assert contents(restored.fetch_logs(LogFilters(limit=100))) == [f"Log {i}" for i in range(29, 19, -1)]
+        assert contents(restored.fetch_logs(LogFilters(search_text="log 2", limit=100))) == [f"Log {i}" for i in range(29, 19, -1)]
+        assert restored.fetch_log(ids[-1])["request_body"] == {"name": "Log 29"}
+        assert restored.fetch_log(ids[0]) is None
+        restored.save_logs([create_log(f"New {i}") for i in range(5)])
+        assert contents(restored.fetch_logs(LogFilters(limit=100)))[:6] == ["New 4", "New 3", "New 2", "New 1", "New 0", "Log 29"]
+
+def test_snapshot_into_smaller_budget(tmp_path):
+    path = str(tmp_path / "logs.snapshot")
+    connector = MemoryConnector(capacity=100)
+    connector.save_logs([create_log(f"Log {i}") for i in range(100)])
+    connector.save_snapshot(path)
+    assert connector.memory_usage()["used_bytes"] > 20_000
+
+    restored = MemoryConnector(capacity=100, search_index=True, max_bytes=20_000)
+    restored.load_snapshot(path)
+    assert restored.memory_usage()["used_bytes"] <= 20_000
+    assert restored.fetch_logs(LogFilters(limit=1))[0]["content"] == "Log 99"
+
+def test_unreadable_snapshot_starts_empty(tmp_path, capsys):
+    path = tmp_path / "logs.snapshot"
+    path.write_bytes(b"not a snapshot")
+    connector = MemoryConnector(snapshot_path=str(path), snapshot_interval_seconds=0)
+    connector.connect()
+    assert connector.fetch_logs(LogFilters()) == []
+    assert "SuperTracer Error" in capsys.readouterr().out
+
+def test_periodic_snapshot(tmp_path):
+    import time
+
+    path = tmp_path / "logs.snapshot"
+    connector = MemoryConnector(snapshot_path=str(path), snapshot_interval_seconds=0.05)
+    connector.connect()
+    connector.save_log(create_log("Saved in the background"))
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.05)
+
+    restored = MemoryConnector()
+    restored.load_snapshot(str(path))
+    assert contents(restored.fetch_logs(LogFilters())) == ["Saved in the background"]
+    connector.disconnect()
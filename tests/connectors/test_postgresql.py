@@ -0,0 +1,150 @@
+import json
+import psycopg2
+import pytest
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, Mock
+from supertracer.connectors.postgresql import PostgreSQLConnector, strip_json_nul, to_csv
+from supertracer.connectors.queries import postgresql as queries
+from supertracer.connectors.async_postgresql import expand_values, to_asyncpg
+from supertracer.types.filters import LogFilters
+
+def test_to_csv_distinguishes_null_from_empty_string():
+    rows = [(None, "", 1.5, True, 'say "hi"\nbye', 7)]
+    # COPY reads an unquoted empty field as NULL and a quoted one as an empty string
+    assert to_csv(rows).read() == ',"","1.5","True","say ""hi""\nbye","7"\n'
+
+def test_json_values_have_no_nul_for_jsonb():
+    connector = PostgreSQLConnector()
+    assert connector._to_json({"body": "a\x00b", "path": "C:\\u0000"}) == '{"body": "ab", "path": "C:\\\\u0000"}'
+    assert json.loads(strip_json_nul(json.dumps("\\\x00"))) == "\\"
+    assert connector._to_json(None) is None
+
+def test_jsonb_conversion_removes_nul():
+    statement = queries.ALTER_COLUMN_TO_JSONB.format(table="requests", name="headers")
+    assert "regexp_replace(headers, " in statement and statement.endswith("::jsonb")
+
+def test_partition_names_round_trip():
+    connector = PostgreSQLConnector(partition_by="hour")
+    lower = datetime(2026, 3, 1, 13, tzinfo=timezone.utc).timestamp()
+
+    name = connector._partition_name("requests", lower)
+    assert name == "requests_p2026030113"
+    assert connector._partition_bounds("requests", name) == (lower, lower + 3600)
+    # Neither the default partition nor another table's partitions are time partitions
+    assert connector._partition_bounds("requests", "requests_default") is None
+    assert connector._partition_bounds("requests", "request_payloads_p2026030113") is None
+
+def test_rejects_unknown_partition_period():
+    with pytest.raises(ValueError):
+        PostgreSQLConnector(partition_by="week")
+
+def test_trigram_search_does_not_change_matches():
+    filters = LogFilters(search_text="timeout", endpoint="/orders")
+    # An index option must not change which logs a filter returns
+    assert PostgreSQLConnector(trigram_search=True)._build_fetch_logs_query(filters) == PostgreSQLConnector()._build_fetch_logs_query(filters)
+    query, params = PostgreSQLConnector(trigram_search=True)._build_fetch_logs_query(filters)
+    assert "content ILIKE %s" in query and "error_message ILIKE" not in query
+    assert params[1:3] == ("%timeout%", "%/orders%")
+
+def test_header_filter_uses_containment():
+    query, params = PostgreSQLConnector()._build_fetch_logs_query(LogFilters(header_values=["X-Tenant=42"]))
+    assert "headers::jsonb @> %s::jsonb" in query
+    assert '{"x-tenant": "42"}' in params
+
+def test_asyncpg_placeholders():
+    query, params = PostgreSQLConnector()._build_fetch_logs_query(LogFilters(methods=["GET", "POST"], limit=5))
+    assert "method = ANY($2)" in to_asyncpg(query)
+    assert to_asyncpg(query).endswith("LIMIT $3")
+    assert params[1:] == (["GET", "POST"], 5)
+
+def test_expand_values():
+    query, params = expand_values("INSERT INTO t (a, b) VALUES %s RETURNING id", [(1, "x"), (2, None)])
+    assert to_asyncpg(query) == "INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4) RETURNING id"
+    assert params == (1, "x", 2, None)
+
+def mock_connection(*results):
+    """A psycopg2 connection whose cursor runs through ``results``, raising the exceptions among them."""
+    connection = MagicMock(closed=0)
+    cursor = connection.cursor.return_value.__enter__.return_value
+
+    def execute(*args):
+        result = results[min(cursor.execute.call_count, len(results)) - 1] if results else None
+        if isinstance(result, Exception):
+            # psycopg2 marks the connection closed once the server is gone
+            connection.closed = 2
+            raise result
+
+    cursor.execute.side_effect = execute
+    cursor.fetchall.return_value = [(1,)]
+    cursor.fetchone.return_value = (7,)
+    return connection
+
+def pooled_connector(*connections, **options):
+    connector = PostgreSQLConnector(**options)
+    connector._pool = Mock()
+    connector._pool.getconn.side_effect = list(connections)
+    return connector
+
+def test_checkout_replaces_connection_that_fails_health_check():
+    dead, fresh = mock_connection(psycopg2.OperationalError("server closed the connection")), mock_connection()
+    connector = pooled_connector(dead, fresh, health_check_interval=5)
+    connector._last_used[id(dead)] = time.monotonic() - 10
+
+    assert connector._checkout() is fresh
+    connector._pool.putconn.assert_called_once_with(dead, close=True)
+
+def test_checkout_skips_health_check_for_recent_connection():
+    connection = mock_connection()
+    connector = pooled_connector(connection, health_check_interval=5)
+    connector._last_used[id(connection)] = time.monotonic()
+
+    assert connector._checkout() is connection
+    connection.cursor.assert_not_called()
+
+def test_release_closes_broken_connection():
+    connection = mock_connection()
+    connector = pooled_connector()
+    connector._release(connection)
+    connector._pool.putconn.assert_called_with(connection)
+    assert id(connection) in connector._last_used
+
+    connection.closed = 2
+    connector._release(connection)
+    connector._pool.putconn.assert_called_with(connection, close=True)
+    assert id(connection) not in connector._last_used
+
+def test_pool_max_size_limits_concurrent_checkouts():
+    first, second = mock_connection(), mock_connection()
+    connector = pooled_connector(first, second, pool_max_size=1)
+    entered = threading.Event()
+
+    def use_second():
+        with connector._connection():
+            entered.set()
+
+    with connector._connection():
+        thread = threading.Thread(target=use_second)
+        thread.start()
+        # The only slot is taken, so the second caller waits
+        assert not entered.wait(0.1)
+    assert entered.wait(5)
+    thread.join()
+
+def test_query_retried_after_connection_drop():
+    dropped = mock_connection(psycopg2.OperationalError("connection reset"))
+    connector = pooled_connector(dropped, mock_connection())
+    assert connector.query("SELECT 1") == [(1,)]
+
+def test_write_not_retried_once_sent():
+    dropped, spare = mock_connection(psycopg2.OperationalError("connection reset")), mock_connection()
+    connector = pooled_connector(dropped, spare)
+    # The server may have committed the INSERT before the connection dropped
+    with pytest.raises(psycopg2.OperationalError):
+        connector.execute("INSERT INTO requests (content) VALUES (%s) RETURNING id", ("x",))
+    spare.cursor.assert_not_called()
+
+def test_write_retried_when_checkout_failed():
+    connector = pooled_connector(psycopg2.OperationalError("could not connect"), mock_connection())
+    assert connector.execute("INSERT INTO requests (content) VALUES (%s) RETURNING id", ("x",)) == 7
@@ -0,0 +1,131 @@
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from supertracer.connectors.sharded_sqlite import ShardedSQLiteConnector
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.filters import LogFilters, encode_cursor
+from supertracer.types.options import RetentionOptions
+
+def create_log(content="Test log", status=200, timestamp=None):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": timestamp or datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": {"x-tenant": "42"},
+        "log_level": "HTTP",
+        "status_code": status,
+        "duration_ms": 10,
+        "client_ip": "127.0.0.1",
+        "user_agent": "pytest",
+        "request_query": {},
+        "request_body": {"name": content},
+        "response_headers": {},
+        "response_body": {},
+        "response_size_bytes": 11,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+def contents(logs):
+    return [log["content"] for log in logs]
+
+def shard_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".db"))
+
+@pytest.fixture
+def connector(tmp_path):
+    conn = ShardedSQLiteConnector(directory=str(tmp_path), shard_by="hour", max_open_shards=2)
+    conn.connect()
+    conn.init_db()
+    yield conn
+    conn.disconnect()
+
+def test_logs_are_sharded_by_period(connector, tmp_path):
+    hour = datetime(2026, 3, 1, 13, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    connector.save_logs([create_log("First", timestamp=hour), create_log("Second", timestamp=hour + timedelta(hours=1))])
+    assert shard_files(tmp_path) == ["supertracer-2026030113.db", "supertracer-2026030114.db"]
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["Second", "First"]
+
+def test_fetch_logs_merges_shards(connector):
+    single = SQLiteConnector(db_path=":memory:")
+    single.connect()
+    single.init_db()
+    start = datetime.now() - timedelta(hours=6)
+    for batch in range(6):
+        # Batches straddle the hours, and every other log is an error
+        logs = [create_log(f"Log {batch}-{i}", status=(200, 500)[i % 2], timestamp=start + timedelta(minutes=batch * 50 + i * 7))
+                for i in range(10)]
+        for log, log_id in zip(logs, connector.save_logs(logs)):
+            log["id"] = log_id
+        single.save_logs(logs)
+
+    for filters in (
+        LogFilters(limit=25),
+        LogFilters(limit=7, status_code="500"),
+        LogFilters(limit=10, start_date=start + timedelta(hours=1), end_date=start + timedelta(hours=3)),
+    ):
+        expected = single.fetch_logs(filters)
+        assert contents(connector.fetch_logs(filters)) == contents(expected)
+        cursor = encode_cursor(expected[-1]["timestamp"], expected[-1]["id"])
+        next_page = filters.model_copy(update={"cursor": cursor})
+        assert contents(connector.fetch_logs(next_page)) == contents(single.fetch_logs(next_page))
+    # Shards beyond max_open_shards were closed again
+    assert len(connector._open) <= 2
+    single.disconnect()
+
+def test_ids_are_unique_across_shards_and_restarts(tmp_path):
+    connector = ShardedSQLiteConnector(directory=str(tmp_path), shard_by="hour")
+    connector.connect()
+    now = datetime.now()
+    ids = connector.save_logs([create_log("Old", timestamp=now - timedelta(hours=2)), create_log("New", timestamp=now)])
+    connector.disconnect()
+
+    reopened = ShardedSQLiteConnector(directory=str(tmp_path), shard_by="hour")
+    reopened.connect()
+    assert reopened.fetch_log(ids[0])["content"] == "Old"
+    assert reopened.fetch_log(ids[1])["request_body"] == {"name": "New"}
+    assert reopened.save_log(create_log("Newer")) == ids[1] + 1
+    assert reopened.fetch_log(ids[1] + 100) is None
+    reopened.disconnect()
+
+def test_cleanup_unlinks_whole_shards(connector, tmp_path):
+    now = datetime.now()
+    connector.save_logs([create_log(f"Old {i}", timestamp=now - timedelta(hours=30)) for i in range(3)])
+    connector.save_logs([create_log(f"Recent {i}", timestamp=now - timedelta(hours=5)) for i in range(3)])
+    connector.save_logs([create_log(f"New {i}", timestamp=now) for i in range(3)])
+    assert len(shard_files(tmp_path)) == 3
+
+    deleted = connector.cleanup(RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=24))
+    assert deleted == 3
+    assert len(shard_files(tmp_path)) == 2
+
+    # Keeps a whole shard as long as the newer ones hold fewer than max_records logs
+    assert connector.cleanup(RetentionOptions(enabled=True, max_records=4, cleanup_older_than_hours=0)) == 0
+    assert connector.cleanup(RetentionOptions(enabled=True, max_records=3, cleanup_older_than_hours=0)) == 3
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["New 2", "New 1", "New 0"]
+    # No -wal or -shm files are left behind either
+    assert len(shard_files(tmp_path)) == 1
+    assert all(name.split(".db")[0] + ".db" in shard_files(tmp_path) for name in os.listdir(tmp_path))
+
+def test_rejects_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        ShardedSQLiteConnector(directory=str(tmp_path), shard_by="week")
+    with pytest.raises(ValueError):
+        ShardedSQLiteConnector(directory=str(tmp_path), db_path="logs.db")
+    with pytest.raises(ValueError):
+        ShardedSQLiteConnector(directory=str(tmp_path), journal_mode="fast")
+
+def test_unreadable_shard_is_skipped(connector, tmp_path, capsys):
+    hour = datetime(2026, 3, 1, 13, 30)
+    ids = connector.save_logs([create_log(f"Log {i}", timestamp=hour + timedelta(hours=i)) for i in range(3)])
+    # The oldest shard is no longer open, max_open_shards is 2
+    with open(tmp_path / shard_files(tmp_path)[0], "r+b") as file:
+        file.write(b"not a database" * 100)
+
+    assert connector.fetch_log(ids[0]) is None
+    assert connector.fetch_log(ids[2])["content"] == "Log 2"
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["Log 2", "Log 1"]
+    assert "SuperTracer Error" in capsys.readouterr().out
@@ -0,0 +1,111 @@
+import pytest
+import threading
+import time
+from datetime import datetime
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.filters import LogFilters
+
+def create_log(content="Test log"):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": None,
+        "log_level": "INFO",
+        "status_code": 200,
+        "duration_ms": 10,
+        "client_ip": None,
+        "user_agent": None,
+        "request_query": None,
+        "request_body": None,
+        "response_headers": None,
+        "response_body": None,
+        "response_size_bytes": None,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+@pytest.fixture
+def connector(tmp_path):
+    conn = SQLiteConnector(db_path=str(tmp_path / "supertracer.db"), read_connections=2)
+    conn.connect()
+    conn.init_db()
+    yield conn
+    conn.disconnect()
+
+def test_uses_wal_and_pragmas(connector):
+    assert connector.query("PRAGMA journal_mode")[0][0] == "wal"
+    assert connector.query("PRAGMA busy_timeout")[0][0] == 5000
+    assert connector.query("PRAGMA cache_size")[0][0] == -16384
+
+def test_read_connections_are_read_only(connector):
+    import sqlite3
+
+    with pytest.raises(sqlite3.OperationalError):
+        connector.query("DELETE FROM requests")
+
+def test_reads_do_not_wait_for_open_write(connector):
+    connector.save_log(create_log("committed"))
+    in_transaction = threading.Event()
+    release = threading.Event()
+
+    def long_write():
+        with connector._lock:
+            connector.cursor.execute("BEGIN IMMEDIATE")
+            connector.cursor.executemany(
+                "INSERT INTO requests (content, timestamp) VALUES (?, ?)",
+                [("uncommitted", time.time())] * 100,
+            )
+            in_transaction.set()
+            release.wait(5)
+            connector.connection.commit()
+
+    thread = threading.Thread(target=long_write)
+    thread.start()
+    in_transaction.wait(5)
+
+    started = time.monotonic()
+    contents = [log["content"] for log in connector.fetch_logs(LogFilters(limit=200))]
+    elapsed = time.monotonic() - started
+    release.set()
+    thread.join()
+
+    # The reader sees the last committed snapshot without waiting for the writer
+    assert contents == ["committed"]
+    assert elapsed < 1
+    assert len(connector.fetch_logs(LogFilters(limit=200))) == 101
+
+def test_concurrent_reads_and_writes(connector):
+    errors = []
+
+    def write():
+        try:
+            for i in range(20):
+                connector.save_logs([create_log(f"Log {i}-{j}") for j in range(10)])
+        except Exception as exc:
+            errors.append(exc)
+
+    def read():
+        try:
+            for _ in range(50):
+                connector.fetch_logs(LogFilters(limit=20))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(connector.fetch_logs(LogFilters(limit=500))) == 200
+    # The pool never grows past its limit
+    assert connector._reader_count <= 2
+
+def test_rejects_unknown_journal_mode():
+    with pytest.raises(ValueError):
+        SQLiteConnector(db_path=":memory:", journal_mode="wal; DROP TABLE requests")
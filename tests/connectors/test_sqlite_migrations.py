@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.connectors.queries import sqlite as queries
+from supertracer.types.filters import LogFilters, encode_cursor
+from supertracer.types.options import RetentionOptions
+
+@pytest.fixture
+def connector():
+    conn = SQLiteConnector(db_path=":memory:")
+    conn.connect()
+    conn.init_db()
+    yield conn
+    conn.disconnect()
+
+def create_log(content="Test log", status=200, level="INFO"):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": None,
+        "log_level": level,
+        "status_code": status,
+        "duration_ms": 10,
+        "client_ip": None,
+        "user_agent": None,
+        "request_query": None,
+        "request_body": None,
+        "response_headers": None,
+        "response_body": None,
+        "response_size_bytes": None,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+def query_plan(connector, filters):
+    select_query, params = connector._build_fetch_logs_query(filters)
+    rows = connector.query("EXPLAIN QUERY PLAN " + select_query, params)
+    return " | ".join(row[3] for row in rows)
+
+def test_migrations_set_schema_version(connector):
+    assert connector.query(queries.SCHEMA_VERSION)[0][0] == len(queries.MIGRATIONS)
+
+def test_init_db_is_idempotent(tmp_path):
+    db_path = str(tmp_path / "supertracer.db")
+    for _ in range(2):
+        conn = SQLiteConnector(db_path=db_path)
+        conn.connect()
+        conn.init_db()
+        conn.disconnect()
+
+    conn = SQLiteConnector(db_path=db_path)
+    conn.connect()
+    indexes = {row[0] for row in conn.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_requests_timestamp" in indexes
+    assert "idx_requests_errors" in indexes
+    conn.disconnect()
+
+@pytest.mark.parametrize("filters, index, ordered", [
+    (LogFilters(), "idx_requests_timestamp", True),
+    (LogFilters(cursor=encode_cursor(datetime.now(), 42)), "idx_requests_timestamp", True),
+    (LogFilters(status_code="404"), "idx_requests_status_code", True),
+    (LogFilters(log_level="ERROR"), "idx_requests_log_level", True),
+    (LogFilters(has_error=True), "idx_requests_errors", True),
+    # A status class is a range, so its matches are sorted afterwards
+    (LogFilters(status_code="5XX"), "idx_requests_status_code", False),
+])
+def test_fetch_logs_uses_index(connector, filters, index, ordered):
+    plan = query_plan(connector, filters)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan
+    if ordered:
+        # The index already returns rows in listing order
+        assert "TEMP B-TREE" not in plan
+
+def test_status_class_filter(connector):
+    connector.save_log(create_log("ok", status=200))
+    connector.save_log(create_log("missing", status=404))
+    connector.save_log(create_log("failed", status=503))
+
+    logs = connector.fetch_logs(LogFilters(status_code="5XX"))
+    assert [log["content"] for log in logs] == ["failed"]
+    logs = connector.fetch_logs(LogFilters(status_code="4xx"))
+    assert [log["content"] for log in logs] == ["missing"]
+
+def test_cleanup_max_records_keeps_newest(connector):
+    connector.save_logs([create_log(f"Log {i}") for i in range(10)])
+
+    connector.cleanup(RetentionOptions(enabled=True, max_records=3, cleanup_older_than_hours=0))
+
+    contents = [log["content"] for log in connector.fetch_logs(LogFilters(limit=100))]
+    assert contents == ["Log 9", "Log 8", "Log 7"]
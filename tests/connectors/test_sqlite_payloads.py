@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime, timedelta
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.types.filters import LogFilters
+from supertracer.types.options import RetentionOptions
+
+def create_log(content="Test log", timestamp=None):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": timestamp or datetime.now(),
+        "method": "POST",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": {"content-type": "application/json"},
+        "log_level": "ERROR",
+        "status_code": 500,
+        "duration_ms": 10,
+        "client_ip": "127.0.0.1",
+        "user_agent": "pytest",
+        "request_query": {"page": "1"},
+        "request_body": {"name": "x" * 1000},
+        "response_headers": {"content-length": "2"},
+        "response_body": {"error": "boom"},
+        "response_size_bytes": 2,
+        "error_message": "boom",
+        "stack_trace": "Traceback ...",
+    }
+
+@pytest.fixture
+def connector():
+    conn = SQLiteConnector(db_path=":memory:", split_payloads=True)
+    conn.connect()
+    conn.init_db()
+    yield conn
+    conn.disconnect()
+
+def test_payloads_are_stored_apart(connector):
+    log_id = connector.save_log(create_log())
+
+    row = connector.query("SELECT headers, request_body, response_body, stack_trace FROM requests WHERE id = ?", (log_id,))[0]
+    assert row == (None, None, None, None)
+
+    log = connector.fetch_log(log_id)
+    assert log["headers"] == {"content-type": "application/json"}
+    assert log["request_query"] == {"page": "1"}
+    assert log["request_body"] == {"name": "x" * 1000}
+    assert log["response_headers"] == {"content-length": "2"}
+    assert log["response_body"] == {"error": "boom"}
+    assert log["stack_trace"] == "Traceback ..."
+    assert log["error_message"] == "boom"
+
+def test_batch_and_client_ids(connector):
+    ids = connector.save_logs([create_log(f"Log {i}") for i in range(3)])
+    log = create_log("Snowflake")
+    log["id"] = 1 << 40
+    ids.append(connector.save_log(log))
+
+    assert [connector.fetch_log(log_id)["response_body"] for log_id in ids] == [{"error": "boom"}] * 4
+
+def test_inline_rows_still_readable(tmp_path):
+    db_path = str(tmp_path / "supertracer.db")
+    conn = SQLiteConnector(db_path=db_path)
+    conn.connect()
+    conn.init_db()
+    log_id = conn.save_log(create_log())
+    conn.disconnect()
+
+    conn = SQLiteConnector(db_path=db_path, split_payloads=True)
+    conn.connect()
+    conn.init_db()
+    assert conn.fetch_log(log_id)["request_body"] == {"name": "x" * 1000}
+    conn.disconnect()
+
+def test_payload_retention_keeps_summary_rows(connector):
+    old_id = connector.save_log(create_log("Old", timestamp=datetime.now() - timedelta(hours=5)))
+    new_id = connector.save_log(create_log("New"))
+
+    connector.cleanup(RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=24, payload_retention_hours=2))
+
+    assert len(connector.fetch_logs(LogFilters(limit=10))) == 2
+    old_log = connector.fetch_log(old_id)
+    assert old_log["content"] == "Old"
+    assert old_log["response_body"] is None
+    assert connector.fetch_log(new_id)["response_body"] == {"error": "boom"}
+
+def test_deleting_rows_deletes_payloads(connector):
+    for i in range(5):
+        connector.save_log(create_log(f"Log {i}"))
+
+    connector.cleanup(RetentionOptions(enabled=True, max_records=2, cleanup_older_than_hours=0))
+
+    assert connector.query("SELECT COUNT(*) FROM request_payloads")[0][0] == 2
+
+def test_header_and_body_filters_read_payload_table(connector):
+    connector.save_log(create_log("Split"))
+
+    logs = connector.fetch_logs(LogFilters(header_values=["content-type=application/json"], body_keys=["name"]))
+    assert [log["content"] for log in logs] == ["Split"]
+    assert connector.fetch_logs(LogFilters(body_keys=["other"])) == []
@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime
+from supertracer.connectors.sqlite import SQLiteConnector, to_fts_query
+from supertracer.types.filters import LogFilters
+
+def create_log(content, error_message=None, url="http://localhost/test"):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": url,
+        "headers": None,
+        "log_level": "INFO",
+        "status_code": 200,
+        "duration_ms": 10,
+        "client_ip": None,
+        "user_agent": None,
+        "request_query": None,
+        "request_body": None,
+        "response_headers": None,
+        "response_body": None,
+        "response_size_bytes": None,
+        "error_message": error_message,
+        "stack_trace": None,
+    }
+
+@pytest.fixture
+def connector():
+    conn = SQLiteConnector(db_path=":memory:", full_text_search=True, search_columns=("content", "error_message"))
+    conn.connect()
+    conn.init_db()
+    yield conn
+    conn.disconnect()
+
+def search(connector, text, **kwargs):
+    return [log["content"] for log in connector.fetch_logs(LogFilters(search_text=text, **kwargs))]
+
+def test_to_fts_query():
+    assert to_fts_query('user login') == '"user"* "login"*'
+    assert to_fts_query('"connection reset" db*') == '"connection reset" "db"*'
+    assert to_fts_query('say "hi') == '"say"* "hi"*'
+    assert to_fts_query('*** "" -') is None
+
+def test_prefix_and_phrase_search(connector):
+    connector.save_log(create_log("User authenticated successfully"))
+    connector.save_log(create_log("Authentication failed for user"))
+    connector.save_log(create_log("Cache warmed"))
+
+    assert sorted(search(connector, "auth")) == ["Authentication failed for user", "User authenticated successfully"]
+    assert search(connector, '"failed for"') == ["Authentication failed for user"]
+    assert search(connector, "user cache") == []
+
+def test_searches_error_message(connector):
+    connector.save_log(create_log("GET /orders", error_message="Connection reset by peer"))
+    connector.save_log(create_log("GET /users"))
+
+    assert search(connector, "reset") == ["GET /orders"]
+
+def test_index_follows_deletes(connector):
+    connector.save_log(create_log("Old entry"))
+    connector.execute("DELETE FROM requests")
+    connector.save_log(create_log("New entry"))
+
+    assert search(connector, "entry") == ["New entry"]
+
+def test_relevance_order(connector):
+    connector.save_log(create_log("timeout while calling payments, a long message about many other things"))
+    connector.save_log(create_log("timeout timeout"))
+    connector.save_log(create_log("unrelated"))
+
+    assert search(connector, "timeout", order_by="relevance") == [
+        "timeout timeout",
+        "timeout while calling payments, a long message about many other things",
+    ]
+
+def test_existing_rows_are_indexed(tmp_path):
+    db_path = str(tmp_path / "supertracer.db")
+    conn = SQLiteConnector(db_path=db_path)
+    conn.connect()
+    conn.init_db()
+    conn.save_log(create_log("Written before the index existed"))
+    conn.disconnect()
+
+    conn = SQLiteConnector(db_path=db_path, full_text_search=True)
+    conn.connect()
+    conn.init_db()
+    assert search(conn, "before") == ["Written before the index existed"]
+    conn.disconnect()
+
+def test_rejects_unknown_search_column():
+    with pytest.raises(ValueError):
+        SQLiteConnector(db_path=":memory:", full_text_search=True, search_columns=("request_body",))
@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime, timedelta
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.connectors.sqlite import SQLiteConnector
+from supertracer.connectors.tiered import TieredConnector
+from supertracer.types.filters import LogFilters
+from supertracer.types.options import RetentionOptions, WriterOptions
+
+def create_log(content="Test log", timestamp=None):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": timestamp or datetime.now(),
+        "method": "GET",
+        "path": "/test",
+        "url": "http://localhost/test",
+        "headers": {"host": "localhost"},
+        "log_level": "HTTP",
+        "status_code": 200,
+        "duration_ms": 10,
+        "client_ip": "127.0.0.1",
+        "user_agent": "pytest",
+        "request_query": {},
+        "request_body": {"name": content},
+        "response_headers": {},
+        "response_body": {"ok": True},
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+def contents(logs):
+    return [log["content"] for log in logs]
+
+class CountingSQLiteConnector(SQLiteConnector):
+    """Counts the fetch_logs calls that reach the cold tier."""
+    fetches = 0
+
+    def fetch_logs(self, filters=None):
+        self.fetches += 1
+        return super().fetch_logs(filters)
+
+@pytest.fixture
+def cold(tmp_path):
+    return CountingSQLiteConnector(db_path=str(tmp_path / "cold.db"))
+
+def open_tiered(cold, capacity=1000):
+    connector = TieredConnector(cold=cold, node_id=1, hot=MemoryConnector(capacity=capacity))
+    connector.connect()
+    connector.init_db()
+    cold.fetches = 0
+    return connector
+
+def test_recent_pages_served_from_memory(cold):
+    connector = open_tiered(cold)
+    start = datetime.now() - timedelta(minutes=10)
+    ids = connector.save_logs([create_log(f"Log {i}", start + timedelta(seconds=i)) for i in range(20)])
+
+    assert contents(connector.fetch_logs(LogFilters(limit=5))) == [f"Log {i}" for i in range(19, 14, -1)]
+    assert len(connector.fetch_logs(LogFilters(start_date=start - timedelta(seconds=1), limit=50))) == 20
+    assert connector.fetch_log(ids[3])["content"] == "Log 3"
+    assert cold.fetches == 0
+
+    # Every log is spilled with the same ID
+    assert connector.flush(timeout=5)
+    assert cold.fetch_log(ids[3])["request_body"] == {"name": "Log 3"}
+    connector.disconnect()
+
+def test_older_pages_merged_with_cold_tier(cold):
+    connector = open_tiered(cold, capacity=5)
+    start = datetime.now() - timedelta(minutes=10)
+    ids = []
+    for i in range(0, 20, 4):
+        ids += connector.save_logs([create_log(f"Log {i + j}", start + timedelta(seconds=i + j)) for j in range(4)])
+    connector.flush(timeout=5)
+
+    # Memory only holds the last 5, the rest of the page comes from disk
+    assert contents(connector.fetch_logs(LogFilters(limit=8))) == [f"Log {i}" for i in range(19, 11, -1)]
+    assert cold.fetches == 1
+    assert contents(connector.fetch_logs(LogFilters(limit=3))) == ["Log 19", "Log 18", "Log 17"]
+    assert cold.fetches == 1
+    assert connector.fetch_log(ids[0])["content"] == "Log 0"
+    connector.disconnect()
+
+def test_logs_on_disk_before_start_are_merged(cold):
+    cold.connect()
+    cold.init_db()
+    cold.save_log(create_log("On disk", datetime.now() - timedelta(minutes=1)))
+    cold.disconnect()
+
+    connector = open_tiered(cold)
+    connector.save_log(create_log("In memory"))
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["In memory", "On disk"]
+    assert cold.fetches == 1
+    # A page entirely newer than the disk needs no merge
+    assert contents(connector.fetch_logs(LogFilters(limit=1))) == ["In memory"]
+    assert cold.fetches == 1
+    connector.disconnect()
+
+def test_cleanup_applies_to_both_tiers(cold):
+    connector = open_tiered(cold)
+    connector.save_log(create_log("Old", datetime.now() - timedelta(hours=30)))
+    connector.save_log(create_log("New"))
+
+    connector.cleanup(RetentionOptions(enabled=True, max_records=0, cleanup_older_than_hours=24))
+    assert contents(connector.fetch_logs(LogFilters(limit=10))) == ["New"]
+    assert contents(cold.fetch_logs(LogFilters(limit=10))) == ["New"]
+    connector.disconnect()
+
+def test_save_logs_leaves_callers_logs_unchanged(cold):
+    connector = open_tiered(cold)
+    log = create_log("Mine")
+    [log_id] = connector.save_logs([log])
+    assert log["id"] == 0
+    assert connector.fetch_log(log_id)["content"] == "Mine"
+    connector.disconnect()
+
+def test_spill_waits_for_room_by_default(cold):
+    connector = open_tiered(cold)
+    assert connector.spill_writer.options.backpressure == "block"
+    connector.disconnect()
+
+    dropping = TieredConnector(cold=cold, node_id=1, spill_options=WriterOptions(max_queue_size=1, flush_interval_seconds=60, backpressure="drop_oldest"))
+    # Never started, so the queue stays full
+    dropping.save_logs([create_log(f"Log {i}") for i in range(3)])
+    assert dropping.spill_dropped == 2
+
+def test_rejects_memory_cold_tier():
+    with pytest.raises(ValueError):
+        TieredConnector(cold=MemoryConnector(), node_id=1)
@@ -0,0 +1,114 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from supertracer.middleware.asgi_logger_middleware import add_asgi_logger_middleware
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.services.broadcaster import LogBroadcaster
+from supertracer.services.metrics import MetricsService
+from supertracer.types.options import SupertracerOptions, CaptureOptions
+from supertracer.types.filters import LogFilters
+
+@pytest.fixture
+def connector():
+    conn = MemoryConnector()
+    conn.connect()
+    return conn
+
+def create_app(connector, options=None):
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("Boom!")
+
+    @app.get("/supertracer/logs")
+    async def own_page():
+        return {"ok": True}
+
+    add_asgi_logger_middleware(options or SupertracerOptions(), connector, LogBroadcaster(), MetricsService(), app)
+    return app
+
+def test_captures_request_and_response(connector):
+    client = TestClient(create_app(connector))
+    response = client.post("/echo?x=1", json={"hello": "world"}, headers={"Authorization": "secret"})
+    assert response.status_code == 200
+
+    logs = connector.fetch_logs(LogFilters(limit=10))
+    assert len(logs) == 1
+    log = connector.fetch_log(logs[0]["id"])
+    assert log["method"] == "POST"
+    assert log["path"] == "/echo"
+    assert log["status_code"] == 200
+    assert log["log_level"] == "HTTP"
+    assert log["request_query"] == {"x": "1"}
+    assert log["request_body"] == {"hello": "world"}
+    assert log["response_body"] == {"hello": "world"}
+    assert "authorization" not in log["headers"]
+    assert log["response_headers"]["content-type"] == "application/json"
+
+def test_streaming_response_is_passed_through(connector):
+    client = TestClient(create_app(connector))
+    response = client.get("/stream")
+    assert response.text == "chunk0chunk1chunk2"
+
+    log = connector.fetch_logs(LogFilters(limit=1))[0]
+    assert connector.fetch_log(log["id"])["response_body"] == "chunk0chunk1chunk2"
+
+def test_exception_is_logged_and_reraised(connector):
+    client = TestClient(create_app(connector), raise_server_exceptions=False)
+    response = client.get("/boom")
+    assert response.status_code == 500
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["status_code"] == 500
+    assert log["log_level"] == "ERROR"
+    assert log["error_message"] == "Boom!"
+    assert "RuntimeError" in log["stack_trace"]
+
+def test_skips_own_traces(connector):
+    client = TestClient(create_app(connector))
+    client.get("/supertracer/logs")
+    assert connector.fetch_logs(LogFilters(limit=10)) == []
+
+def test_body_capture_disabled(connector):
+    options = SupertracerOptions(capture_options=CaptureOptions(capture_request_body=False, capture_response_body=False))
+    client = TestClient(create_app(connector, options))
+    client.post("/echo", json={"hello": "world"})
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["request_body"] is None
+    assert log["response_body"] is None
+
+def test_large_response_keeps_bounded_prefix(connector):
+    options = SupertracerOptions(capture_options=CaptureOptions(max_response_body_size=8))
+    client = TestClient(create_app(connector, options))
+    response = client.get("/stream")
+    assert response.text == "chunk0chunk1chunk2"
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["response_body"] == "chunk0ch"
+    assert log["response_size_bytes"] == 18
+
+def test_large_upload_keeps_bounded_prefix(connector):
+    options = SupertracerOptions(capture_options=CaptureOptions(max_request_body_size=10))
+    client = TestClient(create_app(connector, options))
+    payload = {"data": "x" * 1000}
+    response = client.post("/echo", json=payload)
+    assert response.json() == payload
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["request_body"] == '{"data":"x'
+    assert log["request_body_truncated"] is True
+    assert log["request_size_bytes"] == len(response.content)
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from supertracer.middleware.logger_middleware import add_logger_middleware
+from supertracer.middleware.capture import BodyCapture
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.services.broadcaster import LogBroadcaster
+from supertracer.services.metrics import MetricsService
+from supertracer.types.options import SupertracerOptions, CaptureOptions
+from supertracer.types.filters import LogFilters
+
+@pytest.fixture
+def connector():
+    conn = MemoryConnector()
+    conn.connect()
+    return conn
+
+def create_app(connector, options=None):
+    app = FastAPI()
+
+    @app.get("/json")
+    async def json_route():
+        return {"hello": "world"}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    add_logger_middleware(options or SupertracerOptions(), connector, LogBroadcaster(), MetricsService(), app)
+    return app
+
+def test_response_body_is_captured(connector):
+    client = TestClient(create_app(connector))
+    response = client.get("/json")
+    assert response.json() == {"hello": "world"}
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["response_body"] == {"hello": "world"}
+    assert log["status_code"] == 200
+
+def test_streamed_response_keeps_bounded_prefix(connector):
+    options = SupertracerOptions(capture_options=CaptureOptions(max_response_body_size=8))
+    client = TestClient(create_app(connector, options))
+    response = client.get("/stream")
+    assert response.text == "chunk0chunk1chunk2"
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["response_body"] == "chunk0ch"
+    assert log["response_size_bytes"] == 18
+
+def test_body_capture_keeps_prefix_only():
+    capture = BodyCapture(max_size=5)
+    capture.feed(b"abc")
+    capture.feed(b"defgh")
+    capture.feed(b"ijk")
+
+    assert capture.size == 11
+    assert capture.truncated is True
+    assert capture.value() == "abcde"
+
+def test_body_capture_parses_json_within_limit():
+    capture = BodyCapture(max_size=100)
+    capture.feed(b'{"a": ')
+    capture.feed(b'1}')
+
+    assert capture.truncated is False
+    assert capture.value() == {"a": 1}
+
+def test_request_body_is_captured_from_receive(connector):
+    options = SupertracerOptions(capture_options=CaptureOptions(max_request_body_size=4))
+    app = create_app(connector, options)
+
+    @app.post("/upload")
+    async def upload(payload: dict):
+        return {"received": len(payload["data"])}
+
+    client = TestClient(app)
+    response = client.post("/upload", content=b'{"data": "abcdef"}', headers={"content-type": "application/json"})
+    assert response.json() == {"received": 6}
+
+    log = connector.fetch_log(connector.fetch_logs(LogFilters(limit=1))[0]["id"])
+    assert log["request_body"] == '{"da'
+    assert log["request_size_bytes"] == 18
+    assert log["request_body_truncated"] is True
@@ -30,8 +30,8 @@ def mock_metrics():
 @pytest.fixture
 def mock_connector():
     connector = MagicMock(spec=BaseConnector)
-    connector.fetch_logs.return_value = []
-    connector.fetch_log.return_value = None
+    connector.fetch_logs_async.return_value = []
+    connector.fetch_log_async.return_value = None
     return connector
 
 @pytest.fixture
@@ -82,8 +82,8 @@ def sample_log():
     }
 
 def test_get_logs_endpoint(api_client, mock_connector, sample_log):
-    """Should call connector.fetch_logs."""
-    mock_connector.fetch_logs.return_value = [sample_log]
+    """Should await connector.fetch_logs_async."""
+    mock_connector.fetch_logs_async.return_value = [sample_log]
     
     response = api_client.get(
         "/supertracer-api/api/v1/logs",
@@ -94,11 +94,54 @@ def test_get_logs_endpoint(api_client, mock_connector, sample_log):
     data = response.json()
     assert len(data["data"]) == 1
     assert data["data"][0]["content"] == "test"
-    assert mock_connector.fetch_logs.called
+    assert mock_connector.fetch_logs_async.called
+
+def test_log_ids_sent_as_strings(api_client, mock_connector, mock_metrics, sample_log):
+    """Should send IDs as strings, JavaScript numbers round snowflake IDs above 2^53."""
+    snowflake_id = 2 ** 62 + 1
+    mock_connector.fetch_logs_async.return_value = [{**sample_log, "id": snowflake_id}]
+    mock_connector.fetch_log_async.return_value = {**sample_log, "id": snowflake_id}
+    mock_metrics.get_summary.return_value = {"recent_errors": [{"id": snowflake_id, "path": "/test"}]}
+    headers = {"Authorization": "secret"}
+
+    assert api_client.get("/supertracer-api/api/v1/logs", headers=headers).json()["data"][0]["id"] == str(snowflake_id)
+    assert api_client.get(f"/supertracer-api/api/v1/logs/{snowflake_id}", headers=headers).json()["id"] == str(snowflake_id)
+    assert api_client.get("/supertracer-api/api/v1/metrics", headers=headers).json()["recent_errors"][0]["id"] == str(snowflake_id)
+
+def test_get_logs_next_page_cursor(api_client, mock_connector, sample_log):
+    """Should return a cursor for the next page that is passed back to the connector."""
+    from supertracer.types.filters import decode_cursor
+
+    mock_connector.fetch_logs_async.return_value = [sample_log]
+    
+    response = api_client.get(
+        "/supertracer-api/api/v1/logs?limit=1",
+        headers={"Authorization": "secret"}
+    )
+    
+    data = response.json()
+    assert decode_cursor(data["next_cursor"]) == (sample_log["timestamp"], 1)
+    assert f"cursor={data['next_cursor']}" in data["next_page_url"]
+
+    api_client.get(
+        f"/supertracer-api/api/v1/logs?limit=1&cursor={data['next_cursor']}",
+        headers={"Authorization": "secret"}
+    )
+    filters = mock_connector.fetch_logs_async.call_args.args[0]
+    assert filters.cursor == data["next_cursor"]
+    assert filters.end_date is None
+
+def test_get_logs_invalid_cursor(api_client):
+    """Should reject a malformed cursor."""
+    response = api_client.get(
+        "/supertracer-api/api/v1/logs?cursor=not-a-cursor",
+        headers={"Authorization": "secret"}
+    )
+    assert response.status_code == 422
 
 def test_get_log_detail_endpoint(api_client, mock_connector, sample_log):
-    """Should call connector.fetch_log."""
-    mock_connector.fetch_log.return_value = sample_log
+    """Should await connector.fetch_log_async."""
+    mock_connector.fetch_log_async.return_value = sample_log
     
     response = api_client.get(
         "/supertracer-api/api/v1/logs/1",
@@ -107,7 +150,7 @@ def test_get_log_detail_endpoint(api_client, mock_connector, sample_log):
     
     assert response.status_code == 200
     assert response.json()["content"] == "test"
-    mock_connector.fetch_log.assert_called_with(1)
+    mock_connector.fetch_log_async.assert_called_with(1)
 
 def test_metrics_endpoint(api_client, mock_metrics):
     """Should call metrics.get_summary."""
@@ -0,0 +1,53 @@
+import pytest
+import threading
+from datetime import datetime, timedelta
+from supertracer.services.ids import SnowflakeIdGenerator, timestamp_from_id, MAX_NODE_ID
+
+def test_ids_are_strictly_increasing():
+    generator = SnowflakeIdGenerator(node_id=1)
+    ids = [generator.next_id() for _ in range(10000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+def test_ids_fit_in_signed_64_bits():
+    generator = SnowflakeIdGenerator(node_id=MAX_NODE_ID)
+    assert 0 < generator.next_id() < 2 ** 63
+
+def test_ids_are_unique_across_threads():
+    generator = SnowflakeIdGenerator(node_id=2)
+    results = []
+
+    def worker():
+        results.extend(generator.next_id() for _ in range(2000))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 8000
+
+def test_different_nodes_never_collide():
+    first = SnowflakeIdGenerator(node_id=3)
+    second = SnowflakeIdGenerator(node_id=4)
+    ids = {first.next_id() for _ in range(1000)}
+    assert ids.isdisjoint(second.next_id() for _ in range(1000))
+
+def test_timestamp_from_id():
+    log_id = SnowflakeIdGenerator(node_id=5).next_id()
+    assert abs(timestamp_from_id(log_id) - datetime.now()) < timedelta(seconds=1)
+
+def test_invalid_node_id():
+    with pytest.raises(ValueError, match="node_id must be between"):
+        SnowflakeIdGenerator(node_id=MAX_NODE_ID + 1)
+
+def test_refuses_to_run_in_forked_process(monkeypatch):
+    import os
+
+    generator = SnowflakeIdGenerator(node_id=6)
+    generator.next_id()
+    # A forked worker would share the parent's node ID
+    monkeypatch.setattr(os, "getpid", lambda: generator._pid + 1)
+    with pytest.raises(RuntimeError, match="node_id"):
+        generator.next_id()
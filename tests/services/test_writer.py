@@ -0,0 +1,205 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from supertracer.services.writer import LogWriter
+from supertracer.connectors.memory import MemoryConnector
+from supertracer.types.options import WriterOptions
+from supertracer.types.filters import LogFilters
+
+def create_log(content="Test log", level="INFO"):
+    return {
+        "id": 0,
+        "content": content,
+        "timestamp": datetime.now(),
+        "method": None,
+        "path": None,
+        "url": None,
+        "headers": None,
+        "log_level": level,
+        "status_code": None,
+        "duration_ms": None,
+        "client_ip": None,
+        "user_agent": None,
+        "request_query": None,
+        "request_body": None,
+        "response_headers": None,
+        "response_body": None,
+        "response_size_bytes": None,
+        "error_message": None,
+        "stack_trace": None,
+    }
+
+@pytest.fixture
+def connector():
+    conn = MemoryConnector()
+    conn.connect()
+    return conn
+
+def test_writes_in_background_and_calls_back(connector):
+    writer = LogWriter(connector, WriterOptions(flush_size=10, flush_interval_seconds=0.05))
+    writer.start()
+    on_saved = Mock()
+
+    for i in range(25):
+        assert writer.submit(create_log(f"Log {i}"), on_saved)
+
+    assert writer.flush(timeout=5)
+    writer.stop()
+
+    logs = connector.fetch_logs(LogFilters(limit=100))
+    assert len(logs) == 25
+    assert on_saved.call_count == 25
+    # The callback receives the log with its assigned ID
+    assert all(call.args[0]["id"] > 0 for call in on_saved.call_args_list)
+
+def test_stop_drains_queue(connector):
+    writer = LogWriter(connector, WriterOptions(flush_size=1000, flush_interval_seconds=60))
+    writer.start()
+    for i in range(50):
+        writer.submit(create_log(f"Log {i}"))
+
+    writer.stop(timeout=5)
+
+    assert len(connector.fetch_logs(LogFilters(limit=100))) == 50
+    assert writer.pending == 0
+
+def test_drop_oldest_backpressure(connector):
+    # Writer not started, so the queue fills up
+    writer = LogWriter(connector, WriterOptions(max_queue_size=3, backpressure='drop_oldest'))
+    for i in range(5):
+        assert writer.submit(create_log(f"Log {i}"))
+
+    assert writer.dropped == 2
+    writer.start()
+    writer.stop(timeout=5)
+
+    contents = [log["content"] for log in connector.fetch_logs(LogFilters(limit=10))]
+    assert sorted(contents) == ["Log 2", "Log 3", "Log 4"]
+
+def test_drop_level_backpressure(connector):
+    writer = LogWriter(connector, WriterOptions(max_queue_size=2, backpressure='drop_level'))
+    assert writer.submit(create_log("debug", level="DEBUG"))
+    assert writer.submit(create_log("info", level="INFO"))
+
+    # An error evicts the lowest level entry
+    assert writer.submit(create_log("error", level="ERROR"))
+    # Another debug entry is lower than everything queued, so it is dropped
+    assert writer.submit(create_log("debug 2", level="DEBUG")) is False
+
+    assert writer.dropped == 2
+    writer.start()
+    writer.stop(timeout=5)
+
+    contents = [log["content"] for log in connector.fetch_logs(LogFilters(limit=10))]
+    assert sorted(contents) == ["error", "info"]
+
+def test_connector_errors_do_not_stop_writer():
+    connector = Mock()
+    # A failed batch is retried one log at a time
+    connector.save_logs.side_effect = Exception("DB Error")
+    connector.save_log.side_effect = [Exception("DB Error"), 2]
+    writer = LogWriter(connector, WriterOptions(flush_interval_seconds=0.05))
+    writer.start()
+
+    writer.submit(create_log("fails"))
+    writer.submit(create_log("works"))
+    writer.stop(timeout=5)
+
+    assert connector.save_log.call_count == 2
+
+def test_writes_batches_with_save_logs():
+    connector = Mock()
+    connector.save_logs.side_effect = lambda logs: list(range(1, len(logs) + 1))
+    writer = LogWriter(connector, WriterOptions(flush_size=5, flush_interval_seconds=60))
+    for i in range(10):
+        writer.submit(create_log(f"Log {i}"))
+
+    writer.start()
+    writer.stop(timeout=5)
+
+    assert connector.save_logs.call_count == 2
+    assert all(len(call.args[0]) == 5 for call in connector.save_logs.call_args_list)
+    connector.save_log.assert_not_called()
+
+def test_snowflake_ids_are_assigned_on_submit(connector):
+    from supertracer.services.ids import SnowflakeIdGenerator
+
+    writer = LogWriter(connector, WriterOptions(flush_interval_seconds=60), id_generator=SnowflakeIdGenerator(node_id=1))
+    on_saved = Mock()
+    log = create_log("fire and forget")
+
+    writer.submit(log, on_saved)
+    # The callback runs before anything reaches storage
+    on_saved.assert_called_once_with(log)
+    assert log["id"] > 0
+    assert connector.fetch_log(log["id"]) is None
+
+    writer.start()
+    writer.stop(timeout=5)
+    assert connector.fetch_log(log["id"])["content"] == "fire and forget"
+
+def test_flush_writes_partial_batch_right_away(connector):
+    writer = LogWriter(connector, WriterOptions(flush_size=1000, flush_interval_seconds=60))
+    writer.start()
+    writer.submit(create_log("Partial"))
+
+    assert writer.flush(timeout=2)
+    assert connector.fetch_logs(LogFilters(limit=10))[0]["content"] == "Partial"
+    writer.stop()
+
+def test_batches_keep_submission_order_across_levels():
+    connector = Mock()
+    connector.save_logs.side_effect = lambda logs: list(range(1, len(logs) + 1))
+    writer = LogWriter(connector, WriterOptions(flush_size=10, flush_interval_seconds=60))
+    levels = ["ERROR", "DEBUG", "INFO", "WARN", "DEBUG", "HTTP"]
+    for i, level in enumerate(levels):
+        writer.submit(create_log(f"Log {i}", level=level))
+
+    writer.start()
+    writer.stop(timeout=5)
+    assert [log["content"] for log in connector.save_logs.call_args.args[0]] == [f"Log {i}" for i in range(len(levels))]
+
+def test_submit_async_waits_off_the_event_loop():
+    import asyncio
+
+    connector = Mock()
+    connector.save_logs.side_effect = lambda logs: list(range(1, len(logs) + 1))
+    writer = LogWriter(connector, WriterOptions(max_queue_size=1, backpressure='block', flush_interval_seconds=60))
+
+    async def main():
+        assert await writer.submit_async(create_log("Queued"))
+        waiting = asyncio.ensure_future(writer.submit_async(create_log("Waits for room")))
+        # The loop keeps running while the second log waits for the queue to drain
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        writer.start()
+        assert await asyncio.wait_for(waiting, timeout=5)
+
+    asyncio.run(main())
+    writer.stop(timeout=5)
+    assert sum(len(call.args[0]) for call in connector.save_logs.call_args_list) == 2
+
+def test_callbacks_run_on_the_submitting_loop():
+    import asyncio
+    import threading
+
+    connector = Mock()
+    connector.save_logs.side_effect = lambda logs: list(range(1, len(logs) + 1))
+    writer = LogWriter(connector, WriterOptions(flush_interval_seconds=60))
+    writer.start()
+
+    async def main():
+        saved = asyncio.get_running_loop().create_future()
+        await writer.submit_async(create_log("Queued"), lambda log: saved.set_result(threading.get_ident()))
+        writer.flush(timeout=5)
+        return await asyncio.wait_for(saved, timeout=5)
+
+    # The callback runs on the loop's thread, not the writer thread
+    assert asyncio.run(main()) == threading.get_ident()
+    writer.stop(timeout=5)
+
+def test_submit_nowait_drops_instead_of_blocking(connector):
+    writer = LogWriter(connector, WriterOptions(max_queue_size=1, backpressure='block'))
+    assert writer.submit_nowait(create_log("Queued"))
+    assert writer.submit_nowait(create_log("No room")) is False
+    assert writer.dropped == 1
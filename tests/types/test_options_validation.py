@@ -2,7 +2,7 @@ import pytest
 from pydantic import ValidationError
 from supertracer.types.options import (
     LoggerOptions, MetricsOptions,
-    AuthOptions, ApiOptions, RetentionOptions, CaptureOptions
+    AuthOptions, ApiOptions, RetentionOptions, CaptureOptions, WriterOptions
 )
 
 class TestOptionsValidation:
@@ -44,9 +44,28 @@ class TestOptionsValidation:
         with pytest.raises(ValidationError, match="cleanup_interval_minutes must be positive"):
             RetentionOptions(cleanup_interval_minutes=0)
 
+        with pytest.raises(ValidationError, match="payload_retention_hours must be non-negative"):
+            RetentionOptions(payload_retention_hours=-1)
+
     def test_capture_options_validation(self):
         with pytest.raises(ValidationError, match="Body size limit must be non-negative"):
             CaptureOptions(max_request_body_size=-1)
             
         with pytest.raises(ValidationError, match="Body size limit must be non-negative"):
             CaptureOptions(max_response_body_size=-1)
+
+    def test_writer_options_validation(self):
+        with pytest.raises(ValidationError, match="Queue and flush sizes must be positive"):
+            WriterOptions(max_queue_size=0)
+
+        with pytest.raises(ValidationError, match="Writer intervals must be positive"):
+            WriterOptions(flush_interval_seconds=0)
+
+        with pytest.raises(ValidationError):
+            WriterOptions(backpressure='drop_newest')
+
+        with pytest.raises(ValidationError, match="node_id must be between 0 and 1023"):
+            WriterOptions(node_id=1024)
+
+        with pytest.raises(ValidationError, match="requires a node_id"):
+            WriterOptions(id_strategy='snowflake')